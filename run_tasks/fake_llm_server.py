@@ -0,0 +1,249 @@
+import re
+import json
+import math
+import time
+import zlib
+import random
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# =========================
+# 로컬 가짜 OpenAI Chat Completions 서버 (부하 테스트용, 표준 라이브러리만 사용)
+# - POST /v1/chat/completions: prompt.py 프롬프트 종류를 판별해 같은 형식의 결정적 응답 생성
+#   (카테고리: "<번호> Q: <답변> -> 분류: <카테고리>", 감성: "분류: <긍정|부정|중립>", 통합: JSON 배열 등)
+# - 지연: 로그정규 분포(중앙값 latency_ms, 분산 latency_sigma) + 출력 토큰당 ms_per_token
+# - 오류 주입: error_rate(500), rate_limit_rate(429 + Retry-After), malformed_rate(형식 깨진 응답)
+# - GET /stats: 누적 요청/오류/토큰 통계, POST /reset: 통계 초기화
+#
+# 실행: python run_tasks/fake_llm_server.py --port 8089 --latency_ms 800 --rate_limit_rate 0.02
+# 연결: constants.OPENAI_BASE_URL = "http://127.0.0.1:8089/v1"
+# =========================
+
+_POSITIVE = ("좋", "만족", "편리", "편해", "친절", "빠르", "감사", "최고")
+_NEGATIVE = ("불편", "느려", "느림", "오류", "에러", "비싸", "불만", "어렵", "안돼", "안 돼", "별로")
+_LINE_RE = re.compile(r"^\s*(\d+)\s*Q:\s*(.*)$")
+_WORD_RE = re.compile(r"[가-힣A-Za-z]{2,}")
+
+
+@dataclass
+class FakeLLMConfig:
+    latency_ms: float = 300.0  # 응답 지연 중앙값
+    latency_sigma: float = 0.5  # 로그정규 sigma (0이면 고정 지연)
+    ms_per_token: float = 0.0  # 출력 토큰당 추가 지연
+    error_rate: float = 0.0  # 500 응답 비율
+    rate_limit_rate: float = 0.0  # 429 응답 비율
+    retry_after_s: float = 0.5  # 429 Retry-After 헤더 값
+    malformed_rate: float = 0.0  # 형식이 깨진 응답 비율 (파싱 폴백 경로 검증)
+    seed: int = 0
+
+
+def _pick(answer: str, options, seed: int) -> str:
+    return options[zlib.crc32(f"{seed}:{answer}".encode("utf-8")) % len(options)]
+
+
+def _sentiment(answer: str) -> str:
+    if any(w in answer for w in _NEGATIVE):
+        return "부정"
+    if any(w in answer for w in _POSITIVE):
+        return "긍정"
+    return "중립"
+
+
+def _keywords(answer: str) -> list:
+    words = list(dict.fromkeys(_WORD_RE.findall(answer)))[:3]
+    return words or ["무응답"]
+
+
+def _section(text: str, start: str, end: str) -> str:
+    if start not in text:
+        return ""
+    body = text.split(start, 1)[1]
+    return body.split(end, 1)[0].strip() if end in body else body.strip()
+
+
+def _numbered_answers(text: str, end: str) -> list:
+    lines = []
+    for ln in _section(text, "[답변]", end).splitlines():
+        m = _LINE_RE.match(ln)
+        if m:
+            lines.append((m.group(1), m.group(2).strip()))
+    return lines
+
+
+def canned_response(prompt: str, seed: int = 0) -> tuple:
+    """프롬프트 종류별 결정적 응답. (종류, 응답 텍스트)"""
+    if "[카테고리]" in prompt:
+        categories = [c.strip() for c in _section(prompt, "[카테고리]", "[답변]").split(",") if c.strip()]
+        categories = categories or ["기타 피드백"]
+        out = [
+            f"{idx} Q: {answer} -> 분류: {_pick(answer, categories, seed)}"
+            for idx, answer in _numbered_answers(prompt, "[Constraints]")
+        ]
+        return "category", "\n".join(out)
+    if "한 번에 생성" in prompt:
+        out = [
+            {"id": int(idx), "sentiment": _sentiment(answer), "keywords": _keywords(answer), "summary": answer[:20]}
+            for idx, answer in _numbered_answers(prompt, "[제약사항]")
+        ]
+        return "enrich", json.dumps(out, ensure_ascii=False)
+    if "긍정/부정/중립" in prompt:
+        return "sentiment", f"분류: {_sentiment(_section(prompt, '[입력]', '[제약사항]'))}"
+    if "키워드의 명사" in prompt:
+        return "keywords", ", ".join(_keywords(_section(prompt, "[설문 응답]", "[Output format]")))
+    if "핵심 내용요약" in prompt:
+        return "summary", _section(prompt, "[설문 응답]", "[Output format]")[:20]
+    return "other", "분류: 기타 피드백"
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 높은 동시성에서 연결 거부(listen backlog 초과) 방지
+
+    def __init__(self, address, config: FakeLLMConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {
+                "requests": 0, "ok": 0, "server_errors": 0, "rate_limited": 0, "malformed": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "by_kind": {},
+            }
+
+    def draw(self):
+        """(지연 배수, 오류 종류) 추첨. 오류 종류: None | 429 | 500 | 'malformed'."""
+        with self._lock:
+            c = self.config
+            factor = math.exp(self._rng.gauss(0.0, c.latency_sigma)) if c.latency_sigma > 0 else 1.0
+            r = self._rng.random()
+            if r < c.rate_limit_rate:
+                return factor, 429
+            if r < c.rate_limit_rate + c.error_rate:
+                return factor, 500
+            if r < c.rate_limit_rate + c.error_rate + c.malformed_rate:
+                return factor, "malformed"
+            return factor, None
+
+    def record(self, **kw) -> None:
+        with self._lock:
+            for k, v in kw.items():
+                if k == "kind":
+                    self.stats["by_kind"][v] = self.stats["by_kind"].get(v, 0) + 1
+                else:
+                    self.stats[k] += v
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeLLMServer
+
+    def log_message(self, format, *args):  # 요청 로그 출력 생략
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.server._lock:
+                self._send_json(200, json.loads(json.dumps(self.server.stats)))
+            return
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/").endswith("/reset"):
+            self.server.reset_stats()
+            self._send_json(200, {"ok": True})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid json", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []) if isinstance(m, dict))
+        kind, text = canned_response(prompt, config.seed)
+        factor, failure = self.server.draw()
+        prompt_tokens = max(1, len(prompt) // 2)
+        completion_tokens = max(1, len(text) // 2)
+        self.server.record(requests=1, kind=kind)
+
+        time.sleep(max(0.0, config.latency_ms * factor + config.ms_per_token * completion_tokens) / 1000.0)
+
+        if failure == 429:
+            self.server.record(rate_limited=1)
+            self._send_json(429, {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                            headers={"Retry-After": str(config.retry_after_s)})
+            return
+        if failure == 500:
+            self.server.record(server_errors=1)
+            self._send_json(500, {"error": {"message": "Internal server error (fake)", "type": "server_error"}})
+            return
+        if failure == "malformed":
+            self.server.record(malformed=1)
+            text = "죄송합니다. 요청을 처리할 수 없습니다."
+
+        self.server.record(ok=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{self.server.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+def start_fake_server(config: Optional[FakeLLMConfig] = None, host: str = "127.0.0.1", port: int = 0) -> FakeLLMServer:
+    """백그라운드 스레드로 서버 시작 (port=0이면 빈 포트 자동 할당). server.url / server.shutdown() 사용."""
+    server = FakeLLMServer((host, port), config or FakeLLMConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 가짜 OpenAI Chat Completions 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    defaults = FakeLLMConfig()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(**{k: getattr(args, k) for k in asdict(defaults)})
+    server = FakeLLMServer((args.host, args.port), config)
+    print(f"[INFO] fake LLM server: {server.url} ({config})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import argparse
 from src.constants import *
 from src.report_generator import *
 from src.utils import save_report
+from src.core.result_sink import read_results
+from src.html_optimizer import optimize_html, format_optimize_stats, minify_html
 
 def main(argv: Optional[List[str]] = None) -> int:
 
@@ -21,6 +23,20 @@ def main(argv: Optional[List[str]] = None) -> int:
 		default="data/20251023_sample_data.csv",
 		help="CSV 파일 경로 (지정하지 않으면 data 폴더 내 최신 CSV 사용)"
 	)
+	parser.add_argument(
+		"--parquet",
+		dest="parquet_dir",
+		type=str,
+		default=None,
+		help="분류 결과 Parquet 저장소 경로 (지정 시 CSV 대신 사용, 예: results/classified)"
+	)
+	parser.add_argument(
+		"--surv-id",
+		dest="surv_ids",
+		nargs="*",
+		default=None,
+		help="보고서를 생성할 설문 ID 목록 (--parquet 사용 시 해당 파티션만 읽음)"
+	)
 	parser.add_argument(
 		"--normalize-stats-weights",
 		dest="normalize",
@@ -28,6 +44,27 @@ def main(argv: Optional[List[str]] = None) -> int:
 		default="off",
 		help="응답자 단위 정규화 설정 (on/off)"
 	)
+	parser.add_argument(
+		"--optimize-html",
+		dest="optimize_html",
+		choices=["on", "off"],
+		default="on" if HTML_OPTIMIZE_ENABLED else "off",
+		help="렌더링 후 HTML 용량 최적화 적용 (on/off)"
+	)
+	parser.add_argument(
+		"--size-budget-kb",
+		dest="size_budget_kb",
+		type=int,
+		default=REPORT_SIZE_BUDGET_KB,
+		help="보고서 1건당 용량 예산(KB). 초과 시 기타 응답 요약 등 선택 섹션을 축약 (0=제한 없음)"
+	)
+	parser.add_argument(
+		"--part-budget-kb",
+		dest="part_budget_kb",
+		type=int,
+		default=REPORT_PART_BUDGET_KB,
+		help="대형 설문 분할 보고서의 파트 1건당 용량 예산(KB). 문항 경계에서 분할 (0=분할하지 않음)"
+	)
 
 	args = parser.parse_args(argv)
 
@@ -37,20 +74,35 @@ def main(argv: Optional[List[str]] = None) -> int:
 
 	csv_path: Optional[str] = args.csv_path
 	
-	if not csv_path or not os.path.exists(csv_path):
-		print("[ERROR] CSV 파일을 찾을 수 없습니다.")
-		return 1
-	
-	enc = detect_encoding(csv_path)
-	df = pd.read_csv(csv_path, 
-					dtype={
-						"surv_id": str,
-						"qsit_type_ds_cd":str,
-						"text_yn":str,
-						"surv_date":str,
-						"keywords":str
-					},
-					encoding=enc)
+	if args.parquet_dir:
+		# Parquet 결과 저장소: 설문 ID 조건은 파티션 폴더 단위로 걸러 필요한 파일만 읽음
+		if not os.path.isdir(args.parquet_dir):
+			print("[ERROR] Parquet 결과 저장소를 찾을 수 없습니다.")
+			return 1
+		df = read_results(args.parquet_dir, surv_ids=args.surv_ids or None)
+		# 분류 결과(category_level1/2)를 보고서 컬럼명(llm_level1/2)으로 사용 (분류 값이 없으면 원본 값 유지)
+		for report_col, result_col in (("llm_level1", "category_level1"), ("llm_level2", "category_level2")):
+			if result_col in df.columns:
+				fallback = df[report_col] if report_col in df.columns else ""
+				df[report_col] = df[result_col].where(df[result_col] != "", fallback)
+		print(f"[INFO] Parquet 결과 {len(df)}건 로드: {args.parquet_dir}")
+	else:
+		if not csv_path or not os.path.exists(csv_path):
+			print("[ERROR] CSV 파일을 찾을 수 없습니다.")
+			return 1
+		
+		enc = detect_encoding(csv_path)
+		df = pd.read_csv(csv_path, 
+						dtype={
+							"surv_id": str,
+							"qsit_type_ds_cd":str,
+							"text_yn":str,
+							"surv_date":str,
+							"keywords":str
+						},
+						encoding=enc)
+		if args.surv_ids:
+			df = df[df["surv_id"].isin([str(s) for s in args.surv_ids])]
 	
 	df["main_ttl"] = df["main_ttl"].fillna("기본").astype(str).str.strip()
 
@@ -68,9 +120,28 @@ def main(argv: Optional[List[str]] = None) -> int:
 		print(f"[INFO] '{surv_id}' 보고서 생성 중... (데이터 {len(group_df)}건)")
 
 		# DataFrame을 그대로 HTML 변환하거나 기존 함수 활용
-		html = generate_html(group_df.to_dict(orient="records"))
-		out_path = save_report(surv_id, main_ttl, html, out_dir=os.path.join(os.path.dirname(__file__), "reports"))
-		generated_reports.append(out_path)
+		records = group_df.to_dict(orient="records")
+		# 선택 섹션 경계 주석은 optimize_html(용량 예산 축약)이 사용할 때만 유지
+		keep_markers = args.optimize_html == "on"
+		if args.part_budget_kb > 0:
+			# 분할 크기는 최적화(minify) 후 크기 기준으로 계산
+			measure = (lambda h: len(minify_html(h).encode("utf-8"))) if args.optimize_html == "on" else None
+			html_parts = generate_html_parts(records, args.part_budget_kb * 1024, measure=measure, optional_markers=keep_markers)
+			print(f"[INFO] '{surv_id}' 보고서 {len(html_parts)}개 파트로 분할")
+		else:
+			html_parts = [generate_html(records, optional_markers=keep_markers)]
+
+		part_total = len(html_parts)
+		for part_index, html in enumerate(html_parts, start=1):
+			if args.optimize_html == "on":
+				html, opt_stats = optimize_html(html, size_budget_bytes=args.size_budget_kb * 1024)
+				print(f"[INFO] {format_optimize_stats(opt_stats)}")
+			out_path = save_report(
+				surv_id, main_ttl, html,
+				out_dir=os.path.join(os.path.dirname(__file__), "reports"),
+				part_index=part_index, part_total=part_total,
+			)
+			generated_reports.append(out_path)
 
 
 	print(f"[COMPLETE] 총 {len(generated_reports)}개 보고서 생성 완료")
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 from typing import Optional
 import pandas as pd
@@ -5,7 +6,14 @@ import pandas as pd
 import argparse
 
 from src.core.state import GraphState
-from src.langgraph_runner import define_workflow, run_langgraph
+from src.core.keyword_extractor import KoreanKeywordExtractor, build_keyword_dictionary
+from src.core.rate_limiter import get_rate_limiter
+from src.core.llm_cache import get_llm_cache
+from src.core.dedup import format_dedup_stats, merge_dedup_stats
+from src.core.checkpoint import ClassificationCheckpoint
+from src.core.metrics import get_metrics
+from src.core.result_sink import ParquetResultSink
+from src.langgraph_runner import define_workflow, run_langgraph_many
 from src.constants import *
 
 from src.utils import should_send_today
@@ -61,6 +69,40 @@ def main():
     parser.add_argument("--survey_info_file", default="data/isb_surv_rpt_info.csv")
     parser.add_argument("--raw_data_file", default="data/20250916_raw_data.csv")
     parser.add_argument("--category_file", default="data/category.csv")
+    parser.add_argument("--classify_batch_size", type=int, default=CLASSIFY_BATCH_SIZE,
+                        help="카테고리 분류(L1/L2) 1회 호출당 답변 수")
+    parser.add_argument("--enrich_mode", choices=["combined", "separate"], default=ENRICH_MODE,
+                        help="감성/키워드/요약 생성 방식 (combined: JSON 통합 호출, separate: 항목별 호출)")
+    parser.add_argument("--enrich_batch_size", type=int, default=ENRICH_BATCH_SIZE,
+                        help="combined 모드 1회 호출당 답변 수")
+    parser.add_argument("--keyword_backend", choices=["llm", "local"], default=KEYWORD_BACKEND,
+                        help="키워드 추출 백엔드 (local: 규칙/사전 기반 추출, 추출 불가 응답만 LLM)")
+    parser.add_argument("--past_keywords_file", default="result.csv",
+                        help="local 백엔드 도메인 사전에 포함할 과거 LLM 키워드 파일 (keywords 컬럼)")
+    parser.add_argument("--answer_dedup", action=argparse.BooleanOptionalAction, default=ANSWER_DEDUP_ENABLED,
+                        help="정규화 텍스트 기준 중복 응답을 1회만 처리 후 결과 복제 (--no-answer_dedup: 비활성)")
+    parser.add_argument("--checkpoint", action=argparse.BooleanOptionalAction, default=True,
+                        help="배치 단위로 분류 결과를 체크포인트에 저장 (--no-checkpoint: 비활성)")
+    parser.add_argument("--checkpoint_file", default=CHECKPOINT_PATH,
+                        help="체크포인트 SQLite 파일 경로")
+    parser.add_argument("--resume", action="store_true",
+                        help="체크포인트에 있는 (surv_id, qsit_sqn, answ_id) 응답은 건너뛰고 나머지만 처리")
+    parser.add_argument("--result_sink", action=argparse.BooleanOptionalAction, default=RESULT_SINK_ENABLED,
+                        help="배치가 끝날 때마다 결과(원본 컬럼 포함)를 surv_id/qsit_sqn 파티션 Parquet로 추가 저장 (pyarrow 필요)")
+    parser.add_argument("--result_dir", default=RESULT_PARQUET_DIR,
+                        help="Parquet 결과 저장소 경로 (run_generate_report.py --parquet으로 읽음)")
+    parser.add_argument("--result_csv", default="result.csv",
+                        help="전체 결과 CSV 경로 (빈 값: 미출력)")
+    parser.add_argument("--metrics_json", default=METRICS_JSON_PATH,
+                        help="노드/문항/설문별 토큰·지연·비용 지표 JSON 요약 경로 (빈 값: 미출력)")
+    parser.add_argument("--prometheus_file", default=None,
+                        help="Prometheus textfile collector용 지표 파일 경로 (예: /var/lib/node_exporter/ksurveyflow.prom)")
+    parser.add_argument("--pipeline_mode", choices=["graph", "stream"], default=PIPELINE_MODE,
+                        help="graph: 단계별 일괄 처리 노드, stream: 응답 단위 스트리밍 (단계 간 배리어 없음)")
+    parser.add_argument("--question_concurrency", type=int, default=QUESTION_CONCURRENCY,
+                        help="동시에 실행할 문항 그래프 수 (0: 무제한, 1: 문항별 순차 실행)")
+    parser.add_argument("--preclassify", action=argparse.BooleanOptionalAction, default=PRECLASSIFY_ENABLED,
+                        help="공백/특수문자/없음 등 사소한 응답을 LLM 없이 규칙으로 분류 (--no-preclassify: 비활성)")
 
     args = parser.parse_args()
 
@@ -82,10 +124,32 @@ def main():
     l2m_cate = load_category_map(category_file)
     surv_cate_list = sorted(l2m_cate.keys())
 
+    # category.csv가 지난 실행과 다르면 카테고리 분류 캐시 무효화
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        llm_cache.sync_category_fingerprint(category_file)
+
+    # local 키워드 백엔드: 도메인 사전(category.csv + 과거 LLM 키워드)으로 추출기 1회 생성
+    keyword_extractor = None
+    if args.keyword_backend == "local":
+        keyword_dict = build_keyword_dictionary(l2m_cate, args.past_keywords_file)
+        keyword_extractor = KoreanKeywordExtractor(keyword_dict)
+        print(f"[INFO] 로컬 키워드 사전 {len(keyword_dict)}개 단어 로드")
+
     items = survey_info_df.to_dict("records")
 
     # langgraph workflow
-    workflow = define_workflow()
+    workflow = define_workflow(args.pipeline_mode)
+    dedup_total = {}
+    states = []
+
+    # 체크포인트: 배치마다 완료 행 저장, --resume이면 완료 행은 재처리하지 않고 결과에 그대로 포함
+    checkpoint = ClassificationCheckpoint(args.checkpoint_file) if (args.checkpoint or args.resume) else None
+    resumed_rows = []
+    resumed_partitions = set()
+    # Parquet 결과 저장소: 보고서를 바로 만들 수 있도록 원본 컬럼(세그먼트 등)과 분류 결과 컬럼을 함께 저장
+    sink_columns = list(dict.fromkeys(list(raw_df.columns) + RESULT_COLUMNS))
+    sink = ParquetResultSink(args.result_dir, columns=sink_columns) if args.result_sink else None
 
     for item in items:
 
@@ -115,6 +179,16 @@ def main():
             main_ttl = filtered_surv_answ['main_ttl'].iloc[0]
             qsit_ttl = filtered_surv_answ['qsit_ttl'].iloc[0]
 
+            if args.resume and checkpoint is not None:
+                done = checkpoint.completed(surv_id, qsit_sqn)
+                answ_ids = filtered_surv_answ['answ_id'].astype(str)
+                resumed_rows.extend(done[a] for a in answ_ids if a in done)
+                if done:
+                    resumed_partitions.add((str(surv_id), int(qsit_sqn)))
+                filtered_surv_answ = filtered_surv_answ[~answ_ids.isin(done)]
+                if len(filtered_surv_answ) == 0:
+                    continue
+
             state: GraphState = {
                 "surv_id": str(surv_id),
                 "qsit_sqn": int(qsit_sqn),
@@ -124,23 +198,80 @@ def main():
                 "surv_cate": surv_cate_list,  
                 "surv_answ": filtered_surv_answ,  
                 "batch_results": [],
-                "level2_map": l2m_cate
+                "level2_map": l2m_cate,
+                "classify_batch_size": args.classify_batch_size,
+                "enrich_mode": args.enrich_mode,
+                "enrich_batch_size": args.enrich_batch_size,
+                "keyword_backend": args.keyword_backend,
+                "keyword_extractor": keyword_extractor,
+                "answer_dedup": args.answer_dedup,
+                "preclassify": args.preclassify,
+                "checkpoint": checkpoint if args.checkpoint else None,
+                "result_sink": sink,
             }
-            
-            result = run_langgraph(workflow, state)
-
-            # result -> category_level1, category_level2, sentiment, keywords
-
-            survey_classify_mart = result.get('batch_results', [])
-            df_cls = pd.DataFrame(
-                survey_classify_mart,
-                columns=['surv_date', 'surv_id', 'main_ttl', 'qsit_ttl', 'qsit_sqn', 'cust_id', 'answ_id', 'answ_cntnt', 'category_level1', 'category_level2', 'sentiment', 'keywords', 'summary']
-            )
-            df_cls["qsit_sqn"] = df_cls["qsit_sqn"].astype(int)
-            df_cls.to_csv("result.csv", index=False)
-
-            # summary
-            break
+            states.append(state)
+
+    # 전체 설문/문항 그래프를 한 이벤트 루프에서 동시 실행 (응답 수 많은 문항부터, 공용 속도 제한기 공유)
+    if args.resume:
+        print(f"[RESUME] 체크포인트 완료 응답 {len(resumed_rows)}건 건너뜀")
+    print(f"[INFO] 문항 {len(states)}개 실행 (동시 문항 수 {args.question_concurrency or '무제한'})")
+    started = time.monotonic()
+
+    def on_done(k, result):
+        st = states[k]
+        if sink is not None:
+            # 배치마다 추가된 파일을 문항 파티션당 1개로 합침
+            sink.compact(st['surv_id'], st['qsit_sqn'])
+        if result.get('error'):
+            print(f"[FAIL] {st['surv_id']}/{st['qsit_sqn']} ({time.monotonic() - started:.1f}s)")
+            return
+        print(f"[DONE] {st['surv_id']}/{st['qsit_sqn']} {len(result.get('batch_results', []))}건 ({time.monotonic() - started:.1f}s)")
+
+    results = run_langgraph_many(workflow, states, max_parallel=args.question_concurrency, on_done=on_done)
+
+    print(f"[RATE] {get_rate_limiter().format_stats()}")
+    if llm_cache is not None:
+        print(f"[CACHE] {llm_cache.format_stats()}")
+
+    # result -> category_level1, category_level2, sentiment, keywords
+
+    survey_classify_mart = list(resumed_rows)
+    for result in results:
+        survey_classify_mart.extend(result.get('batch_results', []))
+        if result.get('dedup_stats'):
+            merge_dedup_stats(dedup_total, result['dedup_stats'])
+
+    failed = [r for r in results if r.get('error')]
+    if failed:
+        print(f"[FAIL] 실패 문항 {len(failed)}개: " + ", ".join(f"{r['surv_id']}/{r['qsit_sqn']}" for r in failed)
+              + (" (--resume으로 미완료 응답만 재실행)" if checkpoint is not None and args.checkpoint else ""))
+
+    if args.result_csv:
+        df_cls = pd.DataFrame(survey_classify_mart, columns=RESULT_COLUMNS)
+        df_cls["qsit_sqn"] = df_cls["qsit_sqn"].astype(int)
+        df_cls.to_csv(args.result_csv, index=False)
+    if sink is not None:
+        # 재개된 응답은 이전 실행에서 배치마다 이미 저장됨 → 다시 쓰지 않고, 이전 실행이 남긴 배치 파일만 합침
+        # (이번 실행 문항은 on_done에서 합쳤으므로 완료 응답만 있던 문항 파티션이 대상)
+        run_partitions = {(st['surv_id'], st['qsit_sqn']) for st in states}
+        for surv_id, qsit_sqn in sorted(resumed_partitions - run_partitions):
+            sink.compact(surv_id, qsit_sqn)
+        print(f"[SINK] {sink.format_stats()}")
+
+    if dedup_total:
+        print(f"[DEDUP] 전체: {format_dedup_stats(dedup_total)}")
+
+    metrics = get_metrics()
+    print(f"[METRICS]\n{metrics.format_nodes()}")
+    if args.metrics_json:
+        print(f"[METRICS] JSON 요약 저장: {metrics.write_json(args.metrics_json)}")
+    if args.prometheus_file:
+        print(f"[METRICS] Prometheus 텍스트 저장: {metrics.write_prometheus(args.prometheus_file)}")
+    if llm_cache is not None:
+        llm_cache.flush()
+    if checkpoint is not None:
+        print(f"[CHECKPOINT] {checkpoint.saved}건 저장: {args.checkpoint_file}")
+        checkpoint.close()
 
 # export PYTHONPATH="$PWD/src:$PYTHONPATH
 if __name__ == "__main__":
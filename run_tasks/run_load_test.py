@@ -0,0 +1,198 @@
+import csv
+import json
+import time
+import random
+import argparse
+import urllib.request
+from dataclasses import asdict
+
+import pandas as pd
+
+import src.constants as constants
+from src.constants import *
+from run_tasks.fake_llm_server import FakeLLMConfig, start_fake_server
+
+# =========================
+# 분류 그래프 부하 테스트 (가짜 LLM 서버 사용, 실제 GPT 호출 없음)
+# - 합성 응답으로 문항 state를 만들고 run_langgraph_many로 실행
+# - 설정 조합(동시성 × 분류 배치 × 통합 생성 배치)별 처리량, 호출 지연 p50/p95/p99, 응답당 호출/토큰 수 출력
+#
+# 실행: python -m run_tasks.run_load_test --answers 2000 --concurrency 10,50 --classify_batch_sizes 1,20
+# =========================
+
+_TEMPLATES = [
+    "앱이 너무 느려요", "로그인할 때 오류가 자주 나요", "상담원이 친절해서 좋았습니다", "예금금리가 더 높았으면 좋겠어요",
+    "대출 한도가 너무 낮아요", "화면 구성이 편리합니다", "카드 혜택이 별로예요", "이체 수수료를 없애 주세요",
+    "고객센터 연결이 어렵습니다", "이벤트가 다양해서 만족합니다", "알림이 너무 많이 와요", "인증 절차가 복잡해요",
+    "해외 결제할 때 불편했어요", "적금 상품이 다양했으면 합니다", "전반적으로 만족스럽습니다", "업데이트 후 앱이 자주 꺼져요",
+]
+_LEVEL2_MAP = {
+    "앱": ["속도", "오류", "화면", "알림"],
+    "금리": ["예금 금리", "대출 금리", "적금 금리"],
+    "상담": ["친절", "연결", "응대 속도"],
+    "카드": ["혜택", "해외 결제", "한도"],
+    "수수료": ["이체", "출금"],
+}
+
+
+def _int_list(value: str) -> list:
+    return [int(v) for v in str(value).split(",") if v.strip()]
+
+
+def build_states(n_answers: int, n_questions: int, dup_rate: float, seed: int, options: dict) -> list:
+    """합성 응답 n_answers건을 n_questions개 문항에 나눠 GraphState 목록 생성 (문항 크기는 불균등)."""
+    rnd = random.Random(seed)
+    weights = [rnd.uniform(0.5, 2.0) for _ in range(n_questions)]
+    sizes = [max(1, int(n_answers * w / sum(weights))) for w in weights]
+    states = []
+    serial = 0
+    for q, size in enumerate(sizes, start=1):
+        rows = []
+        for i in range(size):
+            text = rnd.choice(_TEMPLATES)
+            if rnd.random() >= dup_rate:
+                serial += 1
+                text = f"{text} ({serial})"
+            rows.append({
+                "surv_date": "20250101", "surv_id": "LOADTEST", "main_ttl": "부하 테스트", "qsit_ttl": f"문항 {q}",
+                "qsit_sqn": q, "cust_id": f"c{q}_{i}", "answ_id": f"a{q}_{i}", "answ_cntnt": text,
+            })
+        states.append({
+            "surv_id": "LOADTEST",
+            "qsit_sqn": q,
+            "main_ttl": "부하 테스트",
+            "qsit_ttl": f"문항 {q}",
+            "response": "",
+            "surv_cate": sorted(_LEVEL2_MAP.keys()),
+            "surv_answ": pd.DataFrame(rows),
+            "batch_results": [],
+            "level2_map": _LEVEL2_MAP,
+            **options,
+        })
+    return states
+
+
+def _server_stats(server, base_url: str) -> dict:
+    if server is not None:
+        with server._lock:
+            return json.loads(json.dumps(server.stats))
+    with urllib.request.urlopen(base_url.rstrip("/") + "/stats") as resp:
+        return json.loads(resp.read())
+
+
+def _reset_server(server, base_url: str) -> None:
+    if server is not None:
+        server.reset_stats()
+        return
+    req = urllib.request.Request(base_url.rstrip("/") + "/reset", data=b"{}", method="POST")
+    urllib.request.urlopen(req).read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분류 그래프 부하 테스트 (가짜 LLM 서버)")
+    parser.add_argument("--answers", type=int, default=2000, help="합성 응답 수 (전체 문항 합)")
+    parser.add_argument("--questions", type=int, default=4, help="문항 수 (응답 수는 문항별로 불균등)")
+    parser.add_argument("--dup_rate", type=float, default=0.3, help="템플릿 그대로(중복) 응답 비율")
+    parser.add_argument("--concurrency", default=str(ASYNC_CONCURRENCY), help="LLM 동시성 한도 목록 (쉼표 구분)")
+    parser.add_argument("--classify_batch_sizes", default=str(CLASSIFY_BATCH_SIZE), help="분류 배치 크기 목록")
+    parser.add_argument("--enrich_batch_sizes", default=str(ENRICH_BATCH_SIZE), help="통합 생성 배치 크기 목록")
+    parser.add_argument("--enrich_mode", choices=["combined", "separate"], default=ENRICH_MODE)
+    parser.add_argument("--pipeline_mode", choices=["graph", "stream"], default=PIPELINE_MODE)
+    parser.add_argument("--question_concurrency", type=int, default=QUESTION_CONCURRENCY)
+    parser.add_argument("--answer_dedup", action=argparse.BooleanOptionalAction, default=False,
+                        help="중복 응답 제거 사용 (기본: 미사용, LLM 경로 자체를 측정)")
+    parser.add_argument("--preclassify", action=argparse.BooleanOptionalAction, default=False,
+                        help="규칙 기반 사전 분류 사용 (기본: 미사용)")
+    parser.add_argument("--rpm", type=float, default=0, help="속도 제한기 RPM (0: 제한 없음)")
+    parser.add_argument("--tpm", type=float, default=0, help="속도 제한기 TPM (0: 제한 없음)")
+    parser.add_argument("--base_url", default=None, help="외부 가짜 서버 주소 (없으면 내장 서버 실행)")
+    parser.add_argument("--out", default=None, help="결과 CSV 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    server_defaults = FakeLLMConfig()
+    for name, value in asdict(server_defaults).items():
+        if name != "seed":
+            parser.add_argument(f"--{name}", type=type(value), default=value, help="가짜 서버 설정")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        config = FakeLLMConfig(**{k: getattr(args, k) for k in asdict(server_defaults) if k != "seed"}, seed=args.seed)
+        server = start_fake_server(config)
+        base_url = server.url
+        print(f"[INFO] 내장 가짜 LLM 서버: {base_url} ({config})")
+
+    # classify 모듈의 ChatOpenAI가 가짜 서버를 향하도록 import 전에 설정
+    constants.OPENAI_BASE_URL = base_url
+    constants.OPENAI_KEY = constants.OPENAI_KEY or "sk-fake"
+    from src.core.llm_cache import set_llm_cache_enabled
+    from src.core.rate_limiter import AdaptiveRateLimiter, set_rate_limiter
+    from src.langgraph_runner import define_workflow, run_langgraph_many
+
+    set_llm_cache_enabled(False)
+    workflow = define_workflow(args.pipeline_mode)
+
+    rows = []
+    for concurrency in _int_list(args.concurrency):
+        for classify_bs in _int_list(args.classify_batch_sizes):
+            for enrich_bs in _int_list(args.enrich_batch_sizes):
+                states = build_states(args.answers, args.questions, args.dup_rate, args.seed, {
+                    "classify_batch_size": classify_bs,
+                    "enrich_mode": args.enrich_mode,
+                    "enrich_batch_size": enrich_bs,
+                    "answer_dedup": args.answer_dedup,
+                    "preclassify": args.preclassify,
+                })
+                n_answers = sum(len(s["surv_answ"]) for s in states)
+                limiter = AdaptiveRateLimiter(
+                    requests_per_min=args.rpm, tokens_per_min=args.tpm,
+                    initial_concurrency=concurrency, max_concurrency=concurrency,
+                )
+                set_rate_limiter(limiter)
+                _reset_server(server, base_url)
+
+                started = time.monotonic()
+                run_langgraph_many(workflow, states, max_parallel=args.question_concurrency)
+                elapsed = time.monotonic() - started
+
+                srv = _server_stats(server, base_url)
+                lim = limiter.stats()
+                pct = limiter.latency_percentiles()
+                tokens = srv["prompt_tokens"] + srv["completion_tokens"]
+                row = {
+                    "concurrency": concurrency,
+                    "classify_batch_size": classify_bs,
+                    "enrich_batch_size": enrich_bs,
+                    "answers": n_answers,
+                    "elapsed_s": round(elapsed, 2),
+                    "answers_per_s": round(n_answers / elapsed, 2) if elapsed else 0.0,
+                    "p50_s": pct[50],
+                    "p95_s": pct[95],
+                    "p99_s": pct[99],
+                    "calls": srv["requests"],
+                    "calls_per_answer": round(srv["requests"] / n_answers, 3) if n_answers else 0.0,
+                    "tokens_per_answer": round(tokens / n_answers, 1) if n_answers else 0.0,
+                    "rate_limited": srv["rate_limited"],
+                    "server_errors": srv["server_errors"],
+                    "retries": lim["retries"],
+                    "max_in_flight": lim["max_in_flight"],
+                }
+                rows.append(row)
+                print(f"[LOAD] {row}")
+
+    header = list(rows[0].keys()) if rows else []
+    print("\n" + " | ".join(header))
+    for row in rows:
+        print(" | ".join(str(row[k]) for k in header))
+    if args.out and rows:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=header)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"[INFO] 결과 저장: {args.out}")
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,49 @@ from typing import Dict, List
 # langchain constants
 OPENAI_KEY = ""
 #os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = None  # OpenAI 호환 엔드포인트 (None=기본, 부하 테스트 시 fake_llm_server 주소)
 
 USE_ASYNC_CLASSIFY = True  # 카테고리 분류 비동기 사용 여부
 USE_ASYNC_ENRICH = True  # 감성/키워드 비동기 사용 여부
-ASYNC_CONCURRENCY = 50  # 동시 실행 개수
+ASYNC_CONCURRENCY = 50  # 동시 실행 개수 (속도 제한기의 동시성 상한)
+QUESTION_CONCURRENCY = 8  # 동시에 실행할 문항 그래프 수 (설문 전체 문항을 응답 수 많은 순으로 실행, 0=무제한)
+# LLM 호출 속도 제한 (조직 요금제 한도에 맞춰 조정)
+LLM_REQUESTS_PER_MIN = 3000  # 분당 요청 수 (RPM)
+LLM_TOKENS_PER_MIN = 250000  # 분당 토큰 수 (TPM, 프롬프트+응답 추정치 기준)
+LLM_INITIAL_CONCURRENCY = 10  # 시작 동시성 (AIMD로 1~ASYNC_CONCURRENCY 범위에서 조절)
+LLM_TARGET_LATENCY_S = 15.0  # 응답 지연이 이 값의 2배를 넘으면 동시성 감소
+LLM_MAX_RETRIES = 5  # 429/5xx/연결 오류 재시도 횟수 (지수 백오프)
+LLM_COMPLETION_TOKENS_ESTIMATE = 256  # 호출당 응답 토큰 추정치 (TPM 버킷 차감용)
+LLM_PRICE_PER_1K_PROMPT_TOKENS = 0.0025  # 비용 추정 단가 (USD, gpt-4o 입력)
+LLM_PRICE_PER_1K_COMPLETION_TOKENS = 0.01  # 비용 추정 단가 (USD, gpt-4o 출력)
+METRICS_JSON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "metrics", "langgraph_run_summary.json")  # 실행 지표 JSON 요약
+# LLM 결과 영구 캐시 (SQLite, 관리: python -m src.core.llm_cache stats|evict|invalidate)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache", "llm_cache.sqlite3")
+LLM_CACHE_TTL_DAYS = 90  # 생성 후 보관 일수 (0=무제한)
+LLM_CACHE_MAX_ENTRIES = 2000000  # 최대 항목 수 (초과 시 오래 사용하지 않은 순 삭제, 0=무제한)
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "checkpoint", "classify.sqlite3")  # 분류 결과 체크포인트 (--resume)
+# 분류 결과 Parquet 저장소 (surv_id/qsit_sqn 파티션, 배치 완료마다 원본 컬럼 포함 행 추가 저장, 보고서 생성 시 --parquet으로 직접 읽음)
+RESULT_SINK_ENABLED = False  # pyarrow 필요 (run_langgraph.py --result_sink로 사용)
+RESULT_PARQUET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results", "classified")
+RESULT_COLUMNS = [
+    'surv_date', 'surv_id', 'main_ttl', 'qsit_ttl', 'qsit_sqn', 'cust_id', 'answ_id', 'answ_cntnt',
+    'category_level1', 'category_level2', 'sentiment', 'keywords', 'summary',
+]  # 분류 결과 컬럼 (result.csv, Parquet 저장소는 원본 컬럼 + 이 컬럼)
+CLASSIFY_BATCH_SIZE = 20  # 카테고리 분류(L1/L2) 1회 호출당 답변 수 (응답 줄 수 불일치 시 절반씩 나눠 재시도)
+ENRICH_MODE = "separate"  # 감성/키워드/요약 생성 방식 ("separate": 항목별 개별 호출, "combined": JSON 통합 1회 호출 — 실데이터 검증 후 전환)
+ENRICH_BATCH_SIZE = 10  # combined 모드 1회 호출당 답변 수
+KEYWORD_BACKEND = "llm"  # 키워드 추출 백엔드 ("llm": GPT 호출, "local": 규칙/사전 기반 추출 + 실패 시 LLM 폴백)
+ANSWER_DEDUP_ENABLED = True  # 공백/문장부호/대소문자 정규화 기준 문항 내 중복 응답은 1회만 LLM 처리 후 결과 복제
+PRECLASSIFY_ENABLED = True  # 공백/특수문자/없음/무응답 응답은 LLM 없이 '기타 피드백'으로 사전 분류
+PRECLASSIFY_SHORT_ANSWERS = False  # MIN_RESPONSE_LENGTH 미만 응답(보고서 제외 대상)도 LLM 없이 처리 (감성/키워드/요약은 비움)
+CANON_MEMO_SIZE = 10000  # 카테고리 정규화 유사도 매칭 결과 메모 크기 (카테고리 목록별)
+CANON_NGRAM_MIN_CATEGORIES = 200  # 카테고리 수가 이 이상이면 문자 2-gram 색인으로 후보를 좁힌 뒤 유사도 비교 (0=미사용)
+CANON_NGRAM_SHORTLIST = 30  # 2-gram 색인 후보 수
+CANON_MAX_CATEGORY_SETS = 256  # 정규화기를 유지할 카테고리 목록 수 (L1 목록 + L1별 L2 목록)
+PIPELINE_MODE = "graph"  # 실행 방식 ("graph": L1→L2→감성 단계별 일괄 처리, "stream": 응답 단위 스트리밍)
+STREAM_QUEUE_SIZE = 200  # stream 모드 단계 간 큐 크기 (가득 차면 이전 단계 대기)
+STREAM_LINGER_S = 0.2  # stream 모드 마이크로배치 최대 대기 시간(초), 배치가 덜 차도 이 시간이 지나면 처리
 # =========================
 
 # =========================
@@ -214,6 +253,9 @@ RANKING_WEIGHTS = {
 # False: 고정 가중치(2,1 / 3,2,1)를 그대로 사용
 RANKING_NORMALIZE_PER_RESPONDENT = True
 
+# 순위형 응답 행렬(응답자 × 순위)에서 다루는 최대 순위 (RANKING_WEIGHTS 정의 범위와 동일)
+RANKING_MAX_RANK = 10
+
 # =========================
 # 히트맵 색상 변환 설정
 # =========================
@@ -282,6 +324,22 @@ CROSS_ANALYSIS_MAX_CASES_PER_CELL = 3  # 각 셀당 최대 3개 엣지케이스
 # 평균대비 gap 상위 노출 개수 (교차분석 표 전체 상위 N개)
 CROSS_ANALYSIS_TOP_K = 5
 
+# =========================
+# 보고서 HTML 용량 최적화 설정
+# =========================
+# 렌더링 후 공백/중복 스타일/색상 표기 축약 등 Outlook 2019 호환 범위의 최적화 적용 여부
+HTML_OPTIMIZE_ENABLED = False  # Outlook 렌더링 확인 전까지 기본 비활성 (run_generate_report.py --optimize-html on으로 사용)
+# 보고서 1건당 용량 예산(KB). 0이면 제한 없음. 초과 시 선택 섹션을 우선순위대로 축약
+REPORT_SIZE_BUDGET_KB = 0
+# 예산 초과 시 축약할 선택 섹션 (앞에 있을수록 먼저 축약)
+OPTIONAL_SECTION_PRIORITY = ["other_summary", "cross_analysis"]
+OPTIONAL_SECTION_LABELS = {
+	"other_summary": "기타 응답 요약",
+	"cross_analysis": "Seg.간 교차분석",
+}
+# 대형 설문 분할 보고서: 파트 1건당 용량 예산(KB). 문항 경계에서 분할 (0=분할하지 않음)
+REPORT_PART_BUDGET_KB = 0
+
 
 # =========================
 # 주관식 분석 표시 설정
@@ -304,6 +362,13 @@ SUBJECTIVE_OTHER_THRESHOLD = 0
 SUBJECTIVE_OTHER_PERCENT_THRESHOLD = 0.0
 SUBJECTIVE_KEYWORDS_LIMIT = 5
 SUBJECTIVE_KEYWORDS_LIMIT_OTHER = 10
+# 주관식 키워드 top-k 근사 집계 (대용량 상시 설문용, False=정확 집계)
+# - 사용 시 (카테고리, 감정)별 키워드를 Space-Saving(추적 수 CAPACITY) + Count-Min(오차 ε·N, 확률 1-δ)으로
+#   집계하고, 최종 후보(노출 키워드 수 이상, 기타 묶기는 묶음 단위)만 정확 건수로 다시 센다
+SUBJECTIVE_KEYWORD_SKETCH_ENABLED = False
+SUBJECTIVE_KEYWORD_SKETCH_CAPACITY = 200
+SUBJECTIVE_KEYWORD_SKETCH_EPSILON = 0.001
+SUBJECTIVE_KEYWORD_SKETCH_DELTA = 0.01
 
 
 # # =========================
@@ -0,0 +1,144 @@
+import re
+import difflib
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.constants import *
+
+# =========================
+# 카테고리 정규화(LLM 출력 → category.csv 카테고리명)
+# - 카테고리 목록별로 1회 생성해 재사용 (get_canonicalizer)
+# - 1) 정규화/별칭 해시맵 정확 일치 → 2) 메모이즈된 유사도(difflib) 매칭
+# - 유사도 매칭은 카테고리별 SequenceMatcher(b2j 사전 계산)를 재사용하고,
+#   real_quick_ratio/quick_ratio 상한으로 현재 최고점을 넘을 수 없는 후보는 생략
+# - 카테고리 수가 CANON_NGRAM_MIN_CATEGORIES 이상이면 문자 2-gram 색인으로 후보를 좁힘 (근사)
+# =========================
+
+_WS_RE = re.compile(r"\s+")
+# 별칭 정규화: 앞 번호("01. ", "1)"), 따옴표/괄호, 끝 문장부호 제거
+_NUM_PREFIX_RE = re.compile(r"^\s*\d+\s*[.)]\s*")
+_QUOTE_RE = re.compile(r"[\"'`‘’“”\[\]<>«»]")
+_TRAIL_PUNCT_RE = re.compile(r"[\s.,!?;:]+$")
+
+
+def normalize_label(s) -> str:
+    """공백 축약 + 소문자 (유사도 비교 기준)."""
+    if s is None:
+        return ""
+    return _WS_RE.sub(" ", str(s).strip().lower())
+
+
+def alias_label(s) -> str:
+    """별칭 키: normalize_label + 번호/따옴표/괄호/끝 문장부호 제거 + 공백 제거."""
+    s = _NUM_PREFIX_RE.sub("", normalize_label(s))
+    s = _TRAIL_PUNCT_RE.sub("", _QUOTE_RE.sub("", s))
+    return s.replace(" ", "")
+
+
+def _bigrams(s: str) -> set:
+    s = s.replace(" ", "")
+    if len(s) < 2:
+        return {s} if s else set()
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+class CategoryCanonicalizer:
+    """카테고리 목록 1개에 대한 사전 계산 정규화기. match()는 best_match_level과 같은 (카테고리, 점수)를 반환."""
+
+    def __init__(self, categories: Sequence[str], memo_size: int = CANON_MEMO_SIZE,
+                 ngram_min_categories: int = CANON_NGRAM_MIN_CATEGORIES, shortlist_size: int = CANON_NGRAM_SHORTLIST):
+        self.categories = list(categories)
+        self.memo_size = memo_size
+        self.shortlist_size = shortlist_size
+        self._norms = [normalize_label(c) for c in self.categories]
+        # 같은 키가 여러 개면 목록 앞쪽 카테고리 우선 (기존 순차 비교와 동일)
+        self._exact: Dict[str, int] = {}
+        self._alias: Dict[str, int] = {}
+        for i, (cate, norm) in enumerate(zip(self.categories, self._norms)):
+            self._exact.setdefault(norm, i)
+            alias = alias_label(cate)
+            if alias:
+                self._alias.setdefault(alias, i)
+        self._matchers = []
+        for norm in self._norms:
+            m = difflib.SequenceMatcher(None)
+            m.set_seq2(norm)
+            self._matchers.append(m)
+        self._memo: "OrderedDict[str, Tuple[Optional[int], float]]" = OrderedDict()
+        self._index: Optional[Dict[str, List[int]]] = None
+        if ngram_min_categories and len(self.categories) >= ngram_min_categories:
+            self._index = {}
+            for i, norm in enumerate(self._norms):
+                for g in _bigrams(norm):
+                    self._index.setdefault(g, []).append(i)
+        self.stats = {"exact": 0, "alias": 0, "memo": 0, "fuzzy": 0}
+
+    def _candidates(self, norm: str) -> range | List[int]:
+        if self._index is None:
+            return range(len(self.categories))
+        overlap = Counter()
+        for g in _bigrams(norm):
+            for i in self._index.get(g, ()):
+                overlap[i] += 1
+        if not overlap:
+            return range(len(self.categories))
+        # 겹치는 2-gram 수 상위 후보만 (동점은 목록 순서)
+        top = sorted(overlap.items(), key=lambda t: (-t[1], t[0]))[: self.shortlist_size]
+        return sorted(i for i, _ in top)
+
+    def _fuzzy(self, norm: str) -> Tuple[Optional[int], float]:
+        best, best_score = None, 0.0
+        for i in self._candidates(norm):
+            m = self._matchers[i]
+            m.set_seq1(norm)
+            # 상한이 현재 최고점 이하이면 ratio() 계산 생략 (동점이면 앞 후보 유지이므로 <=)
+            if m.real_quick_ratio() <= best_score or m.quick_ratio() <= best_score:
+                continue
+            score = m.ratio()
+            if score > best_score:
+                best, best_score = i, score
+        return best, best_score
+
+    def match(self, new_cate: str, threshold: float = 0.5) -> Tuple[Optional[str], float]:
+        if not new_cate or not self.categories:
+            return None, 0.0
+        norm = normalize_label(new_cate)
+        i = self._exact.get(norm)
+        if i is not None:
+            self.stats["exact"] += 1
+            return self.categories[i], 1.0
+        i = self._alias.get(alias_label(new_cate))
+        if i is not None:
+            self.stats["alias"] += 1
+            return self.categories[i], 1.0
+        hit = self._memo.get(norm)
+        if hit is not None:
+            self._memo.move_to_end(norm)
+            self.stats["memo"] += 1
+        else:
+            hit = self._fuzzy(norm)
+            self.stats["fuzzy"] += 1
+            self._memo[norm] = hit
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        i, score = hit
+        if i is not None and score >= threshold:
+            return self.categories[i], score
+        return None, score
+
+
+_canonicalizers: "OrderedDict[tuple, CategoryCanonicalizer]" = OrderedDict()
+
+
+def get_canonicalizer(categories: Sequence[str]) -> CategoryCanonicalizer:
+    """카테고리 목록별 정규화기 (최근 사용 CANON_MAX_CATEGORY_SETS개 유지)."""
+    key = tuple(categories)
+    canon = _canonicalizers.get(key)
+    if canon is None:
+        canon = CategoryCanonicalizer(key)
+        _canonicalizers[key] = canon
+        if len(_canonicalizers) > CANON_MAX_CATEGORY_SETS:
+            _canonicalizers.popitem(last=False)
+    else:
+        _canonicalizers.move_to_end(key)
+    return canon
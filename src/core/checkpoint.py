@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import sqlite3
+from typing import Dict, Iterable, Optional
+
+from src.core.records import ROW_KEY, join_wide_columns
+from src.constants import *
+
+# =========================
+# 분류 결과 체크포인트 (SQLite)
+# - 키: (surv_id, qsit_sqn, answ_id), 값: 최종 결과 행(JSON)
+# - 감성/키워드/요약까지 끝난 배치(및 사전 분류 결과)를 배치 단위로 커밋
+# - run_langgraph.py --resume: 체크포인트에 있는 응답은 건너뛰고 나머지만 처리
+# - 같은 완료 행을 Parquet 결과 저장소(state['result_sink'])에도 배치 단위로 추가 저장
+# =========================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS classified_rows (
+    surv_id TEXT NOT NULL,
+    qsit_sqn INTEGER NOT NULL,
+    answ_id TEXT NOT NULL,
+    row TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (surv_id, qsit_sqn, answ_id)
+);
+"""
+
+
+def _json_default(o):
+    # numpy 스칼라(int64 등)는 파이썬 값으로
+    if hasattr(o, "item"):
+        return o.item()
+    return str(o)
+
+
+class ClassificationCheckpoint:
+    """(surv_id, qsit_sqn, answ_id) 단위 분류 결과 저장소."""
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.saved = 0
+
+    def save_rows(self, rows: Iterable[dict]) -> int:
+        """결과 행 저장 후 커밋 (같은 키는 덮어씀). 저장 건수를 반환."""
+        now = time.time()
+        params = [
+            (str(row.get("surv_id")), int(row.get("qsit_sqn")), str(row.get("answ_id")),
+             json.dumps(row, ensure_ascii=False, default=_json_default), now)
+            for row in rows
+        ]
+        if not params:
+            return 0
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO classified_rows (surv_id, qsit_sqn, answ_id, row, updated_at) VALUES (?, ?, ?, ?, ?)",
+            params,
+        )
+        self._conn.commit()
+        self.saved += len(params)
+        return len(params)
+
+    def completed(self, surv_id: str, qsit_sqn: int) -> Dict[str, dict]:
+        """문항의 완료 행 {answ_id: 결과 행}."""
+        cur = self._conn.execute(
+            "SELECT answ_id, row FROM classified_rows WHERE surv_id = ? AND qsit_sqn = ?",
+            (str(surv_id), int(qsit_sqn)),
+        )
+        return {answ_id: json.loads(row) for answ_id, row in cur}
+
+    def clear(self, surv_id: Optional[str] = None) -> int:
+        """surv_id(없으면 전체) 체크포인트 삭제. 삭제 건수를 반환."""
+        if surv_id is None:
+            cur = self._conn.execute("DELETE FROM classified_rows")
+        else:
+            cur = self._conn.execute("DELETE FROM classified_rows WHERE surv_id = ?", (str(surv_id),))
+        self._conn.commit()
+        return cur.rowcount or 0
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+
+def _expand_rows(state: dict, rows: list) -> list:
+    """완료 행을 원본 컬럼 포함 행으로 변환. 중복 제거 대표 행은 같은 그룹의 원본 행 전체로 펼침."""
+    members = state.get('dedup_members')
+    if not members:
+        # 경량 레코드(_row)는 원본 컬럼과 결합
+        wide_rows = state.get('wide_rows')
+        return join_wide_columns(rows, wide_rows) if wide_rows else rows
+    expanded = []
+    for row in rows:
+        base = {k: v for k, v in row.items() if k not in ("_dedup_id", ROW_KEY)}
+        group = members.get(row.get("_dedup_id"))
+        if group is None:
+            expanded.append(base)
+        else:
+            expanded.extend({**base, **member} for member in group)
+    return expanded
+
+
+def checkpoint_rows(state: dict, rows: list) -> None:
+    """state에 체크포인트/결과 저장소가 있으면 완료 행(원본 컬럼 포함)을 배치 단위로 저장."""
+    checkpoint = state.get('checkpoint')
+    sink = state.get('result_sink')
+    if (checkpoint is None and sink is None) or not rows:
+        return
+    expanded = _expand_rows(state, rows)
+    if checkpoint is not None:
+        checkpoint.save_rows(expanded)
+    if sink is not None:
+        sink.write_rows(expanded)
@@ -2,11 +2,18 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 import re
+import json
 import asyncio
-import difflib
 import pandas as pd
 
 from src.core.state import GraphState
+from src.core.keyword_extractor import KoreanKeywordExtractor, build_keyword_dictionary
+from src.core.rate_limiter import get_rate_limiter
+from src.core.llm_cache import cache_key, get_llm_cache
+from src.core.canonicalize import get_canonicalizer
+from src.core.checkpoint import checkpoint_rows
+from src.core.records import answers_from_state
+from src.core.metrics import UsageCallback, get_metrics
 from src.core.prompt import *
 from src.constants import *
 
@@ -21,6 +28,8 @@ llm = ChatOpenAI(
     temperature=0,
     top_p=1,                     # ← 직접 인자
     api_key=OPENAI_KEY,          # 또는 환경변수 OPENAI_API_KEY 사용
+    base_url=OPENAI_BASE_URL,
+    max_retries=0,               # 재시도/백오프는 공용 속도 제한기(rate_limiter)에서 처리
 )
 
 parser = StrOutputParser()
@@ -34,91 +43,244 @@ parser = StrOutputParser()
 
 # =========================
 
-def _normalize_label(s: str) -> str:
-    if s is None:
-        return ""
-    s = re.sub(r"\s+", " ", str(s).strip().lower())
-    return s
+def _chain_template(chain) -> str:
+    return getattr(getattr(chain, "first", None), "template", "") or ""
+
+def _llm_identity() -> dict:
+    """캐시 키에 포함할 모델 설정."""
+    return {"model": getattr(llm, "model_name", None), "temperature": getattr(llm, "temperature", None)}
+
+async def ainvoke_llm(chain, inputs: dict, use_cache: bool = True):
+    """공용 속도 제한기(RPM/TPM 버킷 + AIMD 동시성) 하에서 체인을 호출. 그래프의 모든 LLM 호출은 이 함수를 거친다.
+
+    use_cache=True면 (템플릿, 모델, temperature, 입력) 기준으로 원문 응답을 캐시(kind='raw')에서 먼저 찾는다.
+    답변 단위로 캐시하는 배치 호출(분류/통합 생성)은 use_cache=False로 호출한다.
+    """
+    template = _chain_template(chain)
+    cache = get_llm_cache() if use_cache else None
+    key = None
+    if cache is not None:
+        key = cache_key("raw", template=template, inputs=inputs, **_llm_identity())
+        cached = cache.get(key)
+        if cached is not None:
+            get_metrics().record_cache_hits(1)
+            return cached
+    # 토큰 추정: 프롬프트+입력 2자당 1토큰 + 응답 여유분
+    prompt_tokens_est = (len(template) + sum(len(str(v)) for v in inputs.values())) // 2
+    est_tokens = prompt_tokens_est + LLM_COMPLETION_TOKENS_ESTIMATE
+    usage = UsageCallback()
+    report = {}
+    try:
+        response = await get_rate_limiter().call(
+            lambda: chain.ainvoke(inputs, config={"callbacks": [usage]}), est_tokens=est_tokens, report=report
+        )
+    except Exception:
+        get_metrics().record_call(0, 0, report.get("latency_s", 0.0), report.get("queue_wait_s", 0.0),
+                                  report.get("retries", 0), failed=True)
+        raise
+    # usage가 없는 LLM(로컬 대체 등)은 문자 수 기준 추정치 사용
+    prompt_tokens = usage.prompt_tokens if usage.found else prompt_tokens_est
+    completion_tokens = usage.completion_tokens if usage.found else len(str(response)) // 2
+    get_metrics().record_call(prompt_tokens, completion_tokens, report.get("latency_s", 0.0),
+                              report.get("queue_wait_s", 0.0), report.get("retries", 0))
+    if cache is not None:
+        cache.set(key, "raw", str(response))
+    return response
 
 def best_match_level(new_cate: str, surv_cate_list: list[str], threshold: float = 0.5):
+    """LLM 출력 카테고리를 surv_cate_list 중 가장 유사한 카테고리로 정규화. (카테고리 | None, 점수)
+
+    카테고리 목록별 사전 계산 정규화기(정확/별칭 일치 → 메모이즈된 유사도 매칭)를 재사용한다.
+    """
     if not new_cate or not surv_cate_list:
         return None, 0.0
-    new_norm = _normalize_label(new_cate)
-    best, best_score = None, 0.0
-    for ex in surv_cate_list:
-        score = difflib.SequenceMatcher(None, new_norm, _normalize_label(ex)).ratio()
-        if score > best_score:
-            best, best_score = ex, score
-    if best_score >= threshold:
-        return best, best_score
-    return None, best_score
-
-async def category_level1_async(state: GraphState):
-    categories = state.get('surv_cate', [])
-    surv_answ = state.get('surv_answ', pd.DataFrame())
-    results = []
-    batch_size = 1
-    n = len(surv_answ)
-
+    return get_canonicalizer(surv_cate_list).match(new_cate, threshold)
+
+_INDEXED_LINE_RE = re.compile(r"^\s*\[?(\d+)\]?[.)]?\s*")
+
+def parse_indexed_categories(response: str, n: int):
+    """배치 분류 응답을 답변 순서(1..n)에 맞춰 정렬한다.
+
+    - '<번호> Q: ... -> 분류: <카테고리>' 줄의 번호로 정렬 (번호가 1..n을 정확히 한 번씩 덮어야 함)
+    - 번호가 없으면 '분류:' 줄 수가 n과 같을 때만 순서대로 사용
+    - 정렬할 수 없으면 None (호출측에서 배치를 나눠 재시도)
+    """
+    lines = [ln for ln in str(response or "").splitlines() if '분류:' in ln]
+    by_index = {}
+    for ln in lines:
+        m = _INDEXED_LINE_RE.match(ln)
+        if not m:
+            by_index = None
+            break
+        idx = int(m.group(1))
+        if idx in by_index or not (1 <= idx <= n):
+            by_index = None
+            break
+        by_index[idx] = ln.split('분류:')[-1].strip()
+    if by_index is not None and len(by_index) == n:
+        return [by_index[i] for i in range(1, n + 1)]
+    if len(lines) == n:
+        return [ln.split('분류:')[-1].strip() for ln in lines]
+    return None
+
+def _one_line(answer) -> str:
+    # 줄 단위 정렬을 위해 답변 내부 줄바꿈/연속 공백은 공백 1개로 치환
+    return ' '.join(str(answer).split())
+
+async def classify_answers_async(chain, answers: list, input_vars: dict) -> list:
+    """답변 목록의 원문 카테고리(raw) 목록을 답변 순서대로 반환.
+
+    답변 단위 캐시(kind='category': 템플릿/모델/카테고리 목록/문항/답변 기준)를 먼저 찾고,
+    캐시에 없는 답변만 모아 배치로 분류한다.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return await _classify_batch_async(chain, answers, input_vars)
+    template = _chain_template(chain)
+    keys = [
+        cache_key("category", template=template, inputs=input_vars, answer=_one_line(a), **_llm_identity())
+        for a in answers
+    ]
+    found = [cache.get(k) for k in keys]
+    miss = [pos for pos, v in enumerate(found) if v is None]
+    get_metrics().record_cache_hits(len(found) - len(miss))
+    if miss:
+        fresh = await _classify_batch_async(chain, [answers[pos] for pos in miss], input_vars)
+        for pos, raw in zip(miss, fresh):
+            found[pos] = {"raw": raw}
+            if raw is not None:
+                cache.set(keys[pos], "category", found[pos])
+    return [v["raw"] for v in found]
+
+async def _classify_batch_async(chain, answers: list, input_vars: dict) -> list:
+    """답변 목록을 1회 호출로 분류하고 원문 카테고리(raw) 목록을 답변 순서대로 반환.
+
+    응답 줄을 답변에 정렬할 수 없으면 배치를 절반으로 나눠 재귀적으로 재시도한다.
+    답변 1건에서도 정렬이 안 되면 첫 '분류:' 줄을 사용한다 (없으면 None).
+    """
+    if not answers:
+        return []
+    answ_list_str = "\n".join(f"{i+1} Q: {_one_line(a)}" for i, a in enumerate(answers))
+    response = await ainvoke_llm(chain, {**input_vars, "answ_list": answ_list_str}, use_cache=False)
+    parsed = parse_indexed_categories(response, len(answers))
+    if parsed is not None:
+        return parsed
+    if len(answers) == 1:
+        lines = [ln for ln in str(response).split('\n') if '분류:' in ln]
+        return [lines[0].split('분류:')[-1].strip() if lines else None]
+    mid = len(answers) // 2
+    print(f"[CLS] 응답 줄 정렬 실패 → 배치 분할 재시도 ({len(answers)} → {mid}+{len(answers) - mid})")
+    left, right = await asyncio.gather(
+        _classify_batch_async(chain, answers[:mid], input_vars),
+        _classify_batch_async(chain, answers[mid:], input_vars),
+    )
+    return left + right
+
+_SENTIMENT_LABELS = ("긍정", "부정", "중립")
+_ENRICH_FIELDS = ("sentiment", "keywords", "summary")
+
+def _valid_sentiment(value) -> str | None:
+    if not isinstance(value, str):
+        return None
+    v = value.strip()
+    if v in _SENTIMENT_LABELS:
+        return v
+    hits = [label for label in _SENTIMENT_LABELS if label in v]
+    return hits[0] if len(hits) == 1 else None
+
+def _valid_keywords(value) -> str | None:
+    if isinstance(value, str):
+        parts = re.split(r'[,\u3001;/·、]', value)
+    elif isinstance(value, list):
+        parts = [p for p in value if isinstance(p, str)]
+    else:
+        return None
+    dedup = list(dict.fromkeys(p.strip() for p in parts if p and p.strip()))
+    return ", ".join(dedup) if dedup else None
+
+def _valid_summary(value) -> str | None:
+    if not isinstance(value, str):
+        return None
+    return value.strip() or None
+
+def parse_enrichment_response(response: str, n: int) -> list[dict]:
+    """통합 생성(ENRICHMENT_PROMPT) 응답을 답변 순서(1..n)의 {sentiment, keywords, summary} 목록으로 변환.
+
+    - JSON 배열(또는 {"results": [...]})을 id 기준으로 정렬하고, id가 없으면 개수가 n일 때만 순서대로 사용
+    - 항목별로 검증하여 유효하지 않은 값은 None (호출측에서 해당 항목만 개별 체인으로 재생성)
+    """
+    empty = [{f: None for f in _ENRICH_FIELDS} for _ in range(n)]
+    text = str(response or "")
+    start, end = text.find('['), text.rfind(']')
+    try:
+        data = json.loads(text[start:end + 1]) if 0 <= start < end else json.loads(text)
+    except Exception:
+        return empty
+    if isinstance(data, dict):
+        data = data.get("results")
+    if not isinstance(data, list):
+        return empty
+    items = [d for d in data if isinstance(d, dict)]
+
+    aligned: list = [None] * n
+    for d in items:
+        try:
+            idx = int(d.get("id"))
+        except Exception:
+            continue
+        if 1 <= idx <= n and aligned[idx - 1] is None:
+            aligned[idx - 1] = d
+    if all(a is None for a in aligned) and len(items) == n:
+        aligned = items
+
+    result = []
+    for d in aligned:
+        d = d or {}
+        result.append({
+            "sentiment": _valid_sentiment(d.get("sentiment")),
+            "keywords": _valid_keywords(d.get("keywords")),
+            "summary": _valid_summary(d.get("summary")),
+        })
+    return result
+
+def _classification_chain():
     prompt = PromptTemplate(
         input_variables=["main_ttl", "qsit_ttl", "categories", "answ_list"],
         template=CATEGORY_CLASSIFICATION_PROMPT
     )
-    chain = prompt | llm | parser
-
-    batches = []
-    for batch_start in range(0, n, batch_size):
-        batch = surv_answ.iloc[batch_start:batch_start + batch_size].copy()
-        answ_list_str = "\n".join([f"{i+1} Q: {row['answ_cntnt']}" for i, row in batch.iterrows()])
-        input_vars = {
-            "categories": ', '.join(categories) if categories else "기타 피드백",
-            "answ_list": answ_list_str,
-            "qsit_ttl": state.get('qsit_ttl', ''),
-            "main_ttl": state.get('main_ttl', '')
-        }
-        batches.append((batch.index.tolist(), input_vars, categories))
+    return prompt | llm | parser
 
-    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
-    lock = asyncio.Lock()
-
-    async def run_one(idx_list, input_vars, categories):
-        async with sem:
-            response = await chain.ainvoke(input_vars)
-            parsed_lines = [line for line in response.split('\n') if '분류:' in line]
-            batch_results = []
-            for i, idx in enumerate(idx_list):
-                raw_cat = parsed_lines[i].split('분류:')[-1].strip() if i < len(parsed_lines) else None
-                canon_cat, score = best_match_level(raw_cat, categories, threshold=0.5) if categories else (None, 0.0)
-                if canon_cat is None:
-                    canon_cat = "기타 피드백"
-                batch_results.append({
-                    **{col: surv_answ.at[idx, col] for col in surv_answ.columns if col in surv_answ},
-                    'category_level1_raw': raw_cat,
-                    'category_level1': canon_cat
-                })
-            async with lock:
-                results.extend(batch_results)
-
-    await asyncio.gather(*(run_one(idxs, inp, cats) for idxs, inp, cats in batches))
-    state['batch_results'] = results
-    return state
-
-async def category_level2_async(state: GraphState):
-    surv_answ = state.get('surv_answ', pd.DataFrame())
-    base_results = state.get('batch_results', [])
-    results = []
-    batch_size = 1
+# =========================
+# 단계별 처리기 (그래프 노드 / 스트리밍 파이프라인 공용)
+# - 입력: 응답 행(dict) 목록, 출력: 단계 결과 컬럼이 추가된 새 행 목록 (입력 순서 유지)
+# =========================
 
+def make_level1_classifier(state: GraphState):
+    """L1 분류기: rows → category_level1_raw / category_level1 추가."""
+    categories = state.get('surv_cate', [])
+    chain = _classification_chain()
+    input_vars = {
+        "categories": ', '.join(categories) if categories else "기타 피드백",
+        "qsit_ttl": state.get('qsit_ttl', ''),
+        "main_ttl": state.get('main_ttl', '')
+    }
+
+    async def classify_rows(rows: list[dict]) -> list[dict]:
+        raw_cats = await classify_answers_async(chain, [row.get('answ_cntnt') for row in rows], input_vars)
+        out = []
+        for row, raw_cat in zip(rows, raw_cats):
+            canon_cat, score = best_match_level(raw_cat, categories, threshold=0.5) if categories else (None, 0.0)
+            if canon_cat is None:
+                canon_cat = "기타 피드백"
+            out.append({**row, 'category_level1_raw': raw_cat, 'category_level1': canon_cat})
+        return out
+
+    return classify_rows
+
+def make_level2_classifier(state: GraphState):
+    """L2 분류기: (L1 값, 같은 L1의 rows) → category_level2_raw / category_level2 추가."""
     level2_map = state.get('level2_map', {})  # state에서 level2_map 가져오기
-
-    if not base_results:
-        return state
-
-    prompt = PromptTemplate(
-        input_variables=["main_ttl", "qsit_ttl", "categories", "answ_list"],
-        template=CATEGORY_CLASSIFICATION_PROMPT
-    )
-    chain = prompt | llm | parser
+    chain = _classification_chain()
 
     def fetch_level2_list(level1_value: str) -> list[str]:
         try:
@@ -128,68 +290,32 @@ async def category_level2_async(state: GraphState):
             print(f"[L2] category_level2 조회 실패: L1='{level1_value}', err={e}")
             return []
 
-    groups = {}
-    for i, row in enumerate(base_results):
-        l1_value = row.get("category_level1", "기타 피드백")
-        groups.setdefault(l1_value, []).append(i)
-
-    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
-    lock = asyncio.Lock()
-    tasks = []
-
-    async def run_group(l1_value: str, idxs: list[int]):
+    async def classify_rows(l1_value: str, rows: list[dict]) -> list[dict]:
         categories = fetch_level2_list(l1_value)
         if not categories:
-            async with lock:
-                for idx in idxs:
-                    base_results[idx]["category_level2_raw"] = None
-                    base_results[idx]["category_level2"] = "기타 피드백"
-                    results.append(base_results[idx])
-            return
-
-        for batch_start in range(0, len(idxs), batch_size):
-            batch_idxs = idxs[batch_start:batch_start + batch_size]
-            answ_list_str = "\n".join([f"{i+1} Q: {base_results[idx].get('answ_cntnt','')}" for i, idx in enumerate(batch_idxs)])
-            input_vars = {
-                "categories": ', '.join(categories),
-                "answ_list": answ_list_str,
-                "qsit_ttl": state.get('qsit_ttl', ''),
-                "main_ttl": state.get('main_ttl', '')
-            }
-
-            async with sem:
-                resp = await chain.ainvoke(input_vars)
-                parsed_lines = [ln for ln in str(resp).splitlines() if '분류:' in ln]
-                parsed = [ln.split('분류:')[-1].strip() for ln in parsed_lines]
-
-                updates = []
-                for off, idx in enumerate(batch_idxs):
-                    raw_cat = parsed[off] if off < len(parsed) else None
-                    canon_cat, score = best_match_level(raw_cat, categories, threshold=0.5)
-                    if canon_cat is None:
-                        canon_cat = "기타 피드백"
-                    updates.append((idx, raw_cat, canon_cat))
-
-                async with lock:
-                    for idx, raw, canon in updates:
-                        base_results[idx]["category_level2_raw"] = raw
-                        base_results[idx]["category_level2"] = canon
-                        results.append(base_results[idx])
-
-    for l1, idxs in groups.items():
-        tasks.append(run_group(l1, idxs))
-
-    await asyncio.gather(*tasks)
-
-    state['batch_results'] = results
-    return state
-
-
-async def sentiment_and_keywords_async(state: GraphState):
-
-    surv_answ = state.get('surv_answ', pd.DataFrame())
-    base_results = state.get('batch_results', [])
+            return [{**row, "category_level2_raw": None, "category_level2": "기타 피드백"} for row in rows]
 
+        input_vars = {
+            "categories": ', '.join(categories),
+            "qsit_ttl": state.get('qsit_ttl', ''),
+            "main_ttl": state.get('main_ttl', '')
+        }
+        parsed = await classify_answers_async(chain, [row.get('answ_cntnt', '') for row in rows], input_vars)
+        out = []
+        for row, raw_cat in zip(rows, parsed):
+            canon_cat, score = best_match_level(raw_cat, categories, threshold=0.5)
+            if canon_cat is None:
+                canon_cat = "기타 피드백"
+            out.append({**row, "category_level2_raw": raw_cat, "category_level2": canon_cat})
+        return out
+
+    return classify_rows
+
+def make_enricher(state: GraphState):
+    """감성/키워드/요약 생성기. (enrich_rows(rows) → sentiment/keywords/summary 추가, print_stats()) 를 반환.
+
+    enrich_rows 1회 호출이 combined 모드의 통합 호출 1회 단위다 (호출측에서 enrich_batch_size로 나눠 전달).
+    """
     sentiment_chain = PromptTemplate(
         input_variables=["answer"],
         template=SENTIMENT_CLASSIFICATION_PROMPT
@@ -205,18 +331,23 @@ async def sentiment_and_keywords_async(state: GraphState):
         template=SUMMARY_PROMPT
     ) | llm | parser
 
-    results = []
-    batch_size = 1
-    n = len(base_results)
+    enrich_chain = PromptTemplate(
+        input_variables=["main_ttl", "qsit_ttl", "answ_list"],
+        template=ENRICHMENT_PROMPT
+    ) | llm | parser
 
-    batches = []
-    for batch_start in range(0, n, batch_size):
-        batch_end = min(batch_start + batch_size, n)
-        idx_list = list(range(batch_start, batch_end))
-        batches.append((batch_start, idx_list))
+    # combined: 답변 여러 건을 JSON 통합 1회 호출로 생성, 검증 실패 항목만 개별 체인으로 재생성
+    enrich_mode = state.get('enrich_mode') or ENRICH_MODE
 
-    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
-    lock = asyncio.Lock()
+    # 키워드 추출 백엔드: local이면 규칙/사전 기반 추출을 먼저 시도하고, 추출 불가 응답만 LLM 호출
+    keyword_backend = state.get('keyword_backend') or KEYWORD_BACKEND
+    extractor = None
+    if keyword_backend == "local":
+        extractor = state.get('keyword_extractor')
+        if extractor is None:
+            extractor = KoreanKeywordExtractor(build_keyword_dictionary(state.get('level2_map', {})))
+    keyword_stats = {"local": 0, "llm": 0}
+    enrich_stats = {"combined_calls": 0, "fallback_fields": 0}
 
     def parse_sentiment(text: str) -> str | None:
         if not text:
@@ -247,41 +378,192 @@ async def sentiment_and_keywords_async(state: GraphState):
                 dedup.append(t)
         return ", ".join(dedup) if dedup else None    
 
-    async def run_one(batch_start, idx_list):
-        async with sem:
-            batch_no = (batch_start // batch_size) + 1
-            batch_results = []
-            for i in idx_list:
-                base = base_results[i]
-                ans = base.get('answ_cntnt')
-                if ans is None and i < len(surv_answ):
-                    ans = surv_answ.iloc[i]['answ_cntnt']
-
-                if ans is None or not str(ans).strip():
-                    s_val, k_val, sum_val = None, None, None
-                else:
-                    s_raw = await sentiment_chain.ainvoke({"answer": ans})
-                    await asyncio.sleep(0.5)
-                    k_raw = await keyword_chain.ainvoke({"answer": ans})
-                    await asyncio.sleep(0.5)
-                    sum_raw = await summary_chain.ainvoke({"answer": ans}) 
-                    await asyncio.sleep(0.5)
-
-                    s_val = parse_sentiment(s_raw)
-                    k_val = parse_keywords(k_raw)
-                    sum_val = str(sum_raw).strip() or None
-
-                row = {
-                    **base,
-                    "sentiment": s_val,
-                    "keywords": k_val,
-                    "summary": sum_val
-                }
-                batch_results.append(row)
-
-            async with lock:
-                results.extend(batch_results)
-
-    await asyncio.gather(*(run_one(bs, idxs) for bs, idxs in batches))
+    async def enrich_separately(ans, fields: list[str]) -> dict:
+        """항목별 개별 체인 호출 (separate 모드 또는 통합 응답 검증 실패 항목)."""
+        out = {}
+        if "sentiment" in fields:
+            s_raw = await ainvoke_llm(sentiment_chain, {"answer": ans})
+            out["sentiment"] = parse_sentiment(s_raw)
+        if "keywords" in fields:
+            k_raw = await ainvoke_llm(keyword_chain, {"answer": ans})
+            out["keywords"] = parse_keywords(k_raw)
+        if "summary" in fields:
+            sum_raw = await ainvoke_llm(summary_chain, {"answer": ans})
+            out["summary"] = str(sum_raw).strip() or None
+        return out
+
+    async def enrich_rows(rows: list[dict]) -> list[dict]:
+        answers = {}
+        for i, row in enumerate(rows):
+            ans = row.get('answ_cntnt')
+            if ans is not None and str(ans).strip():
+                answers[i] = ans
+
+        enriched = {i: {} for i in answers}
+        local_keywords = set()
+        if extractor is not None:
+            for i, ans in answers.items():
+                k_val = extractor.extract_text(ans)
+                if k_val is not None:
+                    enriched[i]["keywords"] = k_val
+                    local_keywords.add(i)
+                    keyword_stats["local"] += 1
+
+        # combined 모드 답변 단위 캐시 (kind='enrich'): 적중 항목은 통합 호출/개별 체인 모두 생략
+        cache = get_llm_cache() if enrich_mode == "combined" else None
+        cache_keys = {}
+        if cache is not None:
+            for i, ans in answers.items():
+                cache_keys[i] = cache_key(
+                    "enrich", template=ENRICHMENT_PROMPT, answer=_one_line(ans),
+                    qsit_ttl=state.get('qsit_ttl', ''), main_ttl=state.get('main_ttl', ''), **_llm_identity()
+                )
+                cached = cache.get(cache_keys[i])
+                if cached is not None:
+                    get_metrics().record_cache_hits(1)
+                for field, value in (cached or {}).items():
+                    if value is not None and field not in enriched[i]:
+                        enriched[i][field] = value
+            cache_keys = {i: k for i, k in cache_keys.items() if any(f not in enriched[i] for f in _ENRICH_FIELDS)}
+
+        order = [i for i in answers if any(f not in enriched[i] for f in _ENRICH_FIELDS)]
+        if enrich_mode == "combined" and order:
+            answ_list_str = "\n".join(f"{pos+1} Q: {_one_line(answers[i])}" for pos, i in enumerate(order))
+            raw = await ainvoke_llm(enrich_chain, {
+                "answ_list": answ_list_str,
+                "qsit_ttl": state.get('qsit_ttl', ''),
+                "main_ttl": state.get('main_ttl', '')
+            }, use_cache=False)
+            enrich_stats["combined_calls"] += 1
+            for i, item in zip(order, parse_enrichment_response(raw, len(order))):
+                for field, value in item.items():
+                    if value is not None and field not in enriched[i]:
+                        enriched[i][field] = value
+                        if field == "keywords":
+                            keyword_stats["llm"] += 1
+
+        # 누락 항목은 개별 체인으로 생성 (답변끼리는 동시에, 호출 수는 공용 속도 제한기가 관리)
+        async def fill_missing(i, missing):
+            enriched[i].update(await enrich_separately(answers[i], missing))
+
+        fallback = {}
+        for i in answers:
+            missing = [f for f in _ENRICH_FIELDS if enriched[i].get(f) is None]
+            if not missing:
+                continue
+            fallback[i] = missing
+            if enrich_mode == "combined":
+                enrich_stats["fallback_fields"] += len(missing)
+            if "keywords" in missing:
+                keyword_stats["llm"] += 1
+        await asyncio.gather(*(fill_missing(i, missing) for i, missing in fallback.items()))
+
+        if cache is not None:
+            for i, key in cache_keys.items():
+                value = {f: enriched[i].get(f) for f in _ENRICH_FIELDS if not (f == "keywords" and i in local_keywords)}
+                if any(v is not None for v in value.values()):
+                    cache.set(key, "enrich", value)
+
+        out = []
+        for i, row in enumerate(rows):
+            e = enriched.get(i, {})
+            out.append({
+                **row,
+                "sentiment": e.get("sentiment"),
+                "keywords": e.get("keywords"),
+                "summary": e.get("summary")
+            })
+        return out
+
+    def print_stats():
+        if extractor is not None:
+            print(f"[KW] 로컬 키워드 추출 {keyword_stats['local']}건 / LLM 폴백 {keyword_stats['llm']}건")
+        if enrich_mode == "combined":
+            print(f"[ENRICH] 통합 호출 {enrich_stats['combined_calls']}회 / 개별 체인 폴백 {enrich_stats['fallback_fields']}개 항목")
+
+    return enrich_rows, print_stats
+
+def get_enrich_batch_size(state: GraphState) -> int:
+    """enrich_rows 1회 호출당 답변 수 (separate 모드는 1)."""
+    if (state.get('enrich_mode') or ENRICH_MODE) != "combined":
+        return 1
+    return max(1, int(state.get('enrich_batch_size') or ENRICH_BATCH_SIZE))
+
+# =========================
+# 그래프 노드 (단계별 배리어: 문항 전체 응답이 한 단계를 마친 뒤 다음 단계 진행)
+# =========================
+
+async def category_level1_async(state: GraphState):
+    results = []
+    batch_size = max(1, int(state.get('classify_batch_size') or CLASSIFY_BATCH_SIZE))
+    classify_rows = make_level1_classifier(state)
+
+    rows = answers_from_state(state)
+    lock = asyncio.Lock()
+
+    async def run_one(batch):
+        batch_results = await classify_rows(batch)
+        async with lock:
+            results.extend(batch_results)
+
+    await asyncio.gather(*(
+        run_one(rows[batch_start:batch_start + batch_size])
+        for batch_start in range(0, len(rows), batch_size)
+    ))
     state['batch_results'] = results
-    return state
\ No newline at end of file
+    return state
+
+async def category_level2_async(state: GraphState):
+    base_results = state.get('batch_results', [])
+    results = []
+    batch_size = max(1, int(state.get('classify_batch_size') or CLASSIFY_BATCH_SIZE))
+
+    if not base_results:
+        return state
+
+    classify_rows = make_level2_classifier(state)
+
+    groups = {}
+    for row in base_results:
+        l1_value = row.get("category_level1", "기타 피드백")
+        groups.setdefault(l1_value, []).append(row)
+
+    lock = asyncio.Lock()
+
+    async def run_batch(l1_value: str, batch: list[dict]):
+        updates = await classify_rows(l1_value, batch)
+        async with lock:
+            results.extend(updates)
+
+    await asyncio.gather(*(
+        run_batch(l1, rows[batch_start:batch_start + batch_size])
+        for l1, rows in groups.items()
+        for batch_start in range(0, len(rows), batch_size)
+    ))
+
+    state['batch_results'] = results
+    return state
+
+
+async def sentiment_and_keywords_async(state: GraphState):
+
+    base_results = state.get('batch_results', [])
+    enrich_rows, print_stats = make_enricher(state)
+
+    results = []
+    batch_size = get_enrich_batch_size(state)
+    lock = asyncio.Lock()
+
+    async def run_one(batch):
+        batch_results = await enrich_rows(batch)
+        checkpoint_rows(state, batch_results)
+        async with lock:
+            results.extend(batch_results)
+
+    await asyncio.gather(*(
+        run_one(base_results[batch_start:batch_start + batch_size])
+        for batch_start in range(0, len(base_results), batch_size)
+    ))
+    print_stats()
+    state['batch_results'] = results
+    return state
@@ -0,0 +1,111 @@
+import re
+import math
+import unicodedata
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from src.core.records import ROW_KEY
+from src.constants import *
+
+# =========================
+# 응답 중복 제거 (그래프 실행 전 단계)
+# - 공백/문장부호/대소문자를 정규화한 텍스트 기준으로 문항 내 중복 응답을 묶고
+#   대표 응답 1건만 그래프(L1/L2 분류, 감성/키워드/요약)로 보낸 뒤 결과를 모든 행에 복제
+# - 그래프는 문항 단위로 실행되므로 중복 판정 범위도 문항(main_ttl/qsit_ttl) 단위
+# =========================
+
+_DEDUP_ID_COL = "_dedup_id"
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_answer(text) -> str:
+    """중복 판정용 정규화: NFKC + 소문자 + 문장부호 제거 + 연속 공백 1개로 축약.
+
+    문장부호만 있는 응답('.', '!!')은 정규화하면 빈 문자열이 되므로 원문(앞뒤 공백 제거)을 키로 사용한다.
+    """
+    raw = unicodedata.normalize("NFKC", str(text if text is not None else "")).strip()
+    key = " ".join(_PUNCT_RE.sub(" ", raw.lower()).replace("_", " ").split())
+    return key or raw
+
+
+def dedup_answers(surv_answ: pd.DataFrame, col: str = "answ_cntnt") -> Tuple[pd.DataFrame, Dict[int, List]]:
+    """정규화 텍스트가 같은 응답을 묶어 대표 행(첫 등장 행)만 남긴 DataFrame과 그룹 정보를 반환.
+
+    - 반환 DataFrame에는 대표 행 식별용 `_dedup_id` 컬럼이 추가된다
+    - groups: {_dedup_id: [원본 인덱스, ...]} (원본 행 순서 유지)
+    """
+    if surv_answ is None or len(surv_answ) == 0:
+        return surv_answ, {}
+    keys = surv_answ[col].map(normalize_answer)
+    group_ids = pd.factorize(keys)[0]
+    groups: Dict[int, List] = {}
+    for idx, gid in zip(surv_answ.index, group_ids):
+        groups.setdefault(int(gid), []).append(idx)
+    first_rows = [members[0] for members in groups.values()]
+    unique = surv_answ.loc[first_rows].copy()
+    unique[_DEDUP_ID_COL] = list(groups.keys())
+    return unique, groups
+
+
+def fan_out_results(results: List[dict], groups: Dict[int, List], surv_answ: pd.DataFrame) -> List[dict]:
+    """대표 응답의 결과를 그룹 내 모든 원본 행으로 복제 (원본 행의 응답 컬럼은 원본 값 유지, 원본 행 순서)."""
+    by_group = {}
+    for row in results:
+        row = dict(row)
+        gid = row.pop(_DEDUP_ID_COL, None)
+        row.pop(ROW_KEY, None)
+        if gid is not None:
+            by_group[int(gid)] = row
+    records = surv_answ.to_dict("records")
+    owner = {idx: gid for gid, members in groups.items() for idx in members}
+    expanded = []
+    for idx, wide in zip(surv_answ.index, records):
+        base = by_group.get(owner.get(idx))
+        if base is None:
+            continue
+        row = dict(wide)
+        for k, v in base.items():
+            row.setdefault(k, v)
+        expanded.append(row)
+    return expanded
+
+
+def _estimated_calls(n: int, classify_batch_size: int, enrich_mode: str, enrich_batch_size: int) -> int:
+    # L1/L2 배치 분류 + (combined: 배치 통합 호출, separate: 답변당 3회) 기준 추정치
+    if n <= 0:
+        return 0
+    calls = 2 * math.ceil(n / classify_batch_size)
+    calls += math.ceil(n / enrich_batch_size) if enrich_mode == "combined" else 3 * n
+    return calls
+
+
+def dedup_stats(n_rows: int, n_unique: int, state: dict) -> dict:
+    """중복 제거 통계: 행 수/고유 응답 수/중복 비율/LLM 입력 절감 건수/호출 절감 추정치."""
+    classify_bs = max(1, int(state.get("classify_batch_size") or CLASSIFY_BATCH_SIZE))
+    enrich_mode = state.get("enrich_mode") or ENRICH_MODE
+    enrich_bs = max(1, int(state.get("enrich_batch_size") or ENRICH_BATCH_SIZE))
+    return {
+        "rows": n_rows,
+        "unique": n_unique,
+        "dedup_ratio": round(1 - n_unique / n_rows, 4) if n_rows else 0.0,
+        "answers_saved": n_rows - n_unique,
+        "calls_saved": _estimated_calls(n_rows, classify_bs, enrich_mode, enrich_bs)
+        - _estimated_calls(n_unique, classify_bs, enrich_mode, enrich_bs),
+    }
+
+
+def merge_dedup_stats(total: dict, stats: dict) -> dict:
+    """문항별 통계를 실행 전체 통계로 누적."""
+    for k in ("rows", "unique", "answers_saved", "calls_saved"):
+        total[k] = total.get(k, 0) + stats.get(k, 0)
+    total["dedup_ratio"] = round(1 - total["unique"] / total["rows"], 4) if total.get("rows") else 0.0
+    return total
+
+
+def format_dedup_stats(stats: dict) -> str:
+    return (
+        f"응답 {stats.get('rows', 0)}건 → 고유 {stats.get('unique', 0)}건 "
+        f"(중복 {stats.get('dedup_ratio', 0.0) * 100:.1f}%), "
+        f"LLM 입력 {stats.get('answers_saved', 0)}건 / 호출 약 {stats.get('calls_saved', 0)}회 절감"
+    )
@@ -0,0 +1,164 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.constants import *
+
+# =========================
+# 로컬 키워드 추출기 (LLM 미사용 경로)
+# - 규칙/사전 기반 한국어 명사 추출: 조사·어미 제거 + 도메인 사전 우선
+# - 추출 불가(후보 없음) 응답은 None을 반환하여 호출측에서 LLM 경로로 처리
+# =========================
+
+_TOKEN_RE = re.compile(r"[가-힣A-Za-z0-9]+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+# 조사 (긴 것부터 매칭)
+_PARTICLES = sorted([
+    "에서는", "에서도", "으로는", "으로도", "에게서", "한테서", "이라도", "이라서", "이라는", "이라고",
+    "에서", "에게", "한테", "으로", "까지", "부터", "보다", "처럼", "마다", "이나", "이랑", "하고",
+    "에는", "에도", "로는", "로도", "라도", "라서", "라는", "라고", "만큼", "밖에",
+    "은", "는", "이", "가", "을", "를", "에", "의", "도", "만", "로", "와", "과", "랑",
+], key=len, reverse=True)
+
+# 용언 어미: "편리해요" → "편리", "불편했습니다" → "불편"
+_PREDICATE_SUFFIXES = sorted([
+    "했으면좋겠어요", "했으면좋겠습니다", "했으면", "하면좋겠어요", "하면좋겠습니다",
+    "했습니다", "했어요", "했네요", "합니다", "해요", "해서", "해도", "하고", "하게", "하지", "하며",
+    "하면", "하네요", "한데", "한", "할", "함", "해", "했", "하다",
+    "됩니다", "됐어요", "되어요", "돼요", "되고", "되서", "돼서", "되면", "되는", "된", "될", "됨", "되다",
+    "스럽습니다", "스러워요", "스럽고", "스러운", "스럽다",
+], key=len, reverse=True)
+
+# 용언/관형어/부사 어미: 조사 제거가 일어나지 않은 어절이 이 어미로 끝나면 후보에서 제외
+# (예: '빨라요', '좋습니다', '있는', '빠르게', '조용히', '높았으면')
+_VERB_ENDINGS = (
+    "요", "다", "죠", "는", "은", "던", "운", "게", "히", "면", "지만", "는데", "니까", "면서", "어서", "아서",
+)
+
+_STOPWORDS = {
+    "있는", "없는", "같은", "좋은", "많은", "하는", "되는",
+    "정말", "너무", "그냥", "조금", "많이", "자주", "빨리", "제일", "가장", "아주", "매우", "진짜", "항상", "계속", "다시", "모두", "모든",
+    "이번", "그리고", "그런데", "하지만", "그래서", "때문", "부분", "생각", "느낌", "경우", "정도",
+    "없음", "없습니다", "없어요", "있음", "있습니다", "있어요", "같아요", "좋겠어요", "좋겠습니다",
+    "감사", "수고", "이용", "사용", "것", "거", "수", "등", "좀", "잘", "안", "못", "더", "또",
+}
+
+
+def _strip_particle(token: str, dictionary: Optional[set] = None) -> str:
+    """어절 끝 조사를 1회 제거 (남는 어간이 2글자 이상이거나 사전 단어일 때만)."""
+    for p in _PARTICLES:
+        if token.endswith(p) and len(token) > len(p):
+            stem = token[: -len(p)]
+            if len(stem) >= 2 or (dictionary and stem in dictionary):
+                return stem
+    return token
+
+
+def _strip_predicate(token: str) -> Optional[str]:
+    """'명사+하다/되다/스럽다' 활용형에서 명사 어간을 반환. 해당 없으면 None."""
+    for suf in _PREDICATE_SUFFIXES:
+        if token.endswith(suf) and len(token) - len(suf) >= 2:
+            return token[: -len(suf)]
+    return None
+
+
+def _split_words(text: str) -> List[str]:
+    return [w.strip() for w in re.split(r"[,\n/·、;|]+", str(text or "")) if w and w.strip()]
+
+
+class KoreanKeywordExtractor:
+    """규칙/사전 기반 한국어 키워드(명사) 추출기.
+
+    - 어절 단위로 조사를 제거하고, '명사+하다/되다' 활용형은 명사 어간만 남긴다
+    - 도메인 사전(category.csv 카테고리명 + 과거 LLM 키워드)에 있는 단어와
+      사전 단어를 포함한 복합어(예: '예금금리가' → '예금금리')를 우선 선택한다
+    - 후보가 하나도 없으면 None (호출측에서 LLM 추출로 폴백)
+    """
+
+    def __init__(self, dictionary: Optional[Iterable[str]] = None, max_keywords: int = 3):
+        self.max_keywords = max_keywords
+        self.dictionary = set()
+        for term in dictionary or []:
+            term = str(term).strip()
+            if term and term not in _STOPWORDS and term not in SUBJECTIVE_EXCLUDE_KEYWORDS:
+                self.dictionary.add(term)
+        # 어절 → (명사, 사전 우선 여부) 캐시. 응답 간 반복되는 어절은 한 번만 분석
+        self._token_cache: Dict[str, Optional[tuple]] = {}
+
+    def _normalize_token(self, token: str) -> Optional[str]:
+        if token in self.dictionary:
+            return token
+        stem = _strip_predicate(token)
+        if stem is not None:
+            return stem
+        stripped = _strip_particle(token, self.dictionary)
+        if stripped in self.dictionary:
+            return stripped
+        if stripped == token and token.endswith(_VERB_ENDINGS):
+            return None
+        return stripped
+
+    def _contains_dictionary_term(self, token: str) -> bool:
+        n = len(token)
+        for size in range(n - 1, 1, -1):
+            for i in range(0, n - size + 1):
+                if token[i:i + size] in self.dictionary:
+                    return True
+        return False
+
+    def _analyze_token(self, token: str) -> Optional[tuple]:
+        """어절 → (명사, 사전 우선 여부). 후보가 아니면 None."""
+        if token in self._token_cache:
+            return self._token_cache[token]
+        result = None
+        noun = None if token.isdigit() else self._normalize_token(token)
+        if noun is not None:
+            in_dict = noun in self.dictionary
+            if not ((len(noun) < 2 and not in_dict) or noun in _STOPWORDS or noun in SUBJECTIVE_EXCLUDE_KEYWORDS):
+                result = (noun, in_dict or self._contains_dictionary_term(noun))
+        if len(self._token_cache) < 200000:
+            self._token_cache[token] = result
+        return result
+
+    def extract(self, answer: Optional[str]) -> Optional[List[str]]:
+        """응답에서 키워드를 최대 max_keywords개 추출. 추출 불가 시 None."""
+        text = str(answer or "").strip()
+        if not text or not _HANGUL_RE.search(text):
+            return None
+        dict_hits: List[str] = []
+        others: List[str] = []
+        for token in _TOKEN_RE.findall(text):
+            analyzed = self._analyze_token(token)
+            if analyzed is None:
+                continue
+            noun, preferred = analyzed
+            if noun not in dict_hits and noun not in others:
+                (dict_hits if preferred else others).append(noun)
+        keywords = (dict_hits + others)[: self.max_keywords]
+        return keywords or None
+
+    def extract_text(self, answer: Optional[str]) -> Optional[str]:
+        """extract 결과를 LLM 키워드 출력과 같은 'kw1, kw2, kw3' 문자열로 반환."""
+        keywords = self.extract(answer)
+        return ", ".join(keywords) if keywords else None
+
+
+def build_keyword_dictionary(category_map: Optional[Dict[str, List[str]]] = None, past_keywords_file: Optional[str] = None) -> List[str]:
+    """도메인 사전 구성: category.csv 카테고리명(l_cate/m_cate)의 단어 + 과거 LLM 키워드(`keywords` 컬럼)."""
+    terms: List[str] = []
+    for l_cate, m_cates in (category_map or {}).items():
+        for name in [l_cate] + list(m_cates or []):
+            for word in _TOKEN_RE.findall(str(name)):
+                terms.append(_strip_particle(word))
+    if past_keywords_file and os.path.exists(past_keywords_file):
+        try:
+            df = pd.read_csv(past_keywords_file, usecols=["keywords"], dtype=str).fillna("")
+            for value in df["keywords"].tolist():
+                terms.extend(_split_words(value))
+        except Exception as e:
+            print(f"[ERROR] 과거 키워드 파일 로드 실패: {past_keywords_file}, err={e}")
+    # 순서 보존 중복 제거
+    return list(dict.fromkeys(t for t in terms if t))
@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from typing import Any, Optional
+
+from src.constants import *
+
+# =========================
+# LLM 결과 영구 캐시 (SQLite)
+# - 키: hash(종류, 프롬프트 템플릿, 모델, temperature, 카테고리/문항/답변 등 입력)
+# - 값: JSON 직렬화 결과 (원문 응답 또는 답변 단위 파싱 결과)
+# - TTL(생성 후 LLM_CACHE_TTL_DAYS일) 초과 항목은 미사용/삭제, 항목 수가 LLM_CACHE_MAX_ENTRIES를 넘으면
+#   마지막 사용 시각이 오래된 순으로 삭제
+# - category.csv가 바뀌면 카테고리 분류 결과(kind='category')를 무효화
+# =========================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_kind ON llm_cache(kind);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access);
+CREATE TABLE IF NOT EXISTS llm_cache_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def cache_key(kind: str, **parts: Any) -> str:
+    """종류 + 구성요소(템플릿/모델/temperature/입력 등)의 SHA-256 키."""
+    payload = json.dumps({"kind": kind, **parts}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """파일 내용의 SHA-256 (파일이 없으면 None)."""
+    if not path or not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LLMCache:
+    """SQLite 기반 LLM 결과 캐시. hit/miss/write/evict 통계를 함께 집계한다."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_days: float = LLM_CACHE_TTL_DAYS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_s = float(ttl_days) * 86400 if ttl_days else 0.0
+        self.max_entries = int(max_entries or 0)
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self.evict()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_s) and now - created_at > self.ttl_s
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or self._expired(row[1], now):
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        self._maybe_commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, kind: str, value: Any) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, kind, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, kind, json.dumps(value, ensure_ascii=False), now, now),
+        )
+        self._stats["writes"] += 1
+        self._maybe_commit()
+
+    def _maybe_commit(self) -> None:
+        # 매 건 fsync를 피하기 위해 일정 건수마다 커밋
+        self._pending += 1
+        if self._pending >= 200:
+            self.flush()
+
+    def flush(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def evict(self) -> int:
+        """TTL 초과 항목 삭제 + 최대 항목 수 초과분을 오래 사용하지 않은 순으로 삭제. 삭제 건수를 반환."""
+        removed = 0
+        if self.ttl_s:
+            cur = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_s,))
+            removed += cur.rowcount or 0
+        if self.max_entries > 0:
+            total = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = total - self.max_entries
+            if overflow > 0:
+                cur = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                removed += cur.rowcount or 0
+        self._stats["evictions"] += removed
+        self.flush()
+        return removed
+
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """kind 항목(없으면 전체) 삭제. 삭제 건수를 반환."""
+        if kind:
+            cur = self._conn.execute("DELETE FROM llm_cache WHERE kind = ?", (kind,))
+        else:
+            cur = self._conn.execute("DELETE FROM llm_cache")
+        self.flush()
+        return cur.rowcount or 0
+
+    def sync_category_fingerprint(self, category_file: str) -> int:
+        """category.csv 내용이 이전 실행과 다르면 카테고리 분류 결과를 무효화. 삭제 건수를 반환."""
+        fp = file_fingerprint(category_file)
+        if fp is None:
+            return 0
+        row = self._conn.execute("SELECT value FROM llm_cache_meta WHERE name = 'category_fingerprint'").fetchone()
+        removed = 0
+        if row is not None and row[0] != fp:
+            removed = self.invalidate("category")
+            print(f"[CACHE] category.csv 변경 감지 → 카테고리 분류 캐시 {removed}건 무효화")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache_meta (name, value) VALUES ('category_fingerprint', ?)", (fp,)
+        )
+        self.flush()
+        return removed
+
+    def count(self, kind: Optional[str] = None) -> int:
+        if kind:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache WHERE kind = ?", (kind,)).fetchone()[0]
+        return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        return s
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return f"hit {s['hits']} / miss {s['misses']} (hit율 {s['hit_rate'] * 100:.1f}%), 저장 {s['writes']}건, 삭제 {s['evictions']}건"
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+_shared_cache: Optional[LLMCache] = None
+_cache_enabled: Optional[bool] = None  # None이면 LLM_CACHE_ENABLED 사용
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """그래프 전체가 공유하는 캐시 (LLM_CACHE_ENABLED=False면 None)."""
+    global _shared_cache
+    if not (LLM_CACHE_ENABLED if _cache_enabled is None else _cache_enabled):
+        return None
+    if _shared_cache is None:
+        _shared_cache = LLMCache()
+    return _shared_cache
+
+
+def set_llm_cache(cache: Optional[LLMCache]) -> None:
+    """공유 캐시 교체 (경로를 바꿔 실행하거나 테스트에서 사용)."""
+    global _shared_cache
+    _shared_cache = cache
+
+
+def set_llm_cache_enabled(enabled: Optional[bool]) -> None:
+    """실행 중 캐시 사용 여부 변경 (부하 테스트 등, None이면 LLM_CACHE_ENABLED로 복귀)."""
+    global _cache_enabled
+    _cache_enabled = enabled
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="LLM 결과 캐시 관리")
+    parser.add_argument("--path", default=LLM_CACHE_PATH, help="캐시 SQLite 파일 경로")
+    parser.add_argument("command", choices=["stats", "evict", "invalidate"],
+                        help="stats: 항목 수 출력 / evict: TTL·크기 기준 정리 / invalidate: 항목 삭제")
+    parser.add_argument("--kind", default=None,
+                        help="invalidate 대상 종류 (category: 카테고리 분류, enrich: 감성/키워드/요약, raw: 개별 체인 응답). 없으면 전체")
+    args = parser.parse_args()
+
+    cache = LLMCache(args.path)
+    if args.command == "stats":
+        for kind in ("category", "enrich", "raw"):
+            print(f"[INFO] {kind}: {cache.count(kind)}건")
+        print(f"[INFO] 전체: {cache.count()}건")
+    elif args.command == "evict":
+        print(f"[INFO] {cache.evict()}건 삭제")
+    else:
+        print(f"[INFO] {args.kind or '전체'} {cache.invalidate(args.kind)}건 삭제")
+    cache.close()
+    return 0
+
+
+# python -m src.core.llm_cache invalidate --kind category
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import functools
+import contextvars
+from typing import Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.constants import *
+
+# =========================
+# 파이프라인 계측 (노드/문항/설문별 LLM 호출 지표)
+# - ainvoke_llm 호출마다: 프롬프트/응답 토큰(실제 usage, 없으면 추정), 호출 시간, 속도 제한기 대기 시간,
+#   재시도 횟수, 실패, 캐시 적중, 비용(LLM_PRICE_PER_1K_*)
+# - 현재 노드/문항은 contextvars로 전달 (instrument_node 래퍼, 스트리밍 단계는 set_current_node)
+# - 실행 종료 후 JSON 요약(write_json)과 Prometheus 텍스트 파일(write_prometheus) 출력
+# =========================
+
+_current_node: contextvars.ContextVar = contextvars.ContextVar("metrics_node", default="unknown")
+_current_question: contextvars.ContextVar = contextvars.ContextVar("metrics_question", default=("", 0))
+
+_COUNTERS = (
+    "calls", "cache_hits", "failures", "retries",
+    "prompt_tokens", "completion_tokens", "cost_usd", "llm_time_s", "queue_wait_s", "node_time_s",
+)
+
+
+def _empty() -> dict:
+    return {k: 0 for k in _COUNTERS}
+
+
+def _add(target: dict, values: dict) -> None:
+    for k, v in values.items():
+        target[k] = target.get(k, 0) + v
+
+
+def _rounded(values: dict) -> dict:
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in values.items()}
+
+
+class UsageCallback(BaseCallbackHandler):
+    """체인 실행 중 LLM 응답의 토큰 사용량(usage) 수집."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.found = False
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        if usage:
+            self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.completion_tokens += int(usage.get("completion_tokens") or 0)
+            self.found = True
+            return
+        for gens in getattr(response, "generations", None) or []:
+            for gen in gens:
+                meta = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                if meta:
+                    self.prompt_tokens += int(meta.get("input_tokens") or 0)
+                    self.completion_tokens += int(meta.get("output_tokens") or 0)
+                    self.found = True
+
+
+class PipelineMetrics:
+    """(surv_id, qsit_sqn, node) 단위 누적 지표. 노드/문항/설문/전체 집계는 summary()에서 계산."""
+
+    def __init__(self, price_prompt_per_1k: float = LLM_PRICE_PER_1K_PROMPT_TOKENS,
+                 price_completion_per_1k: float = LLM_PRICE_PER_1K_COMPLETION_TOKENS):
+        self.price_prompt_per_1k = price_prompt_per_1k
+        self.price_completion_per_1k = price_completion_per_1k
+        self.started_at = time.time()
+        self._cells = {}
+
+    def _cell(self, node: Optional[str] = None) -> dict:
+        surv_id, qsit_sqn = _current_question.get()
+        key = (str(surv_id), int(qsit_sqn or 0), node or _current_node.get())
+        if key not in self._cells:
+            self._cells[key] = _empty()
+        return self._cells[key]
+
+    def record_call(self, prompt_tokens: int, completion_tokens: int, llm_time_s: float,
+                    queue_wait_s: float, retries: int, failed: bool = False) -> None:
+        cost = (prompt_tokens * self.price_prompt_per_1k + completion_tokens * self.price_completion_per_1k) / 1000.0
+        _add(self._cell(), {
+            "calls": 1, "failures": int(failed), "retries": retries,
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost_usd": cost,
+            "llm_time_s": llm_time_s, "queue_wait_s": queue_wait_s,
+        })
+
+    def record_cache_hits(self, n: int = 1) -> None:
+        if n:
+            _add(self._cell(), {"cache_hits": n})
+
+    def record_node_time(self, node: str, seconds: float) -> None:
+        _add(self._cell(node), {"node_time_s": seconds})
+
+    def summary(self) -> dict:
+        by_node, by_question, by_survey, total = {}, {}, {}, _empty()
+        for (surv_id, qsit_sqn, node), values in self._cells.items():
+            _add(by_node.setdefault(node, _empty()), values)
+            _add(by_question.setdefault(f"{surv_id}/{qsit_sqn}", _empty()), values)
+            _add(by_survey.setdefault(surv_id, _empty()), values)
+            _add(total, values)
+        return {
+            "started_at": self.started_at,
+            "elapsed_s": round(time.time() - self.started_at, 3),
+            "total": _rounded(total),
+            "by_node": {k: _rounded(v) for k, v in by_node.items()},
+            "by_question": {k: _rounded(v) for k, v in by_question.items()},
+            "by_survey": {k: _rounded(v) for k, v in by_survey.items()},
+            "cells": [
+                {"surv_id": s, "qsit_sqn": q, "node": n, **_rounded(v)}
+                for (s, q, n), v in sorted(self._cells.items())
+            ],
+        }
+
+    def format_nodes(self) -> str:
+        lines = []
+        for node, v in self.summary()["by_node"].items():
+            lines.append(
+                f"{node}: 호출 {v['calls']}회 (캐시 {v['cache_hits']} / 재시도 {v['retries']} / 실패 {v['failures']}), "
+                f"토큰 {v['prompt_tokens']}+{v['completion_tokens']}, ${v['cost_usd']:.4f}, "
+                f"LLM {v['llm_time_s']:.1f}s / 대기 {v['queue_wait_s']:.1f}s / 노드 {v['node_time_s']:.1f}s"
+            )
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> str:
+        _atomic_write(path, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+        return path
+
+    def write_prometheus(self, path: str, prefix: str = "ksurveyflow_llm") -> str:
+        """Prometheus textfile collector 형식으로 (surv_id, qsit_sqn, node) 라벨별 지표 출력."""
+        help_text = {
+            "calls": ("counter", "LLM 호출 수"),
+            "cache_hits": ("counter", "LLM 캐시 적중 수"),
+            "failures": ("counter", "재시도 후 실패한 LLM 호출 수"),
+            "retries": ("counter", "LLM 호출 재시도 수"),
+            "prompt_tokens": ("counter", "프롬프트 토큰 수"),
+            "completion_tokens": ("counter", "응답 토큰 수"),
+            "cost_usd": ("counter", "추정 비용(USD)"),
+            "llm_time_s": ("counter", "LLM 호출 시간 합(초)"),
+            "queue_wait_s": ("counter", "속도 제한기 대기 시간 합(초)"),
+            "node_time_s": ("counter", "노드 실행 시간 합(초)"),
+        }
+        out = []
+        for metric in _COUNTERS:
+            kind, desc = help_text[metric]
+            name = f"{prefix}_{metric}_total"
+            out.append(f"# HELP {name} {desc}")
+            out.append(f"# TYPE {name} {kind}")
+            for (surv_id, qsit_sqn, node), values in sorted(self._cells.items()):
+                labels = f'surv_id="{_escape(surv_id)}",qsit_sqn="{qsit_sqn}",node="{_escape(node)}"'
+                out.append(f"{name}{{{labels}}} {values[metric]}")
+        _atomic_write(path, "\n".join(out) + "\n")
+        return path
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _atomic_write(path: str, text: str) -> None:
+    # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일 작성 후 교체
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_shared_metrics: Optional[PipelineMetrics] = None
+
+
+def get_metrics() -> PipelineMetrics:
+    """실행 전체가 공유하는 지표 저장소."""
+    global _shared_metrics
+    if _shared_metrics is None:
+        _shared_metrics = PipelineMetrics()
+    return _shared_metrics
+
+
+def set_metrics(metrics: Optional[PipelineMetrics]) -> None:
+    global _shared_metrics
+    _shared_metrics = metrics
+
+
+def set_current_node(node: str) -> None:
+    """현재 태스크(및 이후 생성되는 하위 태스크)의 지표 노드 이름 설정 (스트리밍 단계용)."""
+    _current_node.set(node)
+
+
+def set_current_question(surv_id, qsit_sqn) -> None:
+    _current_question.set((str(surv_id or ""), int(qsit_sqn or 0)))
+
+
+def instrument_node(name: str, fn):
+    """그래프 노드 래퍼: 노드 이름/문항을 contextvars에 설정하고 노드 실행 시간을 기록."""
+    @functools.wraps(fn)
+    async def wrapper(state):
+        set_current_question(state.get('surv_id'), state.get('qsit_sqn'))
+        set_current_node(name)
+        started = time.monotonic()
+        try:
+            return await fn(state)
+        finally:
+            get_metrics().record_node_time(name, time.monotonic() - started)
+    return wrapper
@@ -0,0 +1,97 @@
+import re
+from collections import Counter
+from typing import Optional
+
+from src.core.state import GraphState
+from src.core.records import answer_count, answers_from_state
+from src.core.dedup import normalize_answer
+from src.core.checkpoint import checkpoint_rows
+from src.constants import *
+
+# =========================
+# 규칙 기반 사전 분류 (그래프 첫 노드)
+# - CATEGORY_CLASSIFICATION_PROMPT 규칙대로 특수문자/없음/무응답/공백 응답은 LLM 없이 '기타 피드백'으로 확정
+# - PRECLASSIFY_SHORT_ANSWERS 사용 시 MIN_RESPONSE_LENGTH 미만 응답도 LLM을 건너뜀
+#   ("좋아요"처럼 짧아도 감성이 있는 응답이 있으므로 감성/키워드/요약은 채우지 않음)
+# - 나머지 응답만 L1/L2 분류 및 감성/키워드/요약 노드로 전달
+# =========================
+
+_MEANINGFUL_RE = re.compile(r"[가-힣A-Za-z0-9]")
+_JAMO_ONLY_RE = re.compile(r"^[ㄱ-ㅎㅏ-ㅣ\s]+$")
+
+# 의견 없음 표현 (normalize_answer 후 공백 제거 기준)
+_NO_OPINION = {
+    "없음", "없어요", "없습니다", "없다", "없슴", "없음요", "없네요", "없어", "무", "무응답", "해당없음", "해당사항없음",
+    "딱히없음", "딱히없어요", "딱히없습니다", "특별히없음", "특별히없어요", "특별히없습니다", "별로없음", "별로없어요",
+    "특이사항없음", "의견없음", "모름", "모르겠음", "모르겠어요", "모르겠습니다", "잘모르겠음", "잘모르겠어요",
+    "잘모르겠습니다", "글쎄요", "글쎄", "x", "xx", "n", "na", "no", "none", "null", "nan",
+}
+
+
+def trivial_reason(answer) -> Optional[str]:
+    """LLM 없이 분류 가능한 응답이면 사유('blank'|'symbol'|'no_opinion'|'short'), 아니면 None."""
+    text = "" if answer is None else str(answer).strip()
+    if not text:
+        return "blank"
+    if not _MEANINGFUL_RE.search(text) or _JAMO_ONLY_RE.match(text):
+        return "symbol"
+    if normalize_answer(text).replace(" ", "") in _NO_OPINION:
+        return "no_opinion"
+    if PRECLASSIFY_SHORT_ANSWERS and len(text) < MIN_RESPONSE_LENGTH:
+        return "short"
+    return None
+
+
+def _trivial_result(row: dict, reason: str) -> dict:
+    return {
+        **row,
+        "category_level1_raw": None,
+        "category_level1": "기타 피드백",
+        "category_level2_raw": None,
+        "category_level2": "기타 피드백",
+        # 공백 응답은 LLM 경로와 동일하게, 짧은 응답은 감성을 단정할 수 없어 감성/키워드/요약 없음
+        "sentiment": None if reason in ("blank", "short") else "중립",
+        "keywords": None,
+        "summary": None,
+    }
+
+
+async def preclassify_async(state: GraphState):
+    """사소한 응답을 규칙으로 확정해 preclassified_results에 담고, answers에는 LLM 대상 응답만 남긴다."""
+    answers = answers_from_state(state)
+    if not state.get('preclassify', PRECLASSIFY_ENABLED) or len(answers) == 0:
+        state['preclassified_results'] = []
+        return state
+
+    preclassified, remaining = [], []
+    counts = Counter()
+    for row in answers:
+        reason = trivial_reason(row.get('answ_cntnt'))
+        if reason is None:
+            remaining.append(row)
+        else:
+            preclassified.append(_trivial_result(row, reason))
+            counts[reason] += 1
+    print(
+        f"[PRE] 규칙 기반 사전 분류 {len(preclassified)}건 "
+        f"(공백 {counts.get('blank', 0)} / 특수문자 {counts.get('symbol', 0)} / "
+        f"의견 없음 {counts.get('no_opinion', 0)} / 짧은 응답 {counts.get('short', 0)}), "
+        f"LLM 대상 {len(remaining)}건"
+    )
+    checkpoint_rows(state, preclassified)
+    state['preclassified_results'] = preclassified
+    state['answers'] = remaining
+    return state
+
+
+def route_after_preclassify(state: GraphState) -> str:
+    """LLM 대상 응답이 남아 있으면 L1 분류로, 없으면 바로 결과 병합으로."""
+    return "llm" if answer_count(state) > 0 else "merge"
+
+
+async def merge_preclassified_async(state: GraphState):
+    """LLM 노드 결과 뒤에 사전 분류 결과를 붙인다."""
+    preclassified = state.get('preclassified_results') or []
+    if preclassified:
+        state['batch_results'] = list(state.get('batch_results') or []) + preclassified
+    return state
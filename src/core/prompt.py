@@ -13,9 +13,10 @@ CATEGORY_CLASSIFICATION_PROMPT = """
 - 반드시 주어진 카테고리 중 1개를 분류하세요. 분류값은 [카테고리] 중 하나여야 합니다.
 - 응답내용이 명확하지 않으는 단순 특수문자 입력, 없음, 무응답 공백 등 '기타 피드백'으로 분류합니다.
 - 참조 하는 카테고리로 분류할수 없으면 '기타 피드백'로 분류합니다.
+- [답변]의 각 줄마다 정확히 한 줄씩 출력하고, 답변 앞의 번호를 그대로 유지하세요.
 
 [format]
-Q: <답변> -> 분류: <카테고리명>
+<번호> Q: <답변> -> 분류: <카테고리명>
 """
 
 SENTIMENT_CLASSIFICATION_PROMPT = """
@@ -70,3 +71,25 @@ SUMMARY_PROMPT = """
 [Output format] 
 - 핵심 문장 요약만 출력 (불필요한 설명, 메타 텍스트 없이)
 """
+
+
+ENRICHMENT_PROMPT = """
+[목표]
+- 설문 주제 {main_ttl}의 {qsit_ttl}에 대한 각 답변의 감정, 핵심 키워드, 요약을 한 번에 생성하세요.
+
+[답변]
+{answ_list}
+
+[제약사항]
+- sentiment : 반드시 **긍정,부정,중립** 중 한 개 값
+  - 긍정 : 명확하게 긍정,좋은점,칭찬 외 긍정 표현
+  - 부정 : 명확하게 부정,안좋은점,불만 외 부정 표현
+  - 중립 : 긍정,부정의 표현이 없는 중립의 표현
+- keywords : 응답 내용과 직접 관련 있는 핵심 명사 키워드 3개 (명사형으로 축약, 추출할 수 없으면 ["무응답"])
+- summary : 고객의 의도를 나타내는 1문장의 짧은 단답형 요약 ("~입니다","~다" 사용 금지, 명사/형용사 조합)
+- [답변]의 각 줄마다 객체 1개를 생성하고, id는 답변 앞의 번호를 그대로 사용하세요.
+
+[Output format]
+설명이나 코드블록 없이 JSON 배열만 출력
+[{{"id": 1, "sentiment": "긍정", "keywords": ["키워드1", "키워드2", "키워드3"], "summary": "핵심 요약"}}]
+"""
@@ -0,0 +1,267 @@
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from src.constants import *
+
+T = TypeVar("T")
+
+# =========================
+# LLM 호출 공용 속도 제한기
+# - 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷
+# - AIMD 동시성 조절: 정상 응답이면 동시성 한도를 조금씩 늘리고(가산),
+#   429/5xx 또는 지연 급증 시 한도를 절반으로 줄임(승산)
+# - 429/5xx/연결 오류는 지수 백오프(+Retry-After)로 재시도
+# =========================
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """예외에서 HTTP 상태 코드를 추출 (openai.APIStatusError 등). 없으면 None."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    status = error_status(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    # 상태 코드 없는 연결/타임아웃 오류
+    name = type(exc).__name__
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or name in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """연속 보충 토큰 버킷 (capacity = 분당 한도, 초당 capacity/60 보충)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount만큼 사용 가능해질 때까지 남은 시간(초). 0이면 즉시 사용 가능."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity > 0:
+            self.level -= min(amount, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """RPM/TPM 토큰 버킷 + AIMD 동시성 제어를 결합한 비동기 LLM 호출 제한기.
+
+    - call(fn, est_tokens): 동시성 슬롯과 버킷 용량을 확보한 뒤 fn()을 실행하고,
+      재시도 가능한 오류(429/5xx/연결 오류)는 지수 백오프로 max_retries회까지 재시도
+    - 동시성 한도는 [min_concurrency, max_concurrency] 범위에서 AIMD로 조절
+    - stats(): 누적 요청/오류/재시도/대기 시간/현재 동시성 한도 등 실시간 통계
+    """
+
+    def __init__(
+        self,
+        requests_per_min: float = LLM_REQUESTS_PER_MIN,
+        tokens_per_min: float = LLM_TOKENS_PER_MIN,
+        initial_concurrency: int = LLM_INITIAL_CONCURRENCY,
+        max_concurrency: int = ASYNC_CONCURRENCY,
+        min_concurrency: int = 1,
+        target_latency_s: float = LLM_TARGET_LATENCY_S,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 60.0,
+    ):
+        self.min_concurrency = max(1, int(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.target_latency_s = target_latency_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._rpm = _TokenBucket(requests_per_min)
+        self._tpm = _TokenBucket(tokens_per_min)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop = None
+        # 호출 단위 지연(대기+재시도 포함) 최근 표본, 백분위 계산용
+        self._call_latencies = deque(maxlen=10000)
+        self._stats = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "retries": 0,
+            "tokens": 0,
+            "latency_s": 0.0,
+            "queue_wait_s": 0.0,
+            "max_in_flight": 0,
+        }
+
+    def _condition(self) -> asyncio.Condition:
+        # 실행마다 이벤트 루프가 바뀔 수 있으므로(asyncio.run 등) 루프별로 동기화 객체 생성
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._cond
+
+    async def _acquire(self, est_tokens: float) -> float:
+        """동시성 슬롯 + RPM/TPM 용량 확보. 대기한 시간(초)을 반환."""
+        start = time.monotonic()
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+        while True:
+            now = time.monotonic()
+            wait = max(self._rpm.wait_time(1, now), self._tpm.wait_time(est_tokens, now))
+            if wait <= 0:
+                self._rpm.take(1)
+                self._tpm.take(est_tokens)
+                break
+            await asyncio.sleep(wait)
+        return time.monotonic() - start
+
+    async def _release(self) -> None:
+        cond = self._condition()
+        async with cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            cond.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        if self.target_latency_s and latency > 2 * self.target_latency_s:
+            self._decrease()
+        else:
+            # 가산 증가: 한도만큼 성공하면 +1
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def _decrease(self) -> None:
+        # 동시에 실패한 요청들로 연쇄 감소하지 않도록 1초에 한 번만 감소
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit / 2.0)
+
+    async def call(self, fn: Callable[[], Awaitable[T]], est_tokens: float = 0, report: Optional[dict] = None) -> T:
+        """fn()을 제한기 하에서 실행 (재시도 포함). 재시도 한도를 넘기면 마지막 예외를 그대로 발생.
+
+        report(dict)를 주면 이 호출의 queue_wait_s / latency_s / retries를 채운다 (계측용).
+        """
+        attempt = 0
+        call_start = time.monotonic()
+        if report is not None:
+            report.update(queue_wait_s=0.0, latency_s=0.0, retries=0)
+        while True:
+            waited = await self._acquire(est_tokens)
+            self._stats["requests"] += 1
+            self._stats["queue_wait_s"] += waited
+            if report is not None:
+                report["queue_wait_s"] += waited
+                report["retries"] = attempt
+            start = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                if report is not None:
+                    report["latency_s"] += time.monotonic() - start
+                await self._release()
+                status = error_status(e)
+                if status == 429:
+                    self._stats["rate_limited"] += 1
+                elif status is not None and status >= 500:
+                    self._stats["server_errors"] += 1
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self._stats["failures"] += 1
+                    raise
+                self._decrease()
+                attempt += 1
+                self._stats["retries"] += 1
+                delay = _retry_after_seconds(e)
+                if delay is None:
+                    delay = min(self.backoff_max_s, self.backoff_base_s * (2 ** (attempt - 1)))
+                    delay *= 0.5 + random.random()  # jitter
+                await asyncio.sleep(delay)
+                continue
+            latency = time.monotonic() - start
+            if report is not None:
+                report["latency_s"] += latency
+            await self._release()
+            self._stats["successes"] += 1
+            self._stats["tokens"] += int(est_tokens)
+            self._stats["latency_s"] += latency
+            self._on_success(latency)
+            self._call_latencies.append(time.monotonic() - call_start)
+            return result
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["concurrency_limit"] = int(self.limit)
+        s["in_flight"] = self._in_flight
+        s["avg_latency_s"] = round(s["latency_s"] / s["successes"], 3) if s["successes"] else 0.0
+        s["latency_s"] = round(s["latency_s"], 3)
+        s["queue_wait_s"] = round(s["queue_wait_s"], 3)
+        return s
+
+    def latency_percentiles(self, percentiles=(50, 95, 99)) -> dict:
+        """성공 호출의 종단 지연(슬롯/버킷 대기 + 재시도 포함) 백분위(초). 표본이 없으면 0."""
+        samples = sorted(self._call_latencies)
+        if not samples:
+            return {p: 0.0 for p in percentiles}
+        return {p: round(samples[min(len(samples) - 1, int(len(samples) * p / 100))], 4) for p in percentiles}
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (
+            f"요청 {s['requests']}건 (성공 {s['successes']} / 실패 {s['failures']} / 재시도 {s['retries']}), "
+            f"429 {s['rate_limited']}건, 5xx {s['server_errors']}건, "
+            f"동시성 한도 {s['concurrency_limit']} (최대 동시 {s['max_in_flight']}), "
+            f"평균 지연 {s['avg_latency_s']}s, 누적 대기 {s['queue_wait_s']}s"
+        )
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """그래프 전체가 공유하는 속도 제한기 (최초 호출 시 constants 설정으로 생성)."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = AdaptiveRateLimiter()
+    return _shared_limiter
+
+
+def set_rate_limiter(limiter: Optional[AdaptiveRateLimiter]) -> None:
+    """공유 속도 제한기 교체 (부하 테스트 등에서 설정을 바꿔 실행할 때 사용)."""
+    global _shared_limiter
+    _shared_limiter = limiter
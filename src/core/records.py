@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# =========================
+# 그래프 내부용 경량 응답 레코드
+# - 그래프에는 원본 DataFrame 대신 {_row, answ_cntnt(, _dedup_id)}만 담은 dict 목록(state['answers'])을 전달
+# - 노드는 여기에 단계 결과 컬럼만 추가하고, 원본의 나머지 컬럼(surv_date, cust_id, answ_id 등)은
+#   그래프 종료 후 join_wide_columns로 한 번만 결합
+# =========================
+
+ROW_KEY = "_row"
+
+
+def compact_answers(frame: pd.DataFrame, extra_cols: tuple = ("_dedup_id",)) -> List[dict]:
+    """DataFrame → [{_row: 위치, answ_cntnt, (extra_cols)}] (행 위치는 frame 기준 0..n-1)."""
+    cols = ["answ_cntnt"] + [c for c in extra_cols if c in frame.columns]
+    values = [frame[c].tolist() for c in cols]
+    return [
+        {ROW_KEY: pos, **{c: vals[pos] for c, vals in zip(cols, values)}}
+        for pos in range(len(frame))
+    ]
+
+
+def answers_from_state(state: dict) -> List[dict]:
+    """노드 입력 응답 목록. 경량 레코드(answers)가 없으면 surv_answ 전체 컬럼 행으로 대체 (그래프 단독 실행용)."""
+    answers = state.get('answers')
+    if answers is not None:
+        return answers
+    surv_answ = state.get('surv_answ')
+    return [] if surv_answ is None else surv_answ.to_dict("records")
+
+
+def strip_row_key(row: dict) -> dict:
+    return {k: v for k, v in row.items() if k != ROW_KEY}
+
+
+def join_wide_columns(results: List[dict], wide_rows: List[dict]) -> List[dict]:
+    """경량 결과 행에 원본 행(wide_rows[_row])의 컬럼을 결합. 원본 컬럼이 앞, 단계 결과 컬럼(같은 이름이면 결과 우선)이 뒤."""
+    joined = []
+    for row in results:
+        pos = row.get(ROW_KEY)
+        if pos is None:
+            joined.append(row)
+            continue
+        wide = dict(wide_rows[pos])
+        wide.update(strip_row_key(row))
+        joined.append(wide)
+    return joined
+
+
+def wide_rows_by_group(frame: pd.DataFrame, groups: Dict[int, List]) -> Dict[int, List[dict]]:
+    """중복 제거 그룹별 원본 행 목록 {_dedup_id: [원본 행 dict, ...]}."""
+    records = frame.to_dict("records")
+    pos_of = {idx: pos for pos, idx in enumerate(frame.index)}
+    return {gid: [records[pos_of[idx]] for idx in members] for gid, members in groups.items()}
+
+
+def answer_count(state: dict) -> int:
+    answers = state.get('answers')
+    if answers is not None:
+        return len(answers)
+    surv_answ: Optional[pd.DataFrame] = state.get('surv_answ')
+    return 0 if surv_answ is None else len(surv_answ)
@@ -0,0 +1,150 @@
+import os
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow 미설치 환경에서는 Parquet 결과 저장소를 사용할 수 없음 (--no-result_sink)
+    pa = None
+    ds = None
+
+from src.constants import *
+
+# =========================
+# 분류 결과 Parquet 저장소 (append-only, surv_id/qsit_sqn 파티션)
+# - 배치가 끝날 때마다 결과 행(원본 컬럼 포함)을 <root>/surv_id=<id>/qsit_sqn=<n>/part-<시각>-<uuid>.parquet 파일로 추가
+# - 문항이 끝나면 compact로 문항 파티션의 배치 파일을 1개로 합침
+# - 파일은 같은 폴더의 숨김 임시 파일(.part-*.tmp)에 쓴 뒤 os.replace로 커밋 → 읽는 쪽은 완성된 파일만 보게 됨
+#   (pyarrow dataset은 '.', '_'로 시작하는 파일을 무시)
+# - 보고서 생성은 read_results로 필요한 설문/문항 파티션만 읽음 (surv_id/qsit_sqn 조건은 폴더 단위로 걸러짐)
+# - 같은 (surv_id, qsit_sqn, answ_id)가 여러 실행에 걸쳐 저장되면 읽을 때 가장 최근 행만 사용
+# =========================
+
+_WRITTEN_AT_COL = "_written_at"
+_PARTITION_COLS = ("surv_id", "qsit_sqn")
+_KEY_COLS = ["surv_id", "qsit_sqn", "answ_id"]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet 결과 저장소에는 pyarrow가 필요합니다 (pip install pyarrow)")
+
+
+def _partitioning():
+    # 파티션 값 타입을 고정 (설문 ID가 숫자로 추론되지 않도록)
+    return ds.partitioning(pa.schema([("surv_id", pa.string()), ("qsit_sqn", pa.int64())]), flavor="hive")
+
+
+class ParquetResultSink:
+    """분류 결과 행을 (surv_id, qsit_sqn) 파티션 Parquet 파일로 추가 저장."""
+
+    def __init__(self, root: str = RESULT_PARQUET_DIR, columns: List[str] = RESULT_COLUMNS):
+        _require_pyarrow()
+        self.root = root
+        self.columns = [c for c in columns if c not in _PARTITION_COLS]
+        os.makedirs(root, exist_ok=True)
+        self.rows_written = 0
+        self.files_written = 0
+
+    def partition_dir(self, surv_id, qsit_sqn) -> str:
+        return os.path.join(self.root, f"surv_id={quote(str(surv_id), safe='')}", f"qsit_sqn={int(qsit_sqn)}")
+
+    def _frame(self, rows: List[dict], written_at: float) -> pd.DataFrame:
+        # 파일마다 스키마가 같도록 결과 컬럼을 모두 문자열로 저장 (파티션 컬럼은 폴더명으로 저장)
+        df = pd.DataFrame(rows).reindex(columns=self.columns)
+        df = df.fillna("").astype(str)
+        df[_WRITTEN_AT_COL] = written_at
+        return df
+
+    def _commit(self, df: pd.DataFrame, dirname: str) -> str:
+        os.makedirs(dirname, exist_ok=True)
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(dirname, f".{name}.tmp")
+        path = os.path.join(dirname, name)
+        df.to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, path)
+        self.files_written += 1
+        return path
+
+    def write_rows(self, rows: Iterable[dict]) -> int:
+        """결과 행을 (surv_id, qsit_sqn)별 파일 1개씩으로 추가 저장. 저장 건수를 반환."""
+        groups: Dict[Tuple[str, int], List[dict]] = {}
+        for row in rows:
+            groups.setdefault((str(row.get("surv_id")), int(row.get("qsit_sqn"))), []).append(row)
+        written_at = time.time()
+        for (surv_id, qsit_sqn), group in groups.items():
+            self._commit(self._frame(group, written_at), self.partition_dir(surv_id, qsit_sqn))
+            self.rows_written += len(group)
+        return sum(len(g) for g in groups.values())
+
+    def compact(self, surv_id, qsit_sqn) -> int:
+        """문항 파티션의 파일들을 최신 행만 남긴 파일 1개로 합침. 합친 뒤 행 수를 반환."""
+        dirname = self.partition_dir(surv_id, qsit_sqn)
+        if not os.path.isdir(dirname):
+            return 0
+        old_files = [os.path.join(dirname, f) for f in os.listdir(dirname) if f.endswith(".parquet")]
+        if len(old_files) <= 1:
+            return len(read_results(self.root, [surv_id], [qsit_sqn]))
+        df = _latest(pd.concat([pd.read_parquet(f, engine="pyarrow") for f in old_files], ignore_index=True))
+        df = df.reindex(columns=self.columns + [_WRITTEN_AT_COL])
+        df[self.columns] = df[self.columns].fillna("")
+        self._commit(df, dirname)
+        for path in old_files:
+            os.remove(path)
+        return len(df)
+
+    def format_stats(self) -> str:
+        return f"{self.rows_written}건 / 파일 {self.files_written}개 저장: {self.root}"
+
+
+def _latest(df: pd.DataFrame) -> pd.DataFrame:
+    # 같은 응답이 여러 번 저장된 경우 가장 최근 저장 행만 유지
+    keys = [c for c in _KEY_COLS if c in df.columns]
+    if _WRITTEN_AT_COL not in df.columns or not keys:
+        return df
+    df = df.sort_values(_WRITTEN_AT_COL, kind="stable")
+    return df.drop_duplicates(subset=keys, keep="last").sort_index()
+
+
+def read_results(
+    root: str = RESULT_PARQUET_DIR,
+    surv_ids: Optional[Iterable] = None,
+    qsit_sqns: Optional[Iterable] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Parquet 결과 저장소에서 결과 DataFrame 읽기 (surv_ids/qsit_sqns 지정 시 해당 파티션만 스캔).
+
+    반환 컬럼은 columns 순서(없으면 저장된 전체 컬럼: RESULT_COLUMNS 먼저), qsit_sqn은 int, 나머지는 문자열.
+    """
+    _require_pyarrow()
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=list(columns or RESULT_COLUMNS))
+    dataset = ds.dataset(root, format="parquet", partitioning=_partitioning())
+    expr = None
+    if surv_ids is not None:
+        expr = ds.field("surv_id").isin([str(s) for s in surv_ids])
+    if qsit_sqns is not None:
+        cond = ds.field("qsit_sqn").isin([int(q) for q in qsit_sqns])
+        expr = cond if expr is None else expr & cond
+    # 실행마다 원본 컬럼이 다를 수 있으므로 읽을 파일들의 스키마를 합침 (없는 컬럼은 빈 값)
+    fragments = list(dataset.get_fragments(filter=expr))
+    if fragments:
+        schema = pa.unify_schemas([dataset.schema] + [f.physical_schema for f in fragments])
+        dataset = ds.dataset(root, schema=schema, format="parquet", partitioning=_partitioning())
+    stored = [c for c in dataset.schema.names if c != _WRITTEN_AT_COL]
+    out_cols = list(columns) if columns else list(dict.fromkeys([c for c in RESULT_COLUMNS if c in stored] + stored))
+    read_cols = [c for c in dict.fromkeys(out_cols + _KEY_COLS + [_WRITTEN_AT_COL]) if c in dataset.schema.names]
+    df = dataset.to_table(columns=read_cols, filter=expr).to_pandas()
+    df = _latest(df)
+    df["surv_id"] = df["surv_id"].astype(str)
+    df["qsit_sqn"] = df["qsit_sqn"].astype(int)
+    df = df.sort_values(["surv_id", "qsit_sqn"], kind="stable").reset_index(drop=True)
+    df = df.reindex(columns=out_cols)
+    text_cols = [c for c in out_cols if c != "qsit_sqn"]
+    df[text_cols] = df[text_cols].fillna("")
+    return df
@@ -1,5 +1,9 @@
 import pandas as pd
-from typing import List, TypedDict
+from typing import List, Optional, TypedDict
+
+from src.core.keyword_extractor import KoreanKeywordExtractor
+from src.core.checkpoint import ClassificationCheckpoint
+from src.core.result_sink import ParquetResultSink
 
 class GraphState(TypedDict):
     surv_id: str
@@ -8,6 +12,23 @@ class GraphState(TypedDict):
     qsit_ttl: str
     response: str
     surv_cate: List[str]
-    surv_answ: pd.DataFrame
+    surv_answ: Optional[pd.DataFrame]  # 원본 응답 (run_langgraph가 그래프 실행 전 answers로 변환, 그래프 내부에서는 None)
+    answers: List[dict]  # 그래프 내부 경량 응답 레코드 {_row, answ_cntnt(, _dedup_id)} + 단계 결과 (records.py)
     batch_results: List[dict]
-    level2_map: dict[str, List[str]]  # 추가된 필드
\ No newline at end of file
+    level2_map: dict[str, List[str]]  # 추가된 필드
+    classify_batch_size: int  # 카테고리 분류 1회 호출당 답변 수, 없으면 CLASSIFY_BATCH_SIZE
+    enrich_mode: str  # 감성/키워드/요약 생성 방식 ("combined" | "separate"), 없으면 ENRICH_MODE
+    enrich_batch_size: int  # combined 모드 1회 호출당 답변 수, 없으면 ENRICH_BATCH_SIZE
+    keyword_backend: str  # 키워드 추출 백엔드 ("llm" | "local"), 없으면 KEYWORD_BACKEND
+    keyword_extractor: Optional[KoreanKeywordExtractor]  # local 백엔드용 추출기 (실행당 1회 생성)
+    answer_dedup: bool  # 정규화 텍스트 기준 중복 응답 제거 후 그래프 실행 여부, 없으면 ANSWER_DEDUP_ENABLED
+    dedup_stats: dict  # 중복 제거 통계 (run_langgraph가 채움)
+    preclassify: bool  # 규칙 기반 사전 분류 사용 여부, 없으면 PRECLASSIFY_ENABLED
+    preclassified_results: List[dict]  # 사전 분류로 확정된 응답 결과 (그래프 마지막에 batch_results에 병합)
+    stream_queue_size: int  # stream 모드 단계 간 큐 크기, 없으면 STREAM_QUEUE_SIZE
+    stream_linger_s: float  # stream 모드 마이크로배치 최대 대기(초), 없으면 STREAM_LINGER_S
+    checkpoint: Optional[ClassificationCheckpoint]  # 배치 단위 결과 저장소 (없으면 체크포인트 미사용)
+    result_sink: Optional[ParquetResultSink]  # 배치 단위 Parquet 결과 저장소 (없으면 미사용)
+    dedup_members: dict  # 중복 제거 대표 행(_dedup_id) → 원본 행 목록 (체크포인트 저장용, run_langgraph가 채움)
+    wide_rows: List[dict]  # 원본 컬럼 포함 행 (체크포인트 저장용, 중복 제거 미사용 시 run_langgraph가 채움)
+    error: str  # 문항 실행 실패 사유 (run_langgraph_many가 채움, 성공 시 없음)
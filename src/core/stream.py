@@ -0,0 +1,133 @@
+import time
+import asyncio
+from typing import Awaitable, Callable, List
+
+from src.core.state import GraphState
+from src.core.checkpoint import checkpoint_rows
+from src.core.records import answers_from_state
+from src.core.metrics import set_current_node
+from src.core.classify import make_level1_classifier, make_level2_classifier, make_enricher, get_enrich_batch_size
+from src.constants import *
+
+# =========================
+# 스트리밍 파이프라인 (PIPELINE_MODE="stream")
+# - L1 분류 → L2 분류 → 감성/키워드/요약을 단계별 배리어 없이 응답 단위로 흘려보냄
+# - 단계 사이는 크기 제한 asyncio.Queue (다음 단계가 밀리면 이전 단계가 대기: 배압)
+# - L2/감성 단계는 도착한 응답을 마이크로배치로 묶음: 배치 크기가 차거나
+#   첫 응답 도착 후 STREAM_LINGER_S가 지나면 즉시 처리 (L2는 L1 값별로 묶음)
+# - 최종 batch_results는 그래프 모드와 같은 행/컬럼 (행 순서는 완료 순)
+# =========================
+
+_DONE = object()
+
+
+async def _micro_batch_stage(
+    inbox: asyncio.Queue,
+    key_fn: Callable[[dict], object],
+    batch_size: int,
+    linger_s: float,
+    handle: Callable[[object, List[dict]], Awaitable[None]],
+) -> None:
+    """inbox에서 행을 받아 key별 마이크로배치로 묶어 handle(key, rows)를 비동기 실행. _DONE 수신 시 잔여분 처리 후 종료."""
+    pending = {}  # key -> (첫 도착 시각, rows)
+    tasks = []
+
+    def flush(key):
+        _, rows = pending.pop(key)
+        tasks.append(asyncio.ensure_future(handle(key, rows)))
+
+    while True:
+        timeout = None
+        if pending:
+            oldest = min(t for t, _ in pending.values())
+            timeout = max(0.0, oldest + linger_s - time.monotonic())
+        try:
+            row = await asyncio.wait_for(inbox.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            row = None
+        if row is _DONE:
+            break
+        if row is not None:
+            key = key_fn(row)
+            if key not in pending:
+                pending[key] = (time.monotonic(), [])
+            pending[key][1].append(row)
+            if len(pending[key][1]) >= batch_size:
+                flush(key)
+        now = time.monotonic()
+        for key in [k for k, (t, _) in pending.items() if now - t >= linger_s]:
+            flush(key)
+
+    for key in list(pending):
+        flush(key)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def stream_pipeline_async(state: GraphState):
+    """L1 → L2 → 감성/키워드/요약 스트리밍 실행 노드 (그래프 모드 3개 노드를 대체)."""
+    rows = answers_from_state(state)
+    if not rows:
+        state['batch_results'] = []
+        return state
+
+    classify_batch_size = max(1, int(state.get('classify_batch_size') or CLASSIFY_BATCH_SIZE))
+    enrich_batch_size = get_enrich_batch_size(state)
+    linger_s = float(state.get('stream_linger_s') or STREAM_LINGER_S)
+    queue_size = max(1, int(state.get('stream_queue_size') or STREAM_QUEUE_SIZE))
+
+    level1 = make_level1_classifier(state)
+    level2 = make_level2_classifier(state)
+    enrich_rows, print_stats = make_enricher(state)
+
+    to_level2: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    to_enrich: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    results: List[dict] = []
+
+    # 단계별 지표는 그래프 모드와 같은 노드 이름으로 집계
+    async def level1_stage():
+        set_current_node('category_level1')
+
+        async def run_batch(batch):
+            for row in await level1(batch):
+                await to_level2.put(row)
+
+        await asyncio.gather(*(
+            run_batch(rows[batch_start:batch_start + classify_batch_size])
+            for batch_start in range(0, len(rows), classify_batch_size)
+        ))
+        await to_level2.put(_DONE)
+
+    async def level2_batch(l1_value, batch):
+        for row in await level2(l1_value, batch):
+            await to_enrich.put(row)
+
+    async def level2_stage():
+        set_current_node('classify_level2')
+        await _micro_batch_stage(
+            to_level2, lambda row: row.get("category_level1", "기타 피드백"),
+            classify_batch_size, linger_s, level2_batch,
+        )
+        await to_enrich.put(_DONE)
+
+    async def enrich_batch(_, batch):
+        enriched = await enrich_rows(batch)
+        checkpoint_rows(state, enriched)
+        results.extend(enriched)
+
+    async def enrich_stage():
+        set_current_node('sentiment_and_keywords')
+        await _micro_batch_stage(to_enrich, lambda row: None, enrich_batch_size, linger_s, enrich_batch)
+
+    stages = [asyncio.ensure_future(stage()) for stage in (level1_stage, level2_stage, enrich_stage)]
+    try:
+        await asyncio.gather(*stages)
+    except BaseException:
+        # 한 단계가 실패하면 큐에서 대기 중인 나머지 단계도 정리
+        for task in stages:
+            task.cancel()
+        raise
+
+    print_stats()
+    state['batch_results'] = results
+    return state
@@ -0,0 +1,310 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.constants import *
+
+# =========================
+# 보고서 HTML 용량 최적화 (Outlook 2019 호환)
+# =========================
+# 렌더링이 끝난 보고서 HTML에 대해 표시 결과를 바꾸지 않는 범위에서만 축약을 수행한다.
+# - 태그 사이 들여쓰기 공백 제거 / 텍스트 공백 축약
+# - 인라인 style 내 동일 선언 중복 제거, 색상(#AABBCC→#ABC)·0단위(0px→0)·margin/padding 축약
+# - 기본값과 같은 no-op 선언 제거 (예: background-image:none, overflow:visible)
+# - 일반 주석 제거 (Outlook 조건부 주석 <!--[if mso]> 는 유지)
+# 용량 예산을 넘으면 선택 섹션(기타 응답 요약 등)을 우선순위대로 안내 문구로 대체한다.
+
+# 선택 섹션 경계 표시 (렌더 단계에서 삽입, 최적화 단계에서 제거)
+_OPTIONAL_SECTION_RE = re.compile(r"<!--optional:(\w+)-->(.*?)<!--/optional:\1-->", re.S)
+_OPTIONAL_MARKER_RE = re.compile(r"<!--/?optional:\w+-->")
+
+# 토큰 분리: 주석 | <style> 블록 | 태그
+_HTML_TOKEN_RE = re.compile(r"(<!--.*?-->|<style\b[^>]*>.*?</style>|<[^>]+>)", re.S | re.I)
+_TAG_NAME_RE = re.compile(r"<\s*/?\s*([a-zA-Z][a-zA-Z0-9]*)")
+_STYLE_ATTR_RE = re.compile(r"""(\s)style=(?:"([^"]*)"|'([^']*)')""", re.I)
+_HEX6_RE = re.compile(r"#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])")
+_ZERO_UNIT_RE = re.compile(r"(?<![\d.])0(?:px|pt|em|rem)\b")
+_WS_RE = re.compile(r"\s+")
+
+# 앞뒤 공백이 렌더링에 영향을 주지 않는 블록/테이블 구조 태그
+_BLOCK_TAGS = {
+	"html", "head", "body", "meta", "title", "style", "link",
+	"table", "thead", "tbody", "tfoot", "tr", "td", "th", "colgroup", "col",
+	"div", "p", "ul", "ol", "li", "center",
+}
+
+# 요소 종류와 무관하게 CSS 기본값과 같은 선언 (상속되지 않는 속성만: 상속 속성의 기본값은 부모 값을 덮어쓰므로 유지)
+_NOOP_DECLARATIONS = {
+	("background-image", "none"),
+	("overflow", "visible"),
+	("text-overflow", "clip"),
+	("position", "static"),
+	("float", "none"),
+}
+# 특정 요소에서만 기본값과 같은 선언 (td/th는 기본 padding이 있으므로 padding:0 유지)
+_NOOP_DECLARATIONS_BY_TAG = {
+	("margin", "0"): {"div", "span", "table", "tr", "td", "th"},
+	("padding", "0"): {"div", "span", "table", "tr"},
+	("background", "transparent"): {"div", "span"},
+}
+_BOX_SHORTHANDS = {"margin", "padding"}
+
+
+def mark_optional_section(html: str, kind: str) -> str:
+	"""용량 예산 초과 시 축약 가능한 섹션을 경계 주석으로 감싼다. 빈 섹션은 그대로 반환."""
+	if not html:
+		return html
+	return f"<!--optional:{kind}-->{html}<!--/optional:{kind}-->"
+
+
+def strip_optional_markers(html: str) -> str:
+	"""선택 섹션 경계 주석만 제거한다(섹션 내용은 유지)."""
+	return _OPTIONAL_MARKER_RE.sub("", html)
+
+
+def _byte_len(s: str) -> int:
+	return len(s.encode("utf-8"))
+
+
+def _compact_box_value(value: str) -> str:
+	"""margin/padding 4·3·2값 표기를 동일 의미의 최소 표기로 축약."""
+	parts = value.split(" ")
+	if len(parts) == 4:
+		a, b, c, d = parts
+		if b == d:
+			parts = [a, b, c] if a != c else [a, b]
+	if len(parts) == 3 and parts[0] == parts[2]:
+		parts = parts[:2]
+	if len(parts) == 2 and parts[0] == parts[1]:
+		parts = parts[:1]
+	return " ".join(parts)
+
+
+def _is_droppable_noop(prop: str, value: str, tag: str, preceding: List[Tuple[str, str]]) -> bool:
+	"""기본값과 같은 선언이면서 앞선 같은 계열 선언을 덮어쓰지 않는 경우에만 True."""
+	key = (prop, value)
+	if key not in _NOOP_DECLARATIONS and tag not in _NOOP_DECLARATIONS_BY_TAG.get(key, ()):
+		return False
+	family = prop.split("-")[0]
+	for p, v in preceding:
+		if p.split("-")[0] != family:
+			continue
+		# background/background-color 단색 지정은 background-image를 건드리지 않음
+		if prop == "background-image" and p in ("background", "background-color") and "url(" not in v and "gradient" not in v:
+			continue
+		return False
+	return True
+
+
+def optimize_style(style: str, tag: str = "") -> str:
+	"""인라인 style 값을 축약한다. 렌더링 결과가 같은 변환만 수행한다.
+
+	- 같은 (속성, 값) 선언이 반복되면 마지막 하나만 유지 (CSS는 뒤 선언이 우선)
+	- #AABBCC → #ABC, 0px → 0, margin/padding 축약 표기
+	- 같은 단색의 background / background-color 중복 시 background-color만 유지
+	- 요소 기본값과 같은 no-op 선언 제거
+	"""
+	decls: List[Tuple[str, str]] = []
+	for raw in style.split(";"):
+		if ":" not in raw:
+			continue
+		prop, value = raw.split(":", 1)
+		prop = prop.strip().lower()
+		value = _WS_RE.sub(" ", value).strip()
+		if not prop or not value:
+			continue
+		value = _HEX6_RE.sub(r"#\1\2\3", value)
+		value = _ZERO_UNIT_RE.sub("0", value)
+		if prop in _BOX_SHORTHANDS:
+			value = _compact_box_value(value)
+		decls.append((prop, value))
+
+	# 동일 선언 중복 제거 (마지막 위치 유지)
+	last_index: Dict[Tuple[str, str], int] = {}
+	for idx, decl in enumerate(decls):
+		last_index[decl] = idx
+	deduped = [decl for idx, decl in enumerate(decls) if last_index[decl] == idx]
+
+	# background:<단색> 뒤에 같은 값의 background-color가 오면 축약형은 중복 (앞선 background 계열 선언이 없을 때만)
+	bg_colors = {value for prop, value in deduped if prop == "background-color"}
+	collapsed: List[Tuple[str, str]] = []
+	for prop, value in deduped:
+		if (
+			prop == "background"
+			and value in bg_colors
+			and " " not in value
+			and "(" not in value
+			and not any(p.split("-")[0] == "background" for p, _v in collapsed)
+		):
+			continue
+		collapsed.append((prop, value))
+
+	kept: List[Tuple[str, str]] = []
+	for prop, value in collapsed:
+		if _is_droppable_noop(prop, value, tag, kept):
+			continue
+		kept.append((prop, value))
+	return ";".join(f"{p}:{v}" for p, v in kept)
+
+
+def _optimize_tag(token: str) -> str:
+	"""태그 토큰 내부 공백을 축약하고 style 속성을 최적화한다."""
+	m = _TAG_NAME_RE.match(token)
+	tag = m.group(1).lower() if m else ""
+	token = _WS_RE.sub(" ", token)
+
+	def _sub_style(sm: "re.Match[str]") -> str:
+		raw = sm.group(2) if sm.group(2) is not None else sm.group(3)
+		optimized = optimize_style(raw, tag)
+		if not optimized:
+			return ""
+		quote = '"' if sm.group(2) is not None else "'"
+		return f"{sm.group(1)}style={quote}{optimized}{quote}"
+
+	return _STYLE_ATTR_RE.sub(_sub_style, token)
+
+
+def _minify_style_block(token: str) -> str:
+	"""<style> 블록의 CSS 주석과 공백을 제거한다."""
+	m = re.match(r"(<style\b[^>]*>)(.*?)(</style>)", token, re.S | re.I)
+	if not m:
+		return token
+	css = re.sub(r"/\*.*?\*/", "", m.group(2), flags=re.S)
+	css = _WS_RE.sub(" ", css)
+	css = re.sub(r"\s*([{};:,])\s*", r"\1", css).replace(";}", "}").strip()
+	return m.group(1) + css + m.group(3)
+
+
+def _token_kind(token: str) -> str:
+	"""토큰이 블록 경계(공백 제거 가능)인지 판별하기 위한 태그명 반환."""
+	if token.startswith("<!"):
+		return "!"
+	m = _TAG_NAME_RE.match(token)
+	return m.group(1).lower() if m else ""
+
+
+def minify_html(html: str) -> str:
+	"""공백/주석/인라인 스타일을 축약한다. 선택 섹션 경계 주석과 Outlook 조건부 주석은 유지."""
+	tokens = _HTML_TOKEN_RE.split(html)
+	out: List[str] = []
+	n = len(tokens)
+	for i, tok in enumerate(tokens):
+		if not tok:
+			continue
+		if i % 2 == 1:
+			# 마크업 토큰
+			if tok.startswith("<!--"):
+				if tok.startswith("<!--[if") or _OPTIONAL_MARKER_RE.fullmatch(tok):
+					out.append(tok)
+				continue
+			if tok[:6].lower() == "<style":
+				out.append(_minify_style_block(tok))
+				continue
+			out.append(_optimize_tag(tok))
+			continue
+		# 텍스트 토큰
+		text = _WS_RE.sub(" ", tok)
+		prev_kind = _token_kind(tokens[i - 1]) if i > 0 else "!"
+		next_kind = _token_kind(tokens[i + 1]) if i + 1 < n else "!"
+		prev_block = prev_kind == "!" or prev_kind in _BLOCK_TAGS
+		next_block = next_kind == "!" or next_kind in _BLOCK_TAGS
+		if prev_block:
+			text = text.lstrip(" ")
+		if next_block:
+			text = text.rstrip(" ")
+		if text:
+			out.append(text)
+	return "".join(out)
+
+
+def _downgrade_notice(kind: str) -> str:
+	label = OPTIONAL_SECTION_LABELS.get(kind, kind)
+	return (
+		'<div style="margin-top:12px;color:#6B7280;font-size:11px;">'
+		f'※ 메일 용량 제한으로 \'{label}\' 표는 생략되었습니다.</div>'
+	)
+
+
+def downgrade_optional_sections(html: str, budget_bytes: int) -> Tuple[str, List[str]]:
+	"""용량 예산을 넘는 동안 선택 섹션을 우선순위(같은 종류는 큰 것부터)대로 안내 문구로 대체.
+
+	반환: (HTML, 축약된 섹션 종류 목록)
+	"""
+	size = _byte_len(html)
+	if budget_bytes <= 0 or size <= budget_bytes:
+		return html, []
+	priority = {kind: idx for idx, kind in enumerate(OPTIONAL_SECTION_PRIORITY)}
+	candidates: List[Tuple[int, int, int, str]] = []  # (우선순위, -절감량, 시작 위치, 종류)
+	matches = list(_OPTIONAL_SECTION_RE.finditer(html))
+	for idx, m in enumerate(matches):
+		kind = m.group(1)
+		if kind not in priority:
+			continue
+		saving = _byte_len(m.group(0)) - _byte_len(_downgrade_notice(kind))
+		if saving > 0:
+			candidates.append((priority[kind], -saving, idx, kind))
+	candidates.sort()
+
+	drop: Dict[int, str] = {}
+	for _prio, neg_saving, idx, kind in candidates:
+		if size <= budget_bytes:
+			break
+		drop[idx] = kind
+		size += neg_saving
+	if not drop:
+		return html, []
+
+	parts: List[str] = []
+	pos = 0
+	for idx, m in enumerate(matches):
+		if idx not in drop:
+			continue
+		parts.append(html[pos:m.start()])
+		parts.append(_downgrade_notice(drop[idx]))
+		pos = m.end()
+	parts.append(html[pos:])
+	dropped = [drop[idx] for idx in sorted(drop)]
+	return "".join(parts), dropped
+
+
+def optimize_html(html: str, size_budget_bytes: Optional[int] = None) -> Tuple[str, Dict[str, object]]:
+	"""보고서 HTML 최적화 진입점.
+
+	1) minify_html로 표시 결과가 같은 축약 적용
+	2) size_budget_bytes(>0)를 넘으면 선택 섹션 축약
+	3) 선택 섹션 경계 주석 제거
+	반환: (최적화된 HTML, 통계 dict)
+	"""
+	bytes_before = _byte_len(html)
+	budget = REPORT_SIZE_BUDGET_KB * 1024 if size_budget_bytes is None else int(size_budget_bytes)
+	optimized = minify_html(html)
+	bytes_minified = _byte_len(optimized)
+	optimized, dropped = downgrade_optional_sections(optimized, budget)
+	optimized = strip_optional_markers(optimized)
+	bytes_after = _byte_len(optimized)
+	stats: Dict[str, object] = {
+		"bytes_before": bytes_before,
+		"bytes_minified": bytes_minified,
+		"bytes_after": bytes_after,
+		"saved_pct": round(100.0 * (bytes_before - bytes_after) / (bytes_before or 1), 1),
+		"budget_bytes": budget,
+		"within_budget": budget <= 0 or bytes_after <= budget,
+		"dropped_sections": dropped,
+	}
+	return optimized, stats
+
+
+def format_optimize_stats(stats: Dict[str, object]) -> str:
+	"""optimize_html 통계를 로그 한 줄로 요약."""
+	text = (
+		f"HTML 최적화: {int(stats['bytes_before']):,} → {int(stats['bytes_after']):,} bytes "
+		f"(-{stats['saved_pct']}%)"
+	)
+	dropped = stats.get("dropped_sections") or []
+	if dropped:
+		counts: Dict[str, int] = {}
+		for kind in dropped:  # type: ignore
+			counts[kind] = counts.get(kind, 0) + 1
+		text += ", 축약 섹션: " + ", ".join(f"{OPTIONAL_SECTION_LABELS.get(k, k)} {c}건" for k, c in counts.items())
+	if not stats.get("within_budget", True):
+		text += f" [예산 {int(stats['budget_bytes']):,} bytes 초과]"
+	return text
@@ -6,31 +6,155 @@ import pandas as pd
 from src.constants import *
 from src.core.state import GraphState
 from src.core.classify import category_level1_async, category_level2_async, sentiment_and_keywords_async
+from src.core.stream import stream_pipeline_async
+from src.core.preclassify import preclassify_async, route_after_preclassify, merge_preclassified_async
+from src.core.metrics import instrument_node
+from src.core.records import ROW_KEY, compact_answers, join_wide_columns, wide_rows_by_group
+from src.core.dedup import dedup_answers, dedup_stats, fan_out_results, format_dedup_stats
     
-def define_workflow():
+def define_workflow(pipeline_mode: str = PIPELINE_MODE):
+    """pipeline_mode: "graph"(단계별 노드, 단계마다 문항 전체 대기) | "stream"(응답 단위 스트리밍 노드 1개)"""
 
     workflow = StateGraph(GraphState)
-    workflow.add_node('category_level1', category_level1_async)
-    workflow.add_node('classify_level2', category_level2_async)
-    workflow.add_node('sentiment_and_keywords', sentiment_and_keywords_async)
+    workflow.add_node('preclassify', instrument_node('preclassify', preclassify_async))
+    workflow.add_node('merge_preclassified', instrument_node('merge_preclassified', merge_preclassified_async))
 
-    workflow.set_entry_point('category_level1')
-    workflow.add_edge('category_level1', 'classify_level2')
-    workflow.add_edge('classify_level2', 'sentiment_and_keywords')
-    workflow.add_edge('sentiment_and_keywords', END)
+    # 사소한 응답(공백/특수문자/없음 등)은 규칙으로 확정하고 나머지만 LLM 노드로
+    workflow.set_entry_point('preclassify')
+
+    if pipeline_mode == "stream":
+        workflow.add_node('stream_pipeline', instrument_node('stream_pipeline', stream_pipeline_async))
+        workflow.add_conditional_edges('preclassify', route_after_preclassify, {
+            'llm': 'stream_pipeline',
+            'merge': 'merge_preclassified',
+        })
+        workflow.add_edge('stream_pipeline', 'merge_preclassified')
+    else:
+        workflow.add_node('category_level1', instrument_node('category_level1', category_level1_async))
+        workflow.add_node('classify_level2', instrument_node('classify_level2', category_level2_async))
+        workflow.add_node('sentiment_and_keywords', instrument_node('sentiment_and_keywords', sentiment_and_keywords_async))
+        workflow.add_conditional_edges('preclassify', route_after_preclassify, {
+            'llm': 'category_level1',
+            'merge': 'merge_preclassified',
+        })
+        workflow.add_edge('category_level1', 'classify_level2')
+        workflow.add_edge('classify_level2', 'sentiment_and_keywords')
+        workflow.add_edge('sentiment_and_keywords', 'merge_preclassified')
+    workflow.add_edge('merge_preclassified', END)
 
     graph_app = workflow.compile()
 
     return graph_app
 
+def _prepare_state(state):
+    # 중복 응답 제거: 정규화 텍스트 기준 고유 응답만 그래프로 보내고 결과를 원본 행 전체에 복제
+    # 그래프에는 경량 레코드(answers: _row/answ_cntnt)만 전달하고 원본 컬럼은 종료 후 한 번만 결합
+    surv_answ = state.get('surv_answ')
+    if surv_answ is None:
+        return state, None
+    dedup = state.get('answer_dedup', ANSWER_DEDUP_ENABLED) and len(surv_answ) > 0
+    # 체크포인트/결과 저장소는 배치마다 원본 컬럼 포함 행으로 저장
+    checkpoint = state.get('checkpoint') is not None or state.get('result_sink') is not None
+    if not dedup:
+        prepared = {**state, 'answers': compact_answers(surv_answ), 'surv_answ': None}
+        if checkpoint:
+            prepared['wide_rows'] = surv_answ.to_dict("records")
+        return prepared, (surv_answ, None, None)
+    unique_answ, groups = dedup_answers(surv_answ)
+    prepared = {**state, 'answers': compact_answers(unique_answ), 'surv_answ': None}
+    if checkpoint:
+        # 원본 행 단위로 저장하므로 대표 행 → 그룹 원본 행 매핑을 함께 전달
+        prepared['dedup_members'] = wide_rows_by_group(surv_answ, groups)
+    return prepared, (surv_answ, unique_answ, groups)
+
+def _finish_result(result, state, prepared):
+    if prepared is None:
+        return result
+    surv_answ, unique_answ, groups = prepared
+    result['surv_answ'] = surv_answ
+    result['answers'] = None
+    if groups is None:
+        # 비동기 배치 완료 순서와 무관하게 중복 제거 경로(fan_out_results)와 같은 원본 행 순서로 반환
+        ordered = sorted(result.get('batch_results', []), key=lambda r: (r.get(ROW_KEY) is None, r.get(ROW_KEY) or 0))
+        result['batch_results'] = join_wide_columns(ordered, surv_answ.to_dict("records"))
+        return result
+    result['batch_results'] = fan_out_results(result.get('batch_results', []), groups, surv_answ)
+    result['dedup_stats'] = dedup_stats(len(surv_answ), len(unique_answ), state)
+    print(f"[DEDUP] {state.get('surv_id')}/{state.get('qsit_sqn')} {format_dedup_stats(result['dedup_stats'])}")
+    return result
+
+async def arun_langgraph(workflow, state):
+    """문항 1개 그래프를 현재 이벤트 루프에서 실행 (중복 제거/결과 복제, 원본 컬럼 결합 포함)."""
+    state, prepared = _prepare_state(state)
+    result = await workflow.ainvoke(state)
+    return _finish_result(result, state, prepared)
+
 def run_langgraph(workflow, state):
 
     # 그래프 실행
 
     if USE_ASYNC_CLASSIFY or USE_ASYNC_ENRICH:
         loop = asyncio.get_event_loop()
-        result = loop.run_until_complete(workflow.ainvoke(state))
+        result = loop.run_until_complete(arun_langgraph(workflow, state))
     else:
-        result = workflow.invoke(state)
+        state, prepared = _prepare_state(state)
+        result = _finish_result(workflow.invoke(state), state, prepared)
     
-    return result
\ No newline at end of file
+    return result
+
+def _failed_result(state, e):
+    """문항 실행 실패 결과: 결과 행 없이 오류만 기록 (완료된 배치는 체크포인트에 남아 --resume으로 나머지만 재시도)."""
+    print(f"[ERROR] {state.get('surv_id')}/{state.get('qsit_sqn')} 문항 실행 실패: {type(e).__name__}: {e}")
+    return {**state, 'batch_results': [], 'error': f"{type(e).__name__}: {e}"}
+
+async def arun_langgraph_many(workflow, states, max_parallel: int = QUESTION_CONCURRENCY, on_done=None):
+    """여러 문항(여러 설문 포함) 그래프를 하나의 이벤트 루프에서 동시에 실행.
+
+    - 응답 수가 많은 문항부터 시작(LPT)하여 마지막 문항이 늦게 끝나 전체 시간이 늘어나는 것을 줄인다
+    - 동시에 실행하는 문항 수는 max_parallel(0 이하면 무제한)로 제한하고,
+      LLM 호출 동시성/RPM/TPM은 공용 속도 제한기 하나가 문항 전체에 걸쳐 관리한다
+    - on_done(index, result): 문항이 끝날 때마다 호출 (완료 순서)
+    - 문항 하나가 실패해도 나머지 문항은 계속 실행. 실패 문항 결과는 batch_results가 비어 있고 error에 사유 기록
+    - 결과는 입력 states 순서대로 반환
+    """
+    def size(k):
+        surv_answ = states[k].get('surv_answ')
+        return 0 if surv_answ is None else len(surv_answ)
+
+    order = sorted(range(len(states)), key=size, reverse=True)
+    sem = asyncio.Semaphore(max_parallel) if max_parallel and max_parallel > 0 else None
+    results = [None] * len(states)
+
+    async def run_guarded(k):
+        try:
+            return await arun_langgraph(workflow, states[k])
+        except Exception as e:
+            return _failed_result(states[k], e)
+
+    async def run_one(k):
+        if sem is None:
+            results[k] = await run_guarded(k)
+        else:
+            async with sem:
+                results[k] = await run_guarded(k)
+        if on_done is not None:
+            on_done(k, results[k])
+
+    # 큰 문항부터 태스크 생성 → 세마포어 대기열도 같은 순서로 진입
+    await asyncio.gather(*(run_one(k) for k in order))
+    return results
+
+def run_langgraph_many(workflow, states, max_parallel: int = QUESTION_CONCURRENCY, on_done=None):
+    """arun_langgraph_many 동기 실행. 비동기 미사용 설정이면 문항별 순차 실행 (실패 문항 처리는 동일)."""
+    if not (USE_ASYNC_CLASSIFY or USE_ASYNC_ENRICH):
+        results = []
+        for k, state in enumerate(states):
+            try:
+                results.append(run_langgraph(workflow, state))
+            except Exception as e:
+                results.append(_failed_result(state, e))
+            if on_done is not None:
+                on_done(k, results[-1])
+        return results
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(arun_langgraph_many(workflow, states, max_parallel, on_done))
@@ -3,12 +3,20 @@ import sys
 import os
 import re
 import json
+import math
+import heapq
+import random
+import zlib
 from collections import Counter, defaultdict, OrderedDict
-from typing import Dict, List, Tuple, Optional, Set
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Tuple, Optional, Set
 from itertools import combinations
 
+import numpy as np
+
 from src.constants import *
 from src.utils import *
+from src.html_optimizer import mark_optional_section, strip_optional_markers
 
 # =========================
 # 파일 경로 설정
@@ -140,6 +148,20 @@ def _compute_overall_rank_from_rows_data(rows_data: List[Dict[str, object]], ord
 		pct_map = {lb: 0.0 for lb in order}
 	return sorted(order, key=lambda lb: (-pct_map.get(lb, 0.0), order.index(lb)))
 
+def _compute_rank_deviation_flags(rows_data: List[Dict[str, object]], order: List[str]) -> List[bool]:
+	"""rows_data 각 행의 보기별 퍼센트 순위가 첫 행(전체) 순위와 다른지 여부를 한 번에 계산합니다.
+
+	- 순위 기준은 `_compute_overall_rank_from_rows_data`와 동일 (퍼센트 내림차순, 동률은 order 순서)
+	- 버킷 × 보기 퍼센트 행렬을 한 번의 안정 정렬(argsort)로 순위화하여 전체 순위와 비교
+	"""
+	if not rows_data or not order:
+		return [False] * len(rows_data)
+	counts = np.array([[int(rd['cnts'].get(lb, 0)) for lb in order] for rd in rows_data], dtype=np.float64)  # type: ignore
+	totals = np.array([int(rd.get('total') or 0) or 1 for rd in rows_data], dtype=np.float64)
+	pct = counts * 100.0 / totals[:, None]
+	ranks = np.argsort(-pct, axis=1, kind="stable")
+	return (ranks != ranks[0]).any(axis=1).tolist()
+
 def _calculate_top_satisfaction(cnts: Dict[str, int], order: List[str]) -> Tuple[float, str, List[str]]:
 	"""상위 만족도 비율과 표시 텍스트, 포함된 라벨들을 계산합니다."""
 	if not order or not cnts:
@@ -1115,21 +1137,22 @@ def _build_edge_cases_section(all_edge_cases: List[Dict]) -> str:
 	
 	return html
 
-def build_question_components(question_rows: List[Dict[str, str]], qtype: str, label_order: List[str], question_title: str, all_data: List[Dict[str, str]] = None, question_id: str = None) -> List[str]:
+def build_question_components(ctx: "QuestionContext", all_data: List[Dict[str, str]] = None) -> List[str]:
 	"""
 	문항 타입에 따라 설정된 컴포넌트들을 동적으로 생성합니다.
 	
 	Args:
-		question_rows: 해당 문항의 응답 데이터
-		qtype: 문항 타입 (objective, evaluation, subjective 등)
-		label_order: 라벨 순서
-		question_title: 문항 제목
+		ctx: 문항 컨텍스트 (응답 데이터, 문항 타입, 라벨 순서, 문항 제목/ID — build_question_context)
 		all_data: 전체 데이터 (교차분석용)
-		question_id: 문항 ID
 	
 	Returns:
 		생성된 컴포넌트 HTML 리스트
 	"""
+	question_rows = ctx.rows
+	qtype = ctx.qtype
+	label_order = ctx.label_order
+	question_title = ctx.title
+	question_id = ctx.qid
 	components = []
 	
 	# 문항 타입에 따른 컴포넌트 구성 가져오기
@@ -1139,62 +1162,62 @@ def build_question_components(question_rows: List[Dict[str, str]], qtype: str, l
 	for component_type in component_config:
 		if component_type == "general_stats":
 			# 일반형 응답통계 컴포넌트
-			stats_html = build_general_stats_component(question_rows, label_order, question_title)
+			stats_html = build_general_stats_component(question_rows, label_order, question_title, ctx)
 			if stats_html:
 				components.append(stats_html)
 				
 		elif component_type == "general_heatmap":
 			# 일반형 히트맵 컴포넌트 (히트맵만)
-			heatmap_html = build_general_heatmap_only(question_rows, label_order, question_title, all_data, question_id)
+			heatmap_html = build_general_heatmap_only(question_rows, label_order, question_title, all_data, question_id, ctx)
 			if heatmap_html:
 				components.append(heatmap_html)
 				
 		elif component_type == "general_heatmap_with_cross_analysis":
 			# 일반형 히트맵 + 교차분석 컴포넌트
-			heatmap_html = build_general_heatmap(question_rows, label_order, question_title, all_data, question_id)
+			heatmap_html = build_general_heatmap(question_rows, label_order, question_title, all_data, question_id, ctx)
 			if heatmap_html:
 				components.append(heatmap_html)
 				
 		elif component_type == "evaluation_heatmap":
 			# 평가형 히트맵 컴포넌트 (히트맵만)
-			eval_heatmap_html = build_evaluation_heatmap_only(question_rows, label_order, question_title, all_data, question_id)
+			eval_heatmap_html = build_evaluation_heatmap_only(question_rows, label_order, question_title, all_data, question_id, ctx)
 			if eval_heatmap_html:
 				components.append(eval_heatmap_html)
 				
 		elif component_type == "evaluation_heatmap_with_cross_analysis":
 			# 평가형 히트맵 + 교차분석 컴포넌트
-			eval_heatmap_html = build_objective_evaluation_heatmap(question_rows, label_order, question_title, all_data, question_id)
+			eval_heatmap_html = build_objective_evaluation_heatmap(question_rows, label_order, question_title, all_data, question_id, ctx)
 			if eval_heatmap_html:
 				components.append(eval_heatmap_html)
 				
 		elif component_type == "ranking_stats":
 			# 순위형 응답통계 컴포넌트
-			ranking_stats_html = build_ranking_stats_component(question_rows, label_order, question_title)
+			ranking_stats_html = build_ranking_stats_component(question_rows, label_order, question_title, ctx)
 			if ranking_stats_html:
 				components.append(ranking_stats_html)
 				
 		elif component_type == "ranking_heatmap":
 			# 순위형 히트맵 컴포넌트
-			ranking_heatmap_html = build_ranking_heatmap_component(question_rows, label_order, question_title)
+			ranking_heatmap_html = build_ranking_heatmap_component(question_rows, label_order, question_title, ctx)
 			if ranking_heatmap_html:
 				components.append(ranking_heatmap_html)
 				
 		elif component_type == "subjective_summary":
 			# 주관식 요약 컴포넌트
-			subjective_html = build_subjective_summary_component(question_rows, question_title)
+			subjective_html = build_subjective_summary_component(question_rows, question_title, ctx)
 			if subjective_html:
 				components.append(subjective_html)
 				
 	
 	return components
 
-def build_general_stats_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str) -> str:
-	"""일반형 응답통계 컴포넌트를 생성합니다."""
+def build_general_stats_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str, ctx: Optional["QuestionContext"] = None) -> str:
+	"""일반형 응답통계 컴포넌트를 생성합니다. (ctx가 주어지면 문항 타입/응답자수를 재계산하지 않음)"""
 	if not question_rows:
 		return ""
 	
 	# 문항 타입 확인
-	qtype = get_question_type(question_rows)
+	qtype = ctx.qtype if ctx is not None else get_question_type(question_rows)
 	
 	# 응답 통계 계산
 	ordered_counts = {}
@@ -1287,12 +1310,15 @@ def build_general_stats_component(question_rows: List[Dict[str, str]], label_ord
 		legend_html = build_legend_table_from_items_heatmap_with_numbers(items)
 		chart_html = build_stacked_bar_html_ordered_height_heatmap(items, 110)
 	# Base/Total 계산: Base=고유 cust_id 수(응답자수), Total=총 응답 행 수(답변수)
-	unique_cust_ids = set()
-	for row in question_rows:
-		cust_id = (row.get("cust_id") or "").strip()
-		if cust_id:
-			unique_cust_ids.add(cust_id)
-	base_n = len(unique_cust_ids)
+	if ctx is not None:
+		base_n = ctx.respondent_count
+	else:
+		unique_cust_ids = set()
+		for row in question_rows:
+			cust_id = (row.get("cust_id") or "").strip()
+			if cust_id:
+				unique_cust_ids.add(cust_id)
+		base_n = len(unique_cust_ids)
 	total_n = len(question_rows)
 	base_formatted = f"{base_n:,}"
 	total_formatted = f"{total_n:,}"
@@ -1356,20 +1382,23 @@ def build_general_stats_component(question_rows: List[Dict[str, str]], label_ord
 	
 	return stats_html
 
-def build_ranking_stats_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str) -> str:
-	"""순위형 응답통계 컴포넌트를 생성합니다."""
+def build_ranking_stats_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str, ctx: Optional["QuestionContext"] = None) -> str:
+	"""순위형 응답통계 컴포넌트를 생성합니다. (ctx가 주어지면 응답자수를 재계산하지 않음)"""
 	if not question_rows or not label_order:
 		return ""
 	
 	# 순위형 데이터 분석
-	ranking_data = analyze_ranking_data(question_rows, label_order)
+	ranking_data = analyze_ranking_data(question_rows, label_order, ctx.ranking_matrix() if ctx is not None else None)
 	if not ranking_data:
 		return ""
 	
 	# 3개의 누적 통계 컴포넌트 생성
 	stats_html = ""
 	# Base(응답자 수)
-	base_n = len({(r.get('cust_id') or '').strip() for r in question_rows if (r.get('cust_id') or '').strip()})
+	if ctx is not None:
+		base_n = ctx.respondent_count
+	else:
+		base_n = len({(r.get('cust_id') or '').strip() for r in question_rows if (r.get('cust_id') or '').strip()})
 	
 	# 1순위 응답통계
 	stats_html += build_ranking_cumulative_stats(ranking_data['1순위']['counts'], "1순위", question_title, ranking_data['1순위']['n'], ranking_data['1순위'].get('parts'), base_n)
@@ -1558,13 +1587,13 @@ def build_ranking_cumulative_stats(ranking_data: Dict[str, int], rank_type: str,
 	return stats_html
 
 
-def build_ranking_heatmap_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str) -> str:
+def build_ranking_heatmap_component(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str, ctx: Optional["QuestionContext"] = None) -> str:
 	"""순위형 히트맵 컴포넌트: 일반형과 동일한 컨테이너/제목/범례 + 정규화 안내"""
 	if not question_rows or not label_order:
 		return ""
 	order = list(label_order)
 	# 순위형 전용 히트맵 테이블 생성(가중치/정규화 적용)
-	table = _render_ranking_heatmap_table(question_rows, order)
+	table = _render_ranking_heatmap_table(question_rows, order, ctx.ranking_matrix() if ctx is not None else None)
 	if not table:
 		return ""
 	# 엣지케이스 범례 노출 여부 감지
@@ -1621,46 +1650,55 @@ def build_ranking_heatmap_component(question_rows: List[Dict[str, str]], label_o
 	)
 
 
-def _render_ranking_heatmap_table(question_rows: List[Dict[str, str]], order: List[str]) -> str:
-	"""순위형 히트맵 테이블: RANKING_WEIGHTS['heatmap'] 가중치 기반 비율 계산 적용"""
-	# 세그 정의 및 버킷 수집 (일반형과 동일)
-	seg_defs: List[Tuple[str, str]] = [
-		("성별", "gndr_seg"),
-		("계좌고객", "account_seg"),
-		("연령대", "age_seg"),
-		("가입경과일", "rgst_gap"),
-		("VASP 연결", "vasp"),
-		("수신상품 가입", "dp_seg"),
-		("대출상품 가입", "loan_seg"),
-		("카드상품 가입", "card_seg"),
-		("서비스 이용", "suv_seg"),
-	]
-	preferred_orders: Dict[str, List[str]] = {
-		"gndr_seg": ["01.남성", "02.여성"],
-		"age_seg": ["01.10대","02.20대","03.30대","04.40대","05.50대","06.60대","07.기타"],
-	}
-	seg_bucket_rows: List[Tuple[str, List[Dict[str, str]]]] = []
-	seg_bucket_rows.append(("전체", question_rows))
-	for seg_title, seg_key in seg_defs:
+# 히트맵 세그 축 정의: (표시명, 키). 일부 축은 값 표시 순서를 고정
+HEATMAP_SEG_DEFS: List[Tuple[str, str]] = [
+	("성별", "gndr_seg"),
+	("계좌고객", "account_seg"),
+	("연령대", "age_seg"),
+	("가입경과일", "rgst_gap"),
+	("VASP 연결", "vasp"),
+	("수신상품 가입", "dp_seg"),
+	("대출상품 가입", "loan_seg"),
+	("카드상품 가입", "card_seg"),
+	("서비스 이용", "suv_seg"),
+]
+HEATMAP_SEG_PREFERRED_ORDERS: Dict[str, List[str]] = {
+	"gndr_seg": ["01.남성", "02.여성"],
+	"age_seg": ["01.10대","02.20대","03.30대","04.40대","05.50대","06.60대","07.기타"],
+}
+
+
+def _render_ranking_heatmap_table(question_rows: List[Dict[str, str]], order: List[str], matrix: Optional["RankingMatrix"] = None) -> str:
+	"""순위형 히트맵 테이블: RANKING_WEIGHTS['heatmap'] 가중치 기반 비율 계산 적용
+	- matrix: compile_ranking_matrix 결과 (없으면 question_rows에서 컴파일)
+	"""
+	if matrix is None:
+		matrix = compile_ranking_matrix(question_rows, order)
+	# 세그 버킷 라벨 및 세그 축별 응답자 → 버킷 행 인덱스 (응답자별 세그 코드 matrix.seg_codes 기반, -1=해당 없음)
+	n_respondents = len(matrix.respondents)
+	bucket_names: List[str] = ["전체"]
+	bucket_ids: List[List[int]] = [[0] * n_respondents]
+	for seg_title, seg_key in HEATMAP_SEG_DEFS:
 		vals = set()
 		for r in question_rows:
 			v = (r.get(seg_key) or "").strip()
 			if v:
 				vals.add(v)
-		if seg_key in preferred_orders:
-			ordered_vals = [v for v in preferred_orders[seg_key] if v in vals]
+		if seg_key in HEATMAP_SEG_PREFERRED_ORDERS:
+			ordered_vals = [v for v in HEATMAP_SEG_PREFERRED_ORDERS[seg_key] if v in vals]
 			remain = sorted([v for v in vals if v not in set(ordered_vals)])
 			ordered_vals += remain
 		else:
 			ordered_vals = sorted(vals)
+		levels = matrix.seg_levels.get(seg_key, [])
+		bucket_of_code: List[int] = [-1] * len(levels)
 		for raw_val in ordered_vals:
 			if clean_axis_label(raw_val) == '기타':
 				continue
-			bucket_label = f"{seg_title} - {clean_axis_label(raw_val)}"
-			rows_subset = [r for r in question_rows if (r.get(seg_key) or '').strip() == raw_val]
-			if not rows_subset:
-				continue
-			seg_bucket_rows.append((bucket_label, rows_subset))
+			if raw_val in levels:
+				bucket_of_code[levels.index(raw_val)] = len(bucket_names)
+			bucket_names.append(f"{seg_title} - {clean_axis_label(raw_val)}")
+		bucket_ids.append([bucket_of_code[c] if c >= 0 else -1 for c in matrix.seg_codes.get(seg_key, [-1] * n_respondents)])
 
 	# 스타일 (일반형과 동일)
 	head_style = 'padding:6px 8px;color:#111827;font-size:12px;text-align:center;'
@@ -1675,40 +1713,13 @@ def _render_ranking_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 		except Exception:
 			return s
 
-	def _extract_respondent_ranks(rows: List[Dict[str, str]]) -> Dict[str, Dict[int, str]]:
-		invalids = {'.', '0', '-', 'N/A', 'NA', 'null', 'NULL', '미응답', '무응답'}
-		res: Dict[str, Dict[int, str]] = {}
-		for r in rows:
-			cust_id = (r.get('cust_id') or '').strip()
-			if not cust_id or cust_id in invalids:
-				continue
-			text = (r.get('answ_cntnt') or '').strip() or (r.get('lkng_cntnt') or '').strip()
-			if not text or text in invalids:
-				continue
-			if '순위' in text:
-				left, right = text.split('순위', 1)
-				try:
-					rank = int(left) if left.isdigit() else 1
-					idx_raw = int(right) if right.isdigit() else -1
-					label_val: Optional[str] = None
-					# 0-based 우선, 실패 시 1-based 보정
-					if 0 <= idx_raw < len(order):
-						label_val = order[idx_raw]
-					elif 1 <= idx_raw <= len(order):
-						label_val = order[idx_raw - 1]
-					if label_val is not None:
-						# 순위 접두 제거하여 canonical choice 라벨로 저장
-						res.setdefault(cust_id, {})[rank] = _strip_rank_prefix_display(label_val)
-				except Exception:
-					continue
-		return res
-
-	global_map = _extract_respondent_ranks(question_rows)
+	# 보기 인덱스 → 순위 접두 제거한 canonical choice 라벨
+	choice_labels: List[str] = [_strip_rank_prefix_display(lb) for lb in matrix.labels]
 	used_label_seq: List[str] = []
-	for ranks in global_map.values():
-		for choice in ranks.values():
-			if choice not in used_label_seq:
-				used_label_seq.append(choice)
+	for choice_idx in matrix.choice_appearance:
+		choice = choice_labels[choice_idx]
+		if choice not in used_label_seq:
+			used_label_seq.append(choice)
 	# 응답에서 사용된 canonical choice 라벨들의 순서 (중복 제거) - x 값 오름차순 정렬
 	def _extract_choice_index(label: str) -> int:
 		# 라벨이 "n순위x" 또는 접두 제거된 문자열일 수 있음. 숫자만 추출하여 정렬 키로 사용
@@ -1747,46 +1758,26 @@ def _render_ranking_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 		)
 	head_html = '<thead><tr>' + ''.join(head_cells) + '</tr></thead>'
 
-	# 질문 전체에서 사용할 heatmap 가중치 배열 선택 (최대 순위 개수 기준)
-	# (중복 정의 제거: 위에서 정의한 _extract_respondent_ranks 사용)
-
-	global_map = _extract_respondent_ranks(question_rows)
-	max_ranks = max((len(v) for v in global_map.values()), default=1)
-	max_ranks = max(1, min(10, max_ranks))
-	weights_for_question = RANKING_WEIGHTS.get('heatmap', {}).get(max_ranks, list(range(max_ranks, 0, -1)))
-
-	def _norm_map(present: List[int]) -> Dict[int, float]:
-		pairs: Dict[int, float] = {}
-		for i, r in enumerate(sorted(present)):
-			pairs[r] = float(weights_for_question[i]) if i < len(weights_for_question) else 0.0
-		if RANKING_NORMALIZE_PER_RESPONDENT:
-			t = sum(pairs.values()) or 1.0
-			for k in list(pairs.keys()):
-				pairs[k] /= t
-		return pairs
-
-	# 데이터 준비 (각 버킷에서 가중치 기반 비율 계산)
+	# 응답자 × 순위 heatmap 가중치 (문항 최대 순위 개수 기준 배열, 옵션에 따라 응답자 단위 정규화)
+	weight_rows = compute_ranking_weights(matrix, 'heatmap')
+
+	# (세그 버킷 × 헤더 라벨) 가중 점수 큐브를 한 번에 집계
+	header_labels: List[str] = used_order if used_order else order_no_other
+	header_index: Dict[str, int] = {lb: i for i, lb in enumerate(header_labels)}
+	column_of_choice: List[int] = [header_index.get(lb, -1) for lb in choice_labels]
+	score_cube, bucket_resp_counts = accumulate_ranking_cube(matrix, weight_rows, bucket_ids, column_of_choice, len(bucket_names), len(header_labels))
+
+	# 데이터 준비 (각 버킷의 가중치 기반 비율 계산)
 	rows_data: List[Dict[str, object]] = []
-	for name, rows in seg_bucket_rows:
-		# 해당 버킷 내 응답자별 랭크 맵 만들기
-		local_map = _extract_respondent_ranks(rows)
-		# 카운트 맵을 canonical 헤더 라벨 기준으로 준비
-		header_labels: List[str] = used_order if used_order else order_no_other
-		cnts_float: Dict[str, float] = {l: 0.0 for l in header_labels}
-		for cust_id, ranks in local_map.items():
-			present = [r for r in ranks.keys() if 1 <= r <= 10]
-			wmap = _norm_map(present)
-			for r, choice in ranks.items():
-				w = float(wmap.get(r, 0.0))
-				if choice in cnts_float:
-					cnts_float[choice] += w
+	for bucket_idx, name in enumerate(bucket_names):
+		cnts_float: Dict[str, float] = dict(zip(header_labels, score_cube[bucket_idx]))
 		# 비율 계산용 총합
 		total_float = sum(cnts_float.values()) or 1.0
 		if ' - ' in name:
 			seg_name, seg_value = name.split(' - ', 1)
 		else:
 			seg_name, seg_value = name, ''
-		rows_data.append({'seg_name': seg_name,'seg_value': seg_value,'cnts_float': cnts_float,'total_float': total_float, 'resp_count': len(local_map)})
+		rows_data.append({'seg_name': seg_name,'seg_value': seg_value,'cnts_float': cnts_float,'total_float': total_float, 'resp_count': bucket_resp_counts[bucket_idx]})
 
 	# 히트맵 색상 스케일 및 임계치 계산(일반형과 동일 정책)
 	# - 임계치: 전체 응답 대비 GRAYSCALE_THRESHOLD_PERCENT% 또는 GRAYSCALE_MIN_COUNT
@@ -1879,10 +1870,13 @@ def _render_ranking_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 	)
 
 
-def analyze_ranking_data(question_rows: List[Dict[str, str]], label_order: List[str]) -> Dict[str, Dict[str, object]]:
+def analyze_ranking_data(question_rows: List[Dict[str, str]], label_order: List[str], matrix: Optional["RankingMatrix"] = None) -> Dict[str, Dict[str, object]]:
 	"""순위형 데이터를 분석하여 각 순위별 통계를 계산합니다.
 	반환: { 구간: { 'counts': {choice: count}, 'n': 고유 answ_id 수, 'parts': { '1': {...}, '2': {...}, '3': {...} } } }
+	- matrix: compile_ranking_matrix 결과 (없으면 question_rows에서 컴파일)
 	"""
+	if matrix is None:
+		matrix = compile_ranking_matrix(question_rows, label_order)
 	# 각 순위별 통계 구조 초기화
 	ranking_stats: Dict[str, Dict[str, object]] = {
 		'1순위': {
@@ -1908,110 +1902,264 @@ def analyze_ranking_data(question_rows: List[Dict[str, str]], label_order: List[
 			}
 		},
 	}
-	# 응답자별 순위 데이터 수집
-	respondent_rankings: Dict[str, Dict[int, str]] = {}
-	respondent_answ_ids: Dict[str, set] = {'1순위': set(), '1+2순위': set(), '1+2+3순위': set()}
-	for row in question_rows:
-		cust_id = str(row.get('cust_id', ''))
-		answ_id = str(row.get('answ_id', ''))
-		answ_cntnt = str(row.get('answ_cntnt', ''))
-		lkng_cntnt = str(row.get('lkng_cntnt', ''))
-		invalids = ['.', '0', '-', 'N/A', 'NA', 'null', 'NULL', '미응답', '무응답']
+	# 구간별 가중 점수: 1순위는 단순 카운트, 1+2순위/1+2+3순위는 선택 개수별 가중치(옵션에 따라 응답자 단위 정규화)
+	for rank_type, scheme, n_ranks in (('1순위', None, 1), ('1+2순위', 'stats_1or2', 2), ('1+2+3순위', 'stats_1or2or3', 3)):
+		weight_rows = compute_ranking_weights(matrix, scheme) if scheme else None
+		totals, parts = accumulate_ranking_scores(matrix, weight_rows, n_ranks)
+		counts = ranking_stats[rank_type]['counts']  # type: ignore
+		for choice, value in zip(label_order, totals):
+			if value is not None:
+				counts[choice] = value
+		for rank_no, part_totals in enumerate(parts, start=1):
+			part_counts = ranking_stats[rank_type]['parts'][str(rank_no)]  # type: ignore
+			for choice, value in zip(label_order, part_totals):
+				if value is not None:
+					part_counts[choice] = value
+	answ_ids = matrix.answ_ids_by_rank
+	ranking_stats['1순위']['n'] = len(answ_ids.get(1, set()))
+	ranking_stats['1+2순위']['n'] = len(answ_ids.get(1, set()) | answ_ids.get(2, set()))
+	ranking_stats['1+2+3순위']['n'] = len(answ_ids.get(1, set()) | answ_ids.get(2, set()) | answ_ids.get(3, set()))
+	return ranking_stats
+
+
+# 순위형 가중치 스킴별 (기본 배열, 적용 순위 수). heatmap 기본 배열은 선택 개수 n에 대해 [n, n-1, ..., 1]
+_RANKING_SCHEME_SPECS: Dict[str, Tuple[Optional[List[int]], int]] = {
+	"stats_1or2": ([2, 1], 2),
+	"stats_1or2or3": ([3, 2, 1], 3),
+	"heatmap": (None, RANKING_MAX_RANK),
+}
+
+
+def ranking_weight_table(scheme: str, max_selections: int) -> List[List[float]]:
+	"""RANKING_WEIGHTS[scheme]을 (선택 개수 0~max_selections) × (순위 슬롯 1~RANKING_MAX_RANK) 가중치 행렬로 변환한다.
+	- 정의되지 않은 선택 개수는 스킴 기본 배열 사용, 배열 길이·적용 순위 수를 넘는 슬롯은 0
+	- 슬롯: stats_* 는 순위 번호, heatmap은 응답자가 선택한 순위 중 위치(1번째, 2번째, ...)
+	"""
+	default_arr, n_slots = _RANKING_SCHEME_SPECS[scheme]
+	scheme_map = RANKING_WEIGHTS.get(scheme, {})
+	table: List[List[float]] = []
+	for sel_cnt in range(max_selections + 1):
+		arr = scheme_map.get(sel_cnt, default_arr if default_arr is not None else list(range(sel_cnt, 0, -1)))
+		table.append([float(arr[k]) if (k < len(arr) and k < n_slots) else 0.0 for k in range(RANKING_MAX_RANK)])
+	return table
+
+
+def compute_ranking_weights(matrix: "RankingMatrix", scheme: str, normalize: Optional[bool] = None) -> List[List[float]]:
+	"""응답자 × 순위(1~RANKING_MAX_RANK) 가중치 행렬을 계산한다. (응답이 없는 순위는 0)
+
+	- stats_1or2 / stats_1or2or3: 응답자 선택 개수 행의 가중치를 순위 번호로 gather
+	- heatmap: 문항 최대 선택 개수(1~RANKING_MAX_RANK) 행의 가중치를 응답자 내 순위 위치로 gather
+	- normalize(기본 RANKING_NORMALIZE_PER_RESPONDENT): 응답자별 가중치 합이 1이 되도록 정규화 (합이 0 이하면 0)
+	- 전체 응답자를 한 번에 계산
+	"""
+	if normalize is None:
+		normalize = RANKING_NORMALIZE_PER_RESPONDENT
+	_, n_slots = _RANKING_SCHEME_SPECS[scheme]
+	by_position = (scheme == "heatmap")
+	if by_position:
+		max_sel = max(1, min(RANKING_MAX_RANK, max(matrix.sel_counts, default=1)))
+		table = ranking_weight_table(scheme, max_sel)
+	else:
+		max_sel = 0
+		table = ranking_weight_table(scheme, max(matrix.sel_counts, default=0))
+	if not matrix.ranks:
+		return []
+
+	ranks = np.asarray(matrix.ranks, dtype=np.int64)
+	present = ranks >= 0
+	present[:, n_slots:] = False
+	tbl = np.asarray(table, dtype=np.float64)
+	if by_position:
+		slots = np.clip(np.cumsum(present, axis=1) - 1, 0, None)
+		base = np.where(present, tbl[max_sel][slots], 0.0)
+	else:
+		base = np.where(present, tbl[np.asarray(matrix.sel_counts, dtype=np.int64)], 0.0)
+	if normalize:
+		# 순차 누적합으로 응답자별 합계 계산 (순위 순서대로 더한 값과 동일)
+		total = np.cumsum(base, axis=1)[:, -1:]
+		base = np.where(total > 0, base / np.where(total > 0, total, 1.0), 0.0)
+	return base.tolist()
+
+
+def accumulate_ranking_scores(
+	matrix: "RankingMatrix",
+	weight_rows: Optional[List[List[float]]],
+	n_ranks: int,
+) -> Tuple[List[Optional[float]], List[List[Optional[float]]]]:
+	"""1~n_ranks 순위의 가중치를 보기별로 합산한다. (양수 가중치만, weight_rows=None이면 1.0)
+
+	반환: (보기별 합계, 순위별 보기 합계 목록). 기여가 없는 보기는 None
+	- 합산 순서는 응답자 순 → 순위 순으로, 응답자별 누적과 동일한 결과를 낸다
+	"""
+	n_choices = len(matrix.labels)
+	if not matrix.ranks:
+		return [None] * n_choices, [[None] * n_choices for _ in range(n_ranks)]
+	ranks = np.asarray(matrix.ranks, dtype=np.int64)[:, :n_ranks]
+	if weight_rows is None:
+		weights = np.ones(ranks.shape, dtype=np.float64)
+	else:
+		weights = np.asarray(weight_rows, dtype=np.float64)[:, :n_ranks]
+	mask = (ranks >= 0) & (weights > 0)
+
+	def _segment_sum(idx, w) -> List[Optional[float]]:
+		sums = np.zeros(n_choices, dtype=np.float64)
+		np.add.at(sums, idx, w)
+		touched = np.bincount(idx, minlength=n_choices) > 0
+		return [float(v) if t else None for v, t in zip(sums.tolist(), touched.tolist())]
+
+	# 불리언 마스크는 행 우선 순서로 펼쳐지므로 응답자 → 순위 순으로 누적됨
+	totals = _segment_sum(ranks[mask], weights[mask])
+	parts = [_segment_sum(ranks[mask[:, k], k], weights[mask[:, k], k]) for k in range(n_ranks)]
+	return totals, parts
+
+
+def accumulate_ranking_cube(
+	matrix: "RankingMatrix",
+	weight_rows: List[List[float]],
+	bucket_ids: List[List[int]],
+	column_of_choice: List[int],
+	n_buckets: int,
+	n_columns: int,
+) -> Tuple[List[List[float]], List[int]]:
+	"""(세그 버킷 × 열) 가중 점수 큐브와 버킷별 응답자 수를 한 번의 scatter-add로 계산한다.
+
+	- bucket_ids: 세그 축별 응답자 → 버킷 행 인덱스 목록 (-1=해당 없음, 응답자는 축마다 최대 1개 버킷)
+	- column_of_choice: 보기 인덱스 → 열 인덱스 (-1=집계 제외)
+	- 셀별 합산 순서는 응답자 순 → 순위 순으로, 버킷별 누적과 동일한 결과를 낸다
+	"""
+	cube: List[List[float]] = [[0.0] * n_columns for _ in range(n_buckets)]
+	resp_counts: List[int] = [0] * n_buckets
+	if not matrix.ranks or n_buckets <= 0:
+		return cube, resp_counts
+
+	ranks = np.asarray(matrix.ranks, dtype=np.int64)
+	weights = np.asarray(weight_rows, dtype=np.float64)
+	col_map = np.asarray(list(column_of_choice) + [-1], dtype=np.int64)
+	# 빈 칸(-1)은 col_map 마지막(-1)으로 매핑
+	cols = col_map[np.where(ranks >= 0, ranks, len(column_of_choice))]
+	buckets = np.asarray(bucket_ids, dtype=np.int64)  # (축 수, 응답자 수)
+	# 축 → 응답자 → 순위 순으로 펼쳐서 한 번에 scatter-add
+	cell_buckets = np.broadcast_to(buckets[:, :, None], (buckets.shape[0],) + cols.shape)
+	cell_cols = np.broadcast_to(cols[None, :, :], cell_buckets.shape)
+	cell_weights = np.broadcast_to(weights[None, :, :], cell_buckets.shape)
+	mask = (cell_buckets >= 0) & (cell_cols >= 0)
+	flat = np.zeros(n_buckets * n_columns, dtype=np.float64)
+	np.add.at(flat, cell_buckets[mask] * n_columns + cell_cols[mask], cell_weights[mask])
+	member = buckets[buckets >= 0]
+	return flat.reshape(n_buckets, n_columns).tolist(), np.bincount(member, minlength=n_buckets).tolist()
+
+
+# 순위형 행렬의 세그 코드화 대상 (히트맵 세그 버킷과 동일한 키)
+RANKING_SEG_KEYS: Tuple[str, ...] = tuple(k for _, k in HEATMAP_SEG_DEFS)
+
+
+@dataclass
+class RankingMatrix:
+	"""순위형 문항을 1회 컴파일한 응답자 × 순위 행렬. (응답통계/누적차트/히트맵 공용)
+
+	- labels: 보기 라벨(label_order). 행렬 값은 이 목록의 인덱스
+	- respondents: 유효 순위 응답이 있는 응답자(cust_id), 첫 응답 순서
+	- ranks: 응답자 × 순위(1~RANKING_MAX_RANK) 보기 인덱스, 빈 칸은 -1
+	- sel_counts: 응답자별 선택한 순위 개수 (범위 밖 순위 포함)
+	- seg_codes / seg_levels: 세그 키별 응답자 → 세그 값 코드(-1=미표기), 코드 → 원본 세그 값
+	- choice_appearance: 응답 등장 순서(응답자 순 → 응답자 내 순위 입력 순)의 보기 인덱스
+	- answ_ids_by_rank: 순위별 유효 응답의 answ_id 집합
+	"""
+	labels: List[str]
+	respondents: List[str]
+	ranks: List[List[int]]
+	sel_counts: List[int]
+	seg_codes: Dict[str, List[int]]
+	seg_levels: Dict[str, List[str]]
+	choice_appearance: List[int]
+	answ_ids_by_rank: Dict[int, Set[str]]
+
+
+def compile_ranking_matrix(question_rows: List[Dict[str, str]], label_order: List[str], seg_keys: Tuple[str, ...] = RANKING_SEG_KEYS) -> RankingMatrix:
+	"""순위형 문항 행(answ_cntnt="n순위x")을 응답자 × 순위 정수 행렬로 1회 컴파일한다.
+
+	- 응답 텍스트: answ_cntnt 우선, 없으면 lkng_cntnt
+	- n: 순위(숫자가 아니면 1), x: 보기 인덱스(0-based, 숫자가 아니면 0). 범위 밖 인덱스는 제외
+	- 문항 단위 1-based 판정: 0이 없고 len(label_order)가 있으면 문항 전체 인덱스를 1씩 당김
+	- 같은 응답자·같은 순위가 중복되면 마지막 응답 사용
+	- 세그 값은 응답자의 첫 유효 응답 행 기준
+	"""
+	invalids = {'.', '0', '-', 'N/A', 'NA', 'null', 'NULL', '미응답', '무응답'}
+	n_labels = len(label_order)
+	parsed: List[Tuple[str, int, int, Dict[str, str]]] = []
+	for r in question_rows:
+		cust_id = (r.get('cust_id') or '').strip()
 		if not cust_id or cust_id in invalids:
 			continue
-		ranking_text = answ_cntnt if answ_cntnt not in invalids else lkng_cntnt
-		if ranking_text and ranking_text not in invalids:
-			try:
-				if '순위' in ranking_text:
-					parts = ranking_text.split('순위')
-					if len(parts) == 2:
-						rank = int(parts[0]) if parts[0].isdigit() else 1
-						choice_index = int(parts[1]) if parts[1].isdigit() else 0
-						if cust_id not in respondent_rankings:
-							respondent_rankings[cust_id] = {}
-						if 0 <= choice_index < len(label_order):
-							respondent_rankings[cust_id][rank] = label_order[choice_index]
-							if rank == 1:
-								respondent_answ_ids['1순위'].add(answ_id)
-								respondent_answ_ids['1+2순위'].add(answ_id)
-								respondent_answ_ids['1+2+3순위'].add(answ_id)
-							elif rank == 2:
-								respondent_answ_ids['1+2순위'].add(answ_id)
-								respondent_answ_ids['1+2+3순위'].add(answ_id)
-							elif rank == 3:
-								respondent_answ_ids['1+2+3순위'].add(answ_id)
-			except:
+		text = (r.get('answ_cntnt') or '').strip() or (r.get('lkng_cntnt') or '').strip()
+		if not text or text in invalids or '순위' not in text:
+			continue
+		left, right = text.split('순위', 1)
+		try:
+			rank = int(left) if left.isdigit() else 1
+			choice_idx = int(right) if right.isdigit() else 0
+		except ValueError:
+			continue
+		parsed.append((cust_id, rank, choice_idx, r))
+
+	# 1-based 여부는 값마다가 아니라 문항 전체 인덱스로 한 번만 판정
+	idx_values = {choice_idx for _, _, choice_idx, _ in parsed}
+	offset = 1 if (n_labels > 0 and 0 not in idx_values and n_labels in idx_values) else 0
+
+	per_respondent: Dict[str, Dict[int, int]] = {}
+	first_rows: Dict[str, Dict[str, str]] = {}
+	answ_ids_by_rank: Dict[int, Set[str]] = defaultdict(set)
+	for cust_id, rank, choice_idx, r in parsed:
+		choice_idx -= offset
+		if not (0 <= choice_idx < n_labels):
+			continue
+		per_respondent.setdefault(cust_id, {})[rank] = choice_idx
+		first_rows.setdefault(cust_id, r)
+		answ_ids_by_rank[rank].add(str(r.get('answ_id', '')))
+
+	respondents = list(per_respondent.keys())
+	ranks: List[List[int]] = []
+	sel_counts: List[int] = []
+	choice_appearance: List[int] = []
+	seen_choices: Set[int] = set()
+	for cust_id in respondents:
+		resp_map = per_respondent[cust_id]
+		row = [-1] * RANKING_MAX_RANK
+		for rank, choice_idx in resp_map.items():
+			if 1 <= rank <= RANKING_MAX_RANK:
+				row[rank - 1] = choice_idx
+			if choice_idx not in seen_choices:
+				seen_choices.add(choice_idx)
+				choice_appearance.append(choice_idx)
+		ranks.append(row)
+		sel_counts.append(len(resp_map))
+
+	seg_codes: Dict[str, List[int]] = {}
+	seg_levels: Dict[str, List[str]] = {}
+	for seg_key in seg_keys:
+		level_index: Dict[str, int] = {}
+		codes: List[int] = []
+		for cust_id in respondents:
+			v = (first_rows[cust_id].get(seg_key) or '').strip()
+			if not v:
+				codes.append(-1)
 				continue
-	for cust_id, rankings in respondent_rankings.items():
-		# 응답자가 실제로 선택한 순위 집합
-		present_12 = [r for r in (1, 2) if r in rankings]
-		present_123 = [r for r in (1, 2, 3) if r in rankings]
-		# 선택한 순위 개수에 따른 가중치 배열 선택
-		sel_cnt = len(rankings)
-		arr_12 = RANKING_WEIGHTS.get('stats_1or2', {}).get(sel_cnt, [2, 1])
-		arr_123 = RANKING_WEIGHTS.get('stats_1or2or3', {}).get(sel_cnt, [3, 2, 1])
-		# 배열을 rank->weight 맵으로 변환
-		base_weights_12 = {1: float(arr_12[0]) if len(arr_12) > 0 else 0.0, 2: float(arr_12[1]) if len(arr_12) > 1 else 0.0}
-		base_weights_123 = {
-			1: float(arr_123[0]) if len(arr_123) > 0 else 0.0,
-			2: float(arr_123[1]) if len(arr_123) > 1 else 0.0,
-			3: float(arr_123[2]) if len(arr_123) > 2 else 0.0,
-		}
-		# 응답자 단위 정규화
-		def _normalized_weights(base_map: Dict[int, float], present: List[int]) -> Dict[int, float]:
-			if not present:
-				return {}
-			if RANKING_NORMALIZE_PER_RESPONDENT:
-				total = sum(base_map.get(r, 0.0) for r in present)
-				if total <= 0:
-					return {r: 0.0 for r in present}
-				return {r: (base_map.get(r, 0.0) / total) for r in present}
-			else:
-				return {r: base_map.get(r, 0.0) for r in present}
-		weights_12 = _normalized_weights(base_weights_12, present_12)
-		weights_123 = _normalized_weights(base_weights_123, present_123)
-		# 1순위: 가중치 제외(단순 1 카운트)
-		if 1 in rankings:
-			choice = rankings[1]
-			if choice in ranking_stats['1순위']['counts']:
-				ranking_stats['1순위']['counts'][choice] += 1.0
-				ranking_stats['1순위']['parts']['1'][choice] += 1.0
-		# 1+2순위: 고정 가중치(2,1) 사용, 옵션에 따라 응답자 단위 정규화
-		if 1 in rankings:
-			choice = rankings[1]
-			w = float(weights_12.get(1, 0.0))
-			if choice in ranking_stats['1+2순위']['counts'] and w > 0:
-				ranking_stats['1+2순위']['counts'][choice] += w
-				ranking_stats['1+2순위']['parts']['1'][choice] += w
-		if 2 in rankings:
-			choice = rankings[2]
-			w = float(weights_12.get(2, 0.0))
-			if choice in ranking_stats['1+2순위']['counts'] and w > 0:
-				ranking_stats['1+2순위']['counts'][choice] += w
-				ranking_stats['1+2순위']['parts']['2'][choice] += w
-		# 1+2+3순위: 고정 가중치(3,2,1) 사용, 옵션에 따라 응답자 단위 정규화
-		if 1 in rankings:
-			choice = rankings[1]
-			w = float(weights_123.get(1, 0.0))
-			if choice in ranking_stats['1+2+3순위']['counts'] and w > 0:
-				ranking_stats['1+2+3순위']['counts'][choice] += w
-				ranking_stats['1+2+3순위']['parts']['1'][choice] += w
-		if 2 in rankings:
-			choice = rankings[2]
-			w = float(weights_123.get(2, 0.0))
-			if choice in ranking_stats['1+2+3순위']['counts'] and w > 0:
-				ranking_stats['1+2+3순위']['counts'][choice] += w
-				ranking_stats['1+2+3순위']['parts']['2'][choice] += w
-		if 3 in rankings:
-			choice = rankings[3]
-			w = float(weights_123.get(3, 0.0))
-			if choice in ranking_stats['1+2+3순위']['counts'] and w > 0:
-				ranking_stats['1+2+3순위']['counts'][choice] += w
-				ranking_stats['1+2+3순위']['parts']['3'][choice] += w
-	ranking_stats['1순위']['n'] = len(respondent_answ_ids['1순위'])
-	ranking_stats['1+2순위']['n'] = len(respondent_answ_ids['1+2순위'])
-	ranking_stats['1+2+3순위']['n'] = len(respondent_answ_ids['1+2+3순위'])
-	return ranking_stats
+			if v not in level_index:
+				level_index[v] = len(level_index)
+			codes.append(level_index[v])
+		seg_codes[seg_key] = codes
+		seg_levels[seg_key] = list(level_index.keys())
+
+	return RankingMatrix(
+		labels=list(label_order),
+		respondents=respondents,
+		ranks=ranks,
+		sel_counts=sel_counts,
+		seg_codes=seg_codes,
+		seg_levels=seg_levels,
+		choice_appearance=choice_appearance,
+		answ_ids_by_rank=dict(answ_ids_by_rank),
+	)
 
 
 def build_cumulative_ranking_chart(ranking_data: Dict[str, Dict[str, object]], question_title: str) -> str:
@@ -2114,99 +2262,28 @@ def build_cumulative_ranking_chart(ranking_data: Dict[str, Dict[str, object]], q
 	
 	return chart_html
 
-def build_subjective_summary_component(question_rows: List[Dict[str, str]], question_title: str) -> str:
-	"""PoC 스타일(카테고리별 주요 키워드 리포트)로 주관식 컴포넌트를 생성한다."""
+def build_subjective_summary_component(question_rows: List[Dict[str, str]], question_title: str, ctx: Optional["QuestionContext"] = None) -> str:
+	"""PoC 스타일(카테고리별 주요 키워드 리포트)로 주관식 컴포넌트를 생성한다. (ctx가 주어지면 응답자수를 재계산하지 않음)"""
 	if not question_rows:
 		return ""
 	
-	# 입력 정리: PoC 기준 필터 (text_yn 허용, category_level2 제외)
-	rows: List[Dict[str, str]] = []
-	# PoC 제외 카테고리 (category_level2 기준)
-	_excluded_l2 = {'단순 칭찬/불만', '욕설·무관한 피드백', '개선 의사 없음 (“없습니다”)'}
-	def _is_text_allowed(row: Dict[str, str]) -> bool:
-		val = row.get("text_yn")
-		if val is None:
-			return True
-		val_s = str(val).strip()
-		if val_s == "":
-			return True
-		return val_s in {"1", "Y", "y"}
-	for r in question_rows:
-		# text_yn이 명시된 경우 허용값만 통과
-		if not _is_text_allowed(r):
-			continue
-		# category_level2 제외 규칙
-		l2 = (r.get("category_level2") or "").strip()
-		if l2 in _excluded_l2:
-			continue
-		# 유효응답 필터(무효값/최소길이) 제거: 원문 그대로 사용
-		rows.append(r)
-	if not rows:
+	# 입력 정리 + 카테고리/감정/키워드 집계 (PoC 기준 필터: text_yn 허용, category_level2 제외)
+	agg = aggregate_subjective(question_rows, classify_subjective_row, keyword_limit=3)
+	if not agg.rows:
 		return '<div style="margin:8px 0;color:#6B7280;font-size:12px;">주관식 응답이 없습니다.</div>'
-
-	from collections import defaultdict, Counter
-
-	def _cat(row: Dict[str, str]) -> str:
-		# PoC와 동일: category_level1 > category_level2만 사용 (정제/폴백 제거)
-		c1 = (row.get("category_level1") or "").strip()
-		c2 = (row.get("category_level2") or "").strip()
-		if c1 or c2:
-			sep = " > " if (c1 and c2) else ""
-			return (c1 + sep + c2)
-		return ""
-
-	def _sent_raw(row: Dict[str, str]) -> str:
-		# 감정 맵핑 제거: 원본 sentiment 그대로 사용
-		s = (row.get("sentiment") or "").strip()
-		return s
-
-	def _split_kw(s: Optional[str]) -> List[str]:
-		if not s:
-			return []
-		return [p.strip() for p in str(s).split(",") if p and p.strip()]
-
-	# 카테고리별 감정 카운트
-	cat_sent_counts: Dict[str, Counter] = defaultdict(lambda: Counter())
-	cat_total: Counter = Counter()
-	for r in rows:
-		c = _cat(r)
-		s = _sent_raw(r)
-		cat_sent_counts[c][s] += 1
-		cat_total[c] += 1
+	cat_sent_counts = agg.cat_sent_counts
+	cat_total = agg.cat_total
 
 	# 상위 카테고리 선별 (환경 변수 사용)
 	top10_cats: List[str] = [c for c, _ in cat_total.most_common(SUBJECTIVE_MAX_CATEGORIES)]
 
-	# 키워드 집계: (cat,sent,kw) → cnt
-	kw_counts: Counter = Counter()
-	for r in rows:
-		c = _cat(r)
-		s = _sent_raw(r)
-		for kw in _split_kw(r.get("keywords"))[:3]:
-			if kw in SUBJECTIVE_EXCLUDE_KEYWORDS:
-				continue
-			kw_counts[(c, s, kw)] += 1
-
 	# 감정별 상위 5개 키워드 문자열 생성
-	keyword_anal_map: Dict[Tuple[str, str], str] = {}
-	# 그룹핑을 위해 정렬 후 순회
-	for (c, s, kw), cnt in sorted(kw_counts.items(), key=lambda x: (-x[1], x[0][2])):
-		key = (c, s)
-		if key not in keyword_anal_map:
-			keyword_anal_map[key] = f"{kw}({cnt})"
-		else:
-			# 이미 5개면 스킵
-			existing = keyword_anal_map[key]
-			if existing.count("(") >= 5:
-				continue
-			keyword_anal_map[key] = existing + ", " + f"{kw}({cnt})"
+	keyword_anal_map = agg.keyword_anal_map(5)
 
-	# 데이터2: 요약문 랭킹용 행 구성
-	entries: List[Dict[str, object]] = []
+	# 데이터2: 요약문 랭킹용 행 구성 ((카테고리, 감정)별 후보)
+	entries: Dict[Tuple[str, str], List[Dict[str, object]]] = defaultdict(list)
 	_seen: Set[Tuple[str, str, str, str]] = set()
-	for r in rows:
-		c = _cat(r)
-		s = _sent_raw(r)
+	for r, (c, s) in zip(agg.rows, agg.keys):
 		if c not in top10_cats:
 			continue
 		kw_anal = keyword_anal_map.get((c, s), "")
@@ -2216,43 +2293,14 @@ def build_subjective_summary_component(question_rows: List[Dict[str, str]], ques
 		if key in _seen:
 			continue
 		_seen.add(key)
-		# 키워드 히트 수 계산
-		def _kw_hits(kw_anal_text: str, body: str) -> int:
-			if not kw_anal_text or not body:
-				return 0
-			kws = [re.sub(r"\(.*\)", "", k).strip() for k in kw_anal_text.split(",")]
-			return sum(1 for k in kws if k and k in body)
-		hits = _kw_hits(kw_anal, text)
-		entries.append({
-			"cat": c,
-			"sent": s,
+		entries[(c, s)].append({
 			"summary": summary,
-			"kw_anal": kw_anal,
-			"hits": hits,
+			"hits": _keyword_anal_hits(kw_anal, text),
 			"len": len(summary),
 		})
 
-	# 감정별 랭킹 및 개수 제한 적용 (선택 단계에서 중복 제거하며 limit 채움)
-	def _normalize_summary_text(text: str) -> str:
-		s = (text or "").strip()
-		s = re.sub(r"\s+", " ", s)
-		return s
-
 	def _pick_summaries(cat: str, sent: str, limit: int) -> List[str]:
-		cand = [e for e in entries if e["cat"] == cat and e["sent"] == sent]
-		cand.sort(key=lambda e: (-int(e["hits"]), -int(e["len"])))
-		seen_norm: Set[str] = set()
-		result: List[str] = []
-		for e in cand:
-			s = str(e["summary"])
-			sn = _normalize_summary_text(s)
-			if sn in seen_norm:
-				continue
-			seen_norm.add(sn)
-			result.append(s)
-			if len(result) >= limit:
-				break
-		return result
+		return _pick_subjective_summaries(entries.get((cat, sent), []), limit)
 
 	# HTML 생성 (PoC 테이블 스타일)
 	def _pct(a: int, b: int) -> str:
@@ -2260,7 +2308,10 @@ def build_subjective_summary_component(question_rows: List[Dict[str, str]], ques
 		return f"{val:.1f}%"
 
 	# 헤딩 및 컨테이너 (Base/Total 병행 표기)
-	base_n = len({(r.get('cust_id') or '').strip() for r in question_rows if (r.get('cust_id') or '').strip()})
+	if ctx is not None:
+		base_n = ctx.respondent_count
+	else:
+		base_n = len({(r.get('cust_id') or '').strip() for r in question_rows if (r.get('cust_id') or '').strip()})
 	total_n = len(question_rows)
 	base_total_text = (
 		f"(응답자수={base_n:,} / 답변수={total_n:,})" if total_n != base_n
@@ -2387,51 +2438,50 @@ def build_subjective_summary_component(question_rows: List[Dict[str, str]], ques
 	return ''.join(html_parts)
 
 
-def _render_general_heatmap_table(question_rows: List[Dict[str, str]], order: List[str]) -> str:
-	"""일반형 히트맵 테이블을 생성한다. (with_cross_analysis 버전 렌더 기준)
-	- 행: 세그 버킷(전체 + 각 세그 값)
-	- 열: 라벨(기타 열은 오른쪽 고정)
-	- 엣지케이스: 전체 대비 응답순서가 다른 세그 조합을 감지하여 값 바에만 강조색 적용
-	- 색상 스케일: n(해당 행의 total)이 임계치 미만이면 그레이스케일, 아니면 동적 히트맵 스케일링
-	"""
-	# 세그 정의 및 버킷 수집
-	seg_defs: List[Tuple[str, str]] = [
-		("성별", "gndr_seg"),
-		("계좌고객", "account_seg"),
-		("연령대", "age_seg"),
-		("가입경과일", "rgst_gap"),
-		("VASP 연결", "vasp"),
-		("수신상품 가입", "dp_seg"),
-		("대출상품 가입", "loan_seg"),
-		("카드상품 가입", "card_seg"),
-		("서비스 이용", "suv_seg"),
-	]
-	preferred_orders: Dict[str, List[str]] = {
-		"gndr_seg": ["01.남성", "02.여성"],
-		"age_seg": ["01.10대","02.20대","03.30대","04.40대","05.50대","06.60대","07.기타"],
-	}
-	seg_bucket_rows: List[Tuple[str, List[Dict[str, str]]]] = []
-	seg_bucket_rows.append(("전체", question_rows))
-	for seg_title, seg_key in seg_defs:
-		vals = set()
+def _collect_seg_buckets(question_rows: List[Dict[str, str]]) -> List[Tuple[str, List[Dict[str, str]]]]:
+	"""히트맵 행 버킷 [(전체|"세그명 - 값", 행 목록)]을 수집한다. ('기타' 값 버킷 제외, 행 순서 유지)"""
+	seg_bucket_rows: List[Tuple[str, List[Dict[str, str]]]] = [("전체", question_rows)]
+	for seg_title, seg_key in HEATMAP_SEG_DEFS:
+		rows_by_val: Dict[str, List[Dict[str, str]]] = {}
 		for r in question_rows:
 			v = (r.get(seg_key) or "").strip()
 			if v:
-				vals.add(v)
-		if seg_key in preferred_orders:
-			ordered_vals = [v for v in preferred_orders[seg_key] if v in vals]
-			remain = sorted([v for v in vals if v not in set(ordered_vals)])
-			ordered_vals += remain
+				rows_by_val.setdefault(v, []).append(r)
+		if seg_key in HEATMAP_SEG_PREFERRED_ORDERS:
+			ordered_vals = [v for v in HEATMAP_SEG_PREFERRED_ORDERS[seg_key] if v in rows_by_val]
+			ordered_vals += sorted(v for v in rows_by_val if v not in set(ordered_vals))
 		else:
-			ordered_vals = sorted(vals)
+			ordered_vals = sorted(rows_by_val)
 		for raw_val in ordered_vals:
 			if clean_axis_label(raw_val) == '기타':
 				continue
-			bucket_label = f"{seg_title} - {clean_axis_label(raw_val)}"
-			rows_subset = [r for r in question_rows if (r.get(seg_key) or '').strip() == raw_val]
-			if not rows_subset:
-				continue
-			seg_bucket_rows.append((bucket_label, rows_subset))
+			seg_bucket_rows.append((f"{seg_title} - {clean_axis_label(raw_val)}", rows_by_val[raw_val]))
+	return seg_bucket_rows
+
+
+def _evaluation_label(r: Dict[str, str], row_labels: Optional[Dict[int, Optional[str]]] = None) -> str:
+	"""평가형 히트맵 집계 라벨 (row_labels가 주어지면 문항 컨텍스트의 정규화 라벨 사용)."""
+	if row_labels is not None:
+		return row_labels.get(id(r)) or ''
+	return (r.get('lkng_cntnt') or r.get('answ_cntnt') or '').strip()
+
+
+def _render_general_heatmap_table(
+	question_rows: List[Dict[str, str]],
+	order: List[str],
+	row_labels: Optional[Dict[int, Optional[str]]] = None,
+	seg_buckets: Optional[List[Tuple[str, List[Dict[str, str]]]]] = None,
+) -> str:
+	"""일반형 히트맵 테이블을 생성한다. (with_cross_analysis 버전 렌더 기준)
+	- 행: 세그 버킷(전체 + 각 세그 값)
+	- 열: 라벨(기타 열은 오른쪽 고정)
+	- row_labels: id(row) → 라벨 (QuestionContext.label_by_row_id). 주어지면 행별 라벨을 재계산하지 않음
+	- seg_buckets: 세그 버킷 (QuestionContext.seg_buckets). 주어지면 버킷을 다시 수집하지 않음
+	- 엣지케이스: 전체 대비 응답순서가 다른 세그 조합을 감지하여 값 바에만 강조색 적용
+	- 색상 스케일: n(해당 행의 total)이 임계치 미만이면 그레이스케일, 아니면 동적 히트맵 스케일링
+	"""
+	# 세그 버킷 수집 (문항 컨텍스트가 있으면 재사용)
+	seg_bucket_rows = seg_buckets if seg_buckets is not None else _collect_seg_buckets(question_rows)
 
 	# 스타일
 	head_style = 'padding:6px 8px;color:#111827;font-size:12px;text-align:center;'
@@ -2472,7 +2522,7 @@ def _render_general_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 	for name, rows in seg_bucket_rows:
 		cnts = {l: 0 for l in order}
 		for r in rows:
-			label = label_for_row(r, 'objective') or ''
+			label = (row_labels.get(id(r)) if row_labels is not None else label_for_row(r, 'objective')) or ''
 			if label in cnts:
 				cnts[label] += 1
 		total = sum(cnts.values()) or 1
@@ -2497,8 +2547,8 @@ def _render_general_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 	min_pct = min(all_pcts) if all_pcts else 0.0
 	max_pct = max(all_pcts) if all_pcts else 100.0
 
-	# 전체 순위(엣지케이스 비교용)
-	overall_rank: List[str] = _compute_overall_rank_from_rows_data(rows_data, order)
+	# 전체 대비 응답순서 이탈 여부(엣지케이스 비교용)
+	rank_deviation_flags: List[bool] = _compute_rank_deviation_flags(rows_data, order)
 
 	# rowspan 및 막대 기준
 	first_index: Dict[str, int] = {}
@@ -2524,10 +2574,7 @@ def _render_general_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 		if is_group_start:
 			cells.append(f'<td rowspan="{rowspan_count.get(seg_name,1)}" style="{rowhead_style}">{html_escape(seg_name)}</td>')
 		# 엣지케이스 판단 (값 바 강조 전용)
-		seg_pct_map: Dict[str, float] = {lb: (cnts[lb] * 100.0 / (total or 1)) for lb in order}
-		seg_rank: List[str] = sorted(order, key=lambda lb: (-seg_pct_map.get(lb, 0.0), order.index(lb)))
-		orank: List[str] = overall_rank
-		is_edgecase = (seg_value != '' and bool(orank) and seg_rank != orank)
+		is_edgecase = (seg_value != '' and rank_deviation_flags[idx])
 
 		# 값 열
 		bar_w = int(round((total / (max_total or 1)) * 100))
@@ -2594,45 +2641,15 @@ def _render_general_heatmap_table(question_rows: List[Dict[str, str]], order: Li
 	# =========================
 	# 평가형: 공통 히트맵 렌더러
 	# =========================
-def _render_evaluation_heatmap_table(question_rows: List[Dict[str, str]], order: List[str]) -> str:
-	# 세그 정의 및 버킷 수집
-	seg_defs: List[Tuple[str, str]] = [
-		("성별", "gndr_seg"),
-		("계좌고객", "account_seg"),
-		("연령대", "age_seg"),
-		("가입경과일", "rgst_gap"),
-		("VASP 연결", "vasp"),
-		("수신상품 가입", "dp_seg"),
-		("대출상품 가입", "loan_seg"),
-		("카드상품 가입", "card_seg"),
-		("서비스 이용", "suv_seg"),
-	]
-	preferred_orders: Dict[str, List[str]] = {
-		"gndr_seg": ["01.남성", "02.여성"],
-		"age_seg": ["01.10대","02.20대","03.30대","04.40대","05.50대","06.60대","07.기타"],
-	}
-	seg_bucket_rows: List[Tuple[str, List[Dict[str, str]]]] = []
-	seg_bucket_rows.append(("전체", question_rows))
-	for seg_title, seg_key in seg_defs:
-		vals = set()
-		for r in question_rows:
-			v = (r.get(seg_key) or "").strip()
-			if v:
-				vals.add(v)
-		if seg_key in preferred_orders:
-			ordered_vals = [v for v in preferred_orders[seg_key] if v in vals]
-			remain = sorted([v for v in vals if v not in set(ordered_vals)])
-			ordered_vals += remain
-		else:
-			ordered_vals = sorted(vals)
-		for raw_val in ordered_vals:
-			if clean_axis_label(raw_val) == '기타':
-				continue
-			bucket_label = f"{seg_title} - {clean_axis_label(raw_val)}"
-			rows_subset = [r for r in question_rows if (r.get(seg_key) or '').strip() == raw_val]
-			if not rows_subset:
-				continue
-			seg_bucket_rows.append((bucket_label, rows_subset))
+def _render_evaluation_heatmap_table(
+	question_rows: List[Dict[str, str]],
+	order: List[str],
+	row_labels: Optional[Dict[int, Optional[str]]] = None,
+	seg_buckets: Optional[List[Tuple[str, List[Dict[str, str]]]]] = None,
+) -> str:
+	"""평가형 히트맵 테이블 (row_labels/seg_buckets는 일반형 히트맵과 동일하게 문항 컨텍스트 값을 재사용)."""
+	# 세그 버킷 수집 (문항 컨텍스트가 있으면 재사용)
+	seg_bucket_rows = seg_buckets if seg_buckets is not None else _collect_seg_buckets(question_rows)
 
 	# 스타일
 	head_style = 'padding:6px 8px;color:#111827;font-size:12px;text-align:center;'
@@ -2673,7 +2690,7 @@ def _render_evaluation_heatmap_table(question_rows: List[Dict[str, str]], order:
 	for name, rows in seg_bucket_rows:
 		cnts = {l: 0 for l in order}
 		for r in rows:
-			content = (r.get('lkng_cntnt') or r.get('answ_cntnt') or '').strip()
+			content = _evaluation_label(r, row_labels)
 			if content in cnts:
 				cnts[content] += 1
 		total = sum(cnts.values()) or 1
@@ -2707,13 +2724,8 @@ def _render_evaluation_heatmap_table(question_rows: List[Dict[str, str]], order:
 	min_avg_score = min(avg_scores) if avg_scores else 1.0
 	max_avg_score = max(avg_scores) if avg_scores else 5.0
 
-	# 전체 순위(엣지케이스 비교용)
-	overall_rank: List[str] = []
-	if rows_data:
-		overall_cnts = rows_data[0]['cnts']  # type: ignore
-		overall_total = int(rows_data[0]['total'])  # type: ignore
-		overall_pct_map: Dict[str, float] = {lb: ((overall_cnts[lb] * 100.0) / (overall_total or 1)) for lb in order}  # type: ignore
-		overall_rank = sorted(order, key=lambda lb: (-overall_pct_map.get(lb, 0.0), order.index(lb)))
+	# 전체 대비 응답순서 이탈 여부(엣지케이스 비교용)
+	rank_deviation_flags: List[bool] = _compute_rank_deviation_flags(rows_data, order)
 
 	# rowspan 및 막대 기준
 	first_index: Dict[str, int] = {}
@@ -2739,10 +2751,7 @@ def _render_evaluation_heatmap_table(question_rows: List[Dict[str, str]], order:
 		if is_group_start:
 			cells.append(f'<td rowspan="{rowspan_count.get(seg_name,1)}" style="{rowhead_style}">{html_escape(seg_name)}</td>')
 		# 엣지케이스 판단(값 바 강조 전용)
-		seg_pct_map: Dict[str, float] = {lb: (cnts[lb] * 100.0 / (total or 1)) for lb in order}
-		seg_rank: List[str] = sorted(order, key=lambda lb: (-seg_pct_map.get(lb, 0.0), order.index(lb)))
-		orank: List[str] = overall_rank
-		is_edgecase = (seg_value != '' and bool(orank) and seg_rank != orank)
+		is_edgecase = (seg_value != '' and rank_deviation_flags[idx])
 
 		# 값 열
 		bar_w = int(round((total / (max_total or 1)) * 100))
@@ -2825,15 +2834,20 @@ def build_heatmap_component(
 	question_id: str = None,
 	extra_footer_html: str = '',
 	remark_base_items: Optional[List[str]] = None,
+	ctx: Optional["QuestionContext"] = None,
 ) -> str:
 	"""단일 히트맵 컴포넌트 생성.
 	옵션에 따라 일반형/평가형, 교차분석 유무, 기타요약 유무를 제어한다.
+	ctx가 주어지면 문항 컨텍스트의 정규화 라벨과 세그 버킷을 재사용한다.
 	"""
+	# 히트맵 라벨 규칙은 객관식 계열 기준이므로 주관식 컨텍스트 라벨은 재사용하지 않음
+	row_labels = ctx.label_by_row_id() if (ctx is not None and ctx.qtype != 'subjective') else None
+	seg_buckets = ctx.seg_buckets() if ctx is not None else None
 	# 테이블 생성 (kind에 따라 렌더러 선택)
 	if kind == 'evaluation':
-		table = _render_evaluation_heatmap_table(question_rows, order)
+		table = _render_evaluation_heatmap_table(question_rows, order, row_labels, seg_buckets)
 	else:
-		table = _render_general_heatmap_table(question_rows, order)
+		table = _render_general_heatmap_table(question_rows, order, row_labels, seg_buckets)
 	
 	# 교차분석 섹션
 	edge_cases_section = ''
@@ -2842,7 +2856,10 @@ def build_heatmap_component(
 		qtype_for_cross = 'evaluation' if kind == 'evaluation' else 'objective'
 		for label in order:
 			edge_cases.extend(_analyze_cross_segments(question_rows, question_title or ("평가형 문항" if kind=='evaluation' else "객관식 문항"), qtype_for_cross, label))
-		edge_cases_section = _build_question_edge_cases_section(edge_cases, order, question_rows, all_data, question_id)
+		edge_cases_section = mark_optional_section(
+			_build_question_edge_cases_section(edge_cases, order, question_rows, all_data, question_id),
+			"cross_analysis",
+		)
 
 	has_table_edgecase = has_heatmap_edgecase_marker(table)
 	has_cross_edgecase = bool(edge_cases) if include_cross_analysis else False
@@ -2855,12 +2872,12 @@ def build_heatmap_component(
 	# 기타 응답 요약 (일반형에서만 의미 있음)
 	other_summary_section = ''
 	if include_other_summary and kind == 'general':
-		other_summary_section = build_other_responses_summary(question_rows)
+		other_summary_section = mark_optional_section(build_other_responses_summary(question_rows), "other_summary")
 	
 	heading = '<div style="font-weight:700;font-size:14px;color:#111827;margin-bottom:0;">Seg.별 히트맵</div>'
 	return '<div style="margin:12px 0;padding:12px;border:1px solid #E5E7EB;border-radius:6px;background:#FFFFFF;">' + heading + table + legend_note_html + (extra_footer_html if extra_footer_html else '') + edge_cases_section + (other_summary_section if other_summary_section else '') + '</div>'
 
-def build_general_heatmap_only(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "객관식 문항", all_data: List[Dict[str, str]] = None, question_id: str = None) -> str:
+def build_general_heatmap_only(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "객관식 문항", all_data: List[Dict[str, str]] = None, question_id: str = None, ctx: Optional["QuestionContext"] = None) -> str:
 	"""객관식(일반) 문항용 히트맵: 행=세그 버킷, 열=라벨.
 	- 만족도 전용 요약/순만족도 없이, 퍼센트 셀만 표시
 	- 스타일은 만족도 히트맵과 톤앤매너 일치
@@ -2877,9 +2894,10 @@ def build_general_heatmap_only(question_rows: List[Dict[str, str]], label_order:
 		all_data=all_data,
 		question_id=question_id,
 		remark_base_items=[DEFAULT_HEATMAP_REMARK_BASE],
+		ctx=ctx,
 	)
 
-def build_evaluation_heatmap_only(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "평가형 문항", all_data: List[Dict[str, str]] = None, question_id: str = None) -> str:
+def build_evaluation_heatmap_only(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "평가형 문항", all_data: List[Dict[str, str]] = None, question_id: str = None, ctx: Optional["QuestionContext"] = None) -> str:
 	"""모든 세그먼트를 포함하는 평가형 히트맵(행=세그 버킷, 열=평가 라벨+순만족도).
 	기존 보고서 스타일(테이블+인라인 CSS)과 색상램프(_shade_for_pct)를 사용한다.
 	교차분석 제외
@@ -2916,6 +2934,7 @@ def build_evaluation_heatmap_only(question_rows: List[Dict[str, str]], label_ord
 		all_data=all_data,
 		question_id=question_id,
 		remark_base_items=[DEFAULT_HEATMAP_REMARK_BASE],
+		ctx=ctx,
 	)
 
 def _hex_to_rgb(h: str) -> Tuple[int, int, int]:
@@ -3007,62 +3026,22 @@ def _bucket_from_text(s: str) -> Optional[str]:
 	if ls == "매우 불만족":
 		return "매우 불만족해요"
 	return None
-def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "평가형 문항", all_data: List[Dict[str, str]] = None, question_id: str = None) -> str:
+def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "평가형 문항", all_data: List[Dict[str, str]] = None, question_id: str = None, ctx: Optional["QuestionContext"] = None) -> str:
 	"""모든 세그먼트를 포함하는 평가형 히트맵(행=세그 버킷, 열=평가형 라벨+순만족도).
 	기존 보고서 스타일(테이블+인라인 CSS)과 색상램프(_shade_for_pct)를 사용한다.
+	ctx가 주어지면 문항 컨텍스트의 정규화 라벨과 세그 버킷을 재사용한다.
 	"""
 	# 평가형은 제공된 label_order를 그대로 사용 (패턴 간주 제거)
 	order = [lb for lb in label_order]
-	# 세그 정의: (표시명, 키)
-	seg_defs: List[Tuple[str, str]] = [
-		("성별", "gndr_seg"),
-		("계좌고객", "account_seg"),
-		("연령대", "age_seg"),
-		("가입경과일", "rgst_gap"),
-		("VASP 연결", "vasp"),
-		("수신상품 가입", "dp_seg"),
-		("대출상품 가입", "loan_seg"),
-		("카드상품 가입", "card_seg"),
-		("서비스 이용", "suv_seg"),
-	]
-	# 세그별 버킷 후보(존재하는 것만 사용). 일부는 정해진 순서를 제공
-	preferred_orders: Dict[str, List[str]] = {
-		"gndr_seg": ["01.남성", "02.여성"],
-		"age_seg": ["01.10대","02.20대","03.30대","04.40대","05.50대","06.60대","07.기타"],
-	}
-	# 버킷 수집
-	seg_bucket_rows: List[Tuple[str, List[Dict[str, str]]]] = []
-	# 전체(집계) 먼저 한 줄 추가
-	seg_bucket_rows.append(("전체", question_rows))
-	for seg_title, seg_key in seg_defs:
-		vals = set()
-		for r in question_rows:
-			v = (r.get(seg_key) or "").strip()
-			if v:
-				vals.add(v)
-		# 선호 순서가 있으면 그 순서로, 아니면 문자열 정렬
-		if seg_key in preferred_orders:
-			ordered_vals = [v for v in preferred_orders[seg_key] if v in vals]
-			# 누락분은 사전순으로 뒤에
-			remain = sorted([v for v in vals if v not in set(ordered_vals)])
-			ordered_vals += remain
-		else:
-			ordered_vals = sorted(vals)
-		for raw_val in ordered_vals:
-			# '기타' 버킷 제외
-			if clean_axis_label(raw_val) == '기타':
-				continue
-			bucket_label = f"{seg_title} - {clean_axis_label(raw_val)}"
-			rows_subset = [r for r in question_rows if (r.get(seg_key) or '').strip() == raw_val]
-			if not rows_subset:
-				continue
-			seg_bucket_rows.append((bucket_label, rows_subset))
+	# 세그 버킷 수집 (문항 컨텍스트가 있으면 재사용)
+	seg_bucket_rows = ctx.seg_buckets() if ctx is not None else _collect_seg_buckets(question_rows)
+	row_labels = ctx.label_by_row_id() if (ctx is not None and ctx.qtype != 'subjective') else None
 
 	# 요약 카드 데이터(전체 기준)
 	def _counts(rows: List[Dict[str, str]]) -> Dict[str, int]:
 		c = {l: 0 for l in order}
 		for r in rows:
-			content = (r.get('lkng_cntnt') or r.get('answ_cntnt') or '').strip()
+			content = _evaluation_label(r, row_labels)
 			# 숫자 답변을 텍스트로 변환 (평가형 문항용)
 			if content.isdigit():
 				score = int(content)
@@ -3142,7 +3121,7 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 		# 전체(첫 번째 원소)의 분포를 기준으로 전체 순위 산출
 		overall_cnts_eval: Dict[str, int] = {l: 0 for l in order}
 		for r in seg_bucket_rows[0][1]:
-			content = (r.get('lkng_cntnt') or r.get('answ_cntnt') or '').strip()
+			content = _evaluation_label(r, row_labels)
 			if content in overall_cnts_eval:
 				overall_cnts_eval[content] += 1
 		overall_total_eval = sum(overall_cnts_eval.values()) or 1
@@ -3153,7 +3132,7 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 	for name, rows in seg_bucket_rows:
 		cnts = {l: 0 for l in order}
 		for r in rows:
-			content = (r.get('lkng_cntnt') or r.get('answ_cntnt') or '').strip()
+			content = _evaluation_label(r, row_labels)
 			if content in cnts:
 				cnts[content] += 1
 		total = sum(cnts.values()) or 1
@@ -3213,6 +3192,9 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 	min_avg_score = min(avg_scores) if avg_scores else 1.0
 	max_avg_score = max(avg_scores) if avg_scores else 5.0
 
+	# 전체(첫 행) 대비 응답순서 이탈 여부(엣지케이스 비교용)
+	rank_deviation_flags: List[bool] = _compute_rank_deviation_flags(rows_data, order)
+
 	# 세그별 첫번째 인덱스와 rowspan 계산
 	first_index: Dict[str, int] = {}
 	rowspan_count: Dict[str, int] = {}
@@ -3245,10 +3227,7 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 		if is_group_start:
 			cells.append(f'<td rowspan="{rowspan_count.get(seg_name,1)}" style="{rowhead_style}">{html_escape(seg_name)}</td>')
 		# 이 행의 보기별 퍼센트 순위 계산 (엣지케이스 판단용)
-		seg_pct_map: Dict[str, float] = {lb: (cnts[lb] * 100.0 / (total or 1)) for lb in order}
-		seg_rank: List[str] = sorted(order, key=lambda lb: (-seg_pct_map.get(lb, 0.0), order.index(lb)))
-		orank: List[str] = _compute_overall_rank_from_rows_data(rows_data, order)
-		is_edgecase = (seg_value != '' and bool(orank) and seg_rank != orank)
+		is_edgecase = (seg_value != '' and rank_deviation_flags[idx])
 		# 값 열: 100% 폭 테이블 + 좌측 bar TD(비율, 텍스트 포함) + 우측 여백 TD(잔여)
 		bar_w = int(round((total / (max_total or 1)) * 100))
 		bar_w_css = max(1, bar_w)  # 폭 0%에서도 텍스트가 보이도록 최소 1px 확보
@@ -3364,7 +3343,7 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 	# 세그별 순만족도(Top2) 랭킹 요약(부등호 체인)
 	def _build_seg_rank_summary() -> str:
 		cells_html: List[str] = []
-		for seg_title, seg_key in seg_defs:
+		for seg_title, seg_key in HEATMAP_SEG_DEFS:
 			# seg 값별 rows 수집
 			val_to_rows: Dict[str, List[Dict[str, str]]] = {}
 			for r in question_rows:
@@ -3421,7 +3400,10 @@ def build_objective_evaluation_heatmap(question_rows: List[Dict[str, str]], labe
 	)
 
 	# 엣지케이스 섹션 생성 (평가형용)
-	edge_cases_section = _build_evaluation_edge_cases_section(edge_cases, order, question_rows, all_data, question_id)
+	edge_cases_section = mark_optional_section(
+		_build_evaluation_edge_cases_section(edge_cases, order, question_rows, all_data, question_id),
+		"cross_analysis",
+	)
 
 	# 요약(카드/랭크) 제거하고 제목 바로 아래 히트맵 표시
 	return '<div style="margin:12px 0;padding:12px;border:1px solid #E5E7EB;border-radius:6px;background:#FFFFFF;">' + heading + table + remark_html + edge_cases_section + '</div>'
@@ -3497,6 +3479,68 @@ def group_by_question(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, object]
 			grouped[qid] = {"title": title, "rows": []}
 		grouped[qid]["rows"].append(r)
 	return grouped
+
+
+@dataclass
+class QuestionContext:
+	"""문항 1건의 공통 분석 정보. 문항당 한 번 생성하여 모든 build_*_component가 공유한다.
+
+	- qtype: 문항 타입 (get_question_type)
+	- ordered_counts / label_order: 전체 응답 분포와 라벨 순서 (compute_overall_distribution)
+	- respondent_count: 응답자수 (고유 cust_id 수)
+	- row_labels: 행별 정규화 라벨 (label_for_row, rows와 같은 순서. 무효 응답은 None)
+	"""
+	qid: str
+	title: str
+	rows: List[Dict[str, str]]
+	qtype: str
+	label_order: List[str]
+	ordered_counts: "OrderedDict[str, int]"
+	respondent_count: int
+	row_labels: List[Optional[str]]
+	_label_by_row_id: Optional[Dict[int, Optional[str]]] = field(default=None, repr=False)
+	_seg_buckets: Optional[List[Tuple[str, List[Dict[str, str]]]]] = field(default=None, repr=False)
+	_ranking_matrix: Optional["RankingMatrix"] = field(default=None, repr=False)
+
+	def label_by_row_id(self) -> Dict[int, Optional[str]]:
+		"""id(row) → 정규화 라벨 매핑 (세그 버킷 등 행 부분집합에서 라벨 재계산 없이 조회)."""
+		if self._label_by_row_id is None:
+			self._label_by_row_id = {id(r): lb for r, lb in zip(self.rows, self.row_labels)}
+		return self._label_by_row_id
+
+	def seg_buckets(self) -> List[Tuple[str, List[Dict[str, str]]]]:
+		"""히트맵 세그 버킷 (최초 호출 시 1회 수집, 일반형/평가형 히트맵 공용)."""
+		if self._seg_buckets is None:
+			self._seg_buckets = _collect_seg_buckets(self.rows)
+		return self._seg_buckets
+
+	def ranking_matrix(self) -> "RankingMatrix":
+		"""순위형 응답 행렬 (최초 호출 시 1회 컴파일, 응답통계/히트맵 공용)."""
+		if self._ranking_matrix is None:
+			self._ranking_matrix = compile_ranking_matrix(self.rows, self.label_order)
+		return self._ranking_matrix
+
+
+def build_question_context(qid: str, title: str, question_rows: List[Dict[str, str]]) -> QuestionContext:
+	"""문항 행으로부터 QuestionContext를 생성한다. (타입 판정/라벨 정규화/분포 계산을 1회만 수행)"""
+	qtype = get_question_type(question_rows)
+	row_labels = [label_for_row(r, qtype) for r in question_rows]
+	ordered_counts, label_order, _ = compute_overall_distribution(question_rows, qtype=qtype, row_labels=row_labels)
+	respondent_ids = set()
+	for r in question_rows:
+		cust_id = (r.get("cust_id") or "").strip()
+		if cust_id:
+			respondent_ids.add(cust_id)
+	return QuestionContext(
+		qid=qid,
+		title=title,
+		rows=question_rows,
+		qtype=qtype,
+		label_order=label_order,
+		ordered_counts=ordered_counts,
+		respondent_count=len(respondent_ids),
+		row_labels=row_labels,
+	)
 def pick_label_for_row(r: Dict[str, str]) -> Optional[str]:
 	"""한 행에서 그래프/범례용 라벨 후보를 선택.
 
@@ -3642,15 +3686,22 @@ def _expected_evaluation_numeric_labels(question_rows: List[Dict[str, str]]) ->
 	return [str(i).zfill(pad_width) for i in range(1, max_scale + 1)]
 
 
-def compute_overall_distribution(question_rows: List[Dict[str, str]]):
+def compute_overall_distribution(
+	question_rows: List[Dict[str, str]],
+	qtype: Optional[str] = None,
+	row_labels: Optional[List[Optional[str]]] = None,
+):
 	"""(OrderedDict[label->count], label_order, qtype)를 반환.
 	- 원천 데이터에서 중복 제거를 수행하므로 추가 dedup을 하지 않습니다.
+	- qtype / row_labels(행별 label_for_row 결과)가 주어지면 재계산하지 않습니다.
 	"""
-	qtype = get_question_type(question_rows)
+	if qtype is None:
+		qtype = get_question_type(question_rows)
+	if row_labels is None:
+		row_labels = [label_for_row(r, qtype) for r in question_rows]
 	counts: Dict[str, int] = defaultdict(int)
 	sortmap: Dict[str, object] = {}
-	for r in question_rows:
-		lb = label_for_row(r, qtype)
+	for r, lb in zip(question_rows, row_labels):
 		if lb is None:
 			continue
 		counts[lb] += 1
@@ -4230,9 +4281,11 @@ def compute_seg_distributions(
 	question_rows: List[Dict[str, str]],
 	seg_key: str,
 	label_order: List[str],
+	qtype: Optional[str] = None,
 ) -> List[Tuple[str, List[Tuple[str, int]]]]:
 	"""세그 값별 (label,count) 목록을 반환. 세그값과 항목은 오름차순.
 	- 원천 데이터에서 중복 제거를 수행하므로 추가 dedup을 하지 않습니다.
+	- qtype이 주어지면 문항 타입을 재판정하지 않습니다.
 	"""
 	rows = question_rows
 	by_seg: Dict[str, List[Dict[str, str]]] = defaultdict(list)
@@ -4247,7 +4300,8 @@ def compute_seg_distributions(
 
 	ordered_seg_vals = sorted(by_seg.keys())
 	results: List[Tuple[str, List[Tuple[str, int]]]] = []
-	qtype = get_question_type(rows)
+	if qtype is None:
+		qtype = get_question_type(rows)
 	for seg_val in ordered_seg_vals:
 		rows_seg = by_seg[seg_val]
 		local_counts: Dict[str, int] = defaultdict(int)
@@ -4489,77 +4543,323 @@ def _split_keywords(s: Optional[str]) -> List[str]:
 	return [p for p in parts if p]
 
 
+# PoC 제외 카테고리 (category_level2 기준)
+_SUBJECTIVE_EXCLUDED_L2 = {'단순 칭찬/불만', '욕설·무관한 피드백', '개선 의사 없음 (“없습니다”)'}
+
+# 카테고리 표(aggregate_subjective_by_category) 감정 → 필드명
+_SUBJECTIVE_SENTIMENT_FIELDS: Tuple[Tuple[str, str], ...] = (
+	('긍정', 'pos'), ('부정', 'neg'), ('제안', 'sug'), ('문의', 'inq'), ('무응답', 'no_resp'),
+)
+
+
+@dataclass
+class SubjectiveAggregate:
+	"""주관식 집계 결과. 문항당 1회 순회로 계산하여 주관식 뷰(요약/기타 응답 요약/카테고리 표)가 공유한다.
+
+	- rows / keys: 필터를 통과한 행과 행별 (카테고리, 감정) 키 (같은 순서)
+	- cat_total: 카테고리별 건수 (최초 등장 순서 유지)
+	- cat_sent_counts: 카테고리 → 감정별 건수
+	- keyword_counts: (카테고리, 감정) → 키워드별 건수 (최초 등장 순서 유지)
+	"""
+	rows: List[Dict[str, str]]
+	keys: List[Tuple[str, str]]
+	cat_total: Counter
+	cat_sent_counts: Dict[str, Counter]
+	keyword_counts: Dict[Tuple[str, str], Counter]
+
+	def keyword_anal_map(self, limit: int) -> Dict[Tuple[str, str], str]:
+		"""(카테고리, 감정)별 상위 키워드 문자열 "kw(n), kw(n)" (건수 내림차순, 동률은 키워드순)."""
+		result: Dict[Tuple[str, str], str] = {}
+		for key, ctr in self.keyword_counts.items():
+			text = ""
+			for kw, cnt in sorted(ctr.items(), key=lambda x: (-x[1], x[0])):
+				if text:
+					# 이미 limit개면 중단
+					if text.count("(") >= limit:
+						break
+					text = text + ", " + f"{kw}({cnt})"
+				else:
+					text = f"{kw}({cnt})"
+			if text:
+				result[key] = text
+		return result
+
+
+def _subjective_category(row: Dict[str, str]) -> str:
+	"""PoC 카테고리 표기: category_level1 > category_level2 (정제/폴백 없음)."""
+	c1 = (row.get("category_level1") or "").strip()
+	c2 = (row.get("category_level2") or "").strip()
+	if c1 or c2:
+		sep = " > " if (c1 and c2) else ""
+		return c1 + sep + c2
+	return ""
+
+
+def classify_subjective_row(row: Dict[str, str]) -> Optional[Tuple[str, str]]:
+	"""주관식 요약(PoC)용 (카테고리, 감정) 키. text_yn이 명시된 경우 허용값만, 제외 category_level2는 None."""
+	val = row.get("text_yn")
+	if val is not None:
+		val_s = str(val).strip()
+		if val_s != "" and val_s not in {"1", "Y", "y"}:
+			return None
+	if (row.get("category_level2") or "").strip() in _SUBJECTIVE_EXCLUDED_L2:
+		return None
+	# 감정 맵핑 없음: 원본 sentiment 그대로 사용
+	return _subjective_category(row), (row.get("sentiment") or "").strip()
+
+
+def classify_other_response_row(row: Dict[str, str]) -> Optional[Tuple[str, str]]:
+	"""객관식 '기타' 응답 요약용 (카테고리, 감정) 키. 객관식(코드 10) + text_yn 허용 행만 대상."""
+	if (row.get("qsit_type_ds_cd") or "").strip() != "10":
+		return None
+	if (row.get("text_yn") or "").strip() not in ("1", "Y", "y"):
+		return None
+	if (row.get("category_level2") or "").strip() in _SUBJECTIVE_EXCLUDED_L2:
+		return None
+	return _subjective_category(row), (row.get("sentiment") or "").strip()
+
+
+def classify_subjective_category_row(row: Dict[str, str]) -> Optional[Tuple[str, str]]:
+	"""카테고리 표용 (카테고리, 감정) 키. llm_level1 기준이며 최소 길이 미만 응답은 None.
+	- 무응답(카테고리/감정) → ('무응답', '무응답'), '기타 피드백'/제외 카테고리 → '기타'
+	- 긍정/부정/제안/문의/무응답 외 감정은 ('기타', '긍정')으로 집계
+	"""
+	# 응답 내용 길이 체크 (최소 길이 미만이면 제외)
+	answ_cntnt = (row.get('answ_cntnt') or '').strip()
+	if len(answ_cntnt) < MIN_RESPONSE_LENGTH:
+		return None
+	cat = (row.get('llm_level1') or '(미분류)').strip() or '(미분류)'
+	# 카테고리 앞의 "NN. " 형태 숫자 제거
+	cat = re.sub(r'^\d+\.\s*', '', cat)
+	sent = (row.get('sentiment') or '').strip()
+	if cat == '무응답' or sent == '무응답':
+		return '무응답', '무응답'
+	if cat == '기타 피드백' or cat in SUBJECTIVE_EXCLUDE_CATEGORIES:
+		cat = '기타'
+	if sent not in ('긍정', '부정', '제안', '문의'):
+		return '기타', '긍정'
+	return cat, sent
+
+
+class KeywordHeavyHitters:
+	"""키워드 top-k 근사 집계기 (Space-Saving + Count-Min). 메모리는 어휘 크기와 무관하게 제한된다.
+
+	- capacity: 그룹(예: (카테고리, 감정))별 Space-Saving 추적 키워드 수.
+	  추적 중인 키워드의 추정 건수는 실제보다 크거나 같고, 과대오차 ≤ 그룹 건수 / capacity
+	- epsilon / delta: 전체 그룹이 공유하는 Count-Min 크기 (추정치 ≤ 실제 + ε·N, 확률 1-δ).
+	  Space-Saving 교체 시 신규 키워드의 시작값을 Count-Min 추정치로 낮춰 오차를 줄인다
+	- 추정치는 후보 선정용이며, 최종 후보의 건수는 호출측에서 원본 행으로 다시 센다 (recount)
+	"""
+	_PRIME = 2147483647
+
+	def __init__(self, capacity: int, epsilon: float, delta: float):
+		self.capacity = max(1, int(capacity))
+		self.width = max(1, int(math.ceil(math.e / max(epsilon, 1e-9))))
+		self.depth = max(1, int(math.ceil(math.log(1.0 / min(max(delta, 1e-9), 0.5)))))
+		# 해시 계수는 고정 시드로 생성 (실행마다 같은 후보가 선정되도록)
+		rnd = random.Random(0)
+		self._hash_params = [(rnd.randrange(1, self._PRIME), rnd.randrange(0, self._PRIME)) for _ in range(self.depth)]
+		self._cm: List[List[int]] = [[0] * self.width for _ in range(self.depth)]
+		self._tables: Dict[Tuple[str, ...], Dict[str, int]] = {}
+		self._heaps: Dict[Tuple[str, ...], List[Tuple[int, str]]] = {}
+
+	def _cm_add(self, group: Tuple[str, ...], kw: str) -> int:
+		"""Count-Min에 1건 추가하고 추정치(행별 최소값)를 반환."""
+		h = zlib.crc32(("\x1f".join(group) + "\x1f" + kw).encode("utf-8"))
+		est = None
+		for row, (a, b) in zip(self._cm, self._hash_params):
+			idx = ((a * h + b) % self._PRIME) % self.width
+			row[idx] += 1
+			if est is None or row[idx] < est:
+				est = row[idx]
+		return int(est or 0)
+
+	def add(self, group: Tuple[str, ...], kw: str) -> None:
+		cm_est = self._cm_add(group, kw)
+		table = self._tables.get(group)
+		if table is None:
+			table = self._tables[group] = {}
+			self._heaps[group] = []
+		heap = self._heaps[group]
+		if kw in table:
+			table[kw] += 1
+		elif len(table) < self.capacity:
+			table[kw] = 1
+		else:
+			# 최소 건수 키워드 교체 (힙은 지연 삭제: 현재 건수와 다른 항목은 건너뜀)
+			while True:
+				cnt, victim = heapq.heappop(heap)
+				if table.get(victim) == cnt:
+					break
+			del table[victim]
+			table[kw] = min(cnt + 1, cm_est)
+		heapq.heappush(heap, (table[kw], kw))
+		# 지연 삭제로 쌓인 항목 정리 (힙 크기를 capacity의 상수배로 유지)
+		if len(heap) > 4 * self.capacity:
+			heap[:] = [(c, k) for k, c in table.items()]
+			heapq.heapify(heap)
+
+	def groups(self) -> List[Tuple[str, ...]]:
+		return list(self._tables)
+
+	def candidates(self, group: Tuple[str, ...], k: int) -> List[str]:
+		"""그룹의 상위 k개 후보 키워드 (추정 건수 내림차순, 동률은 키워드순)."""
+		return self.merged_candidates([group], k)
+
+	def merged_candidates(self, groups: Iterable[Tuple[str, ...]], k: int) -> List[str]:
+		"""여러 그룹을 합친 상위 k개 후보 키워드 (그룹별 추정 건수 합 기준, 예: 기타 묶기)."""
+		merged: Counter = Counter()
+		for group in groups:
+			merged.update(self._tables.get(group) or {})
+		return [kw for kw, _ in sorted(merged.items(), key=lambda x: (-x[1], x[0]))[:k]]
+
+
+def make_keyword_sketch() -> KeywordHeavyHitters:
+	"""설정값(SUBJECTIVE_KEYWORD_SKETCH_*)으로 키워드 top-k 근사 집계기를 생성한다."""
+	return KeywordHeavyHitters(
+		SUBJECTIVE_KEYWORD_SKETCH_CAPACITY,
+		SUBJECTIVE_KEYWORD_SKETCH_EPSILON,
+		SUBJECTIVE_KEYWORD_SKETCH_DELTA,
+	)
+
+
+def _subjective_row_keywords(row: Dict[str, str], keyword_limit: Optional[int]) -> List[str]:
+	"""행의 키워드 목록 (앞쪽 keyword_limit개, SUBJECTIVE_EXCLUDE_KEYWORDS 제외)."""
+	keywords = _split_keywords(row.get("keywords"))
+	if keyword_limit is not None:
+		keywords = keywords[:keyword_limit]
+	return [kw for kw in keywords if kw not in SUBJECTIVE_EXCLUDE_KEYWORDS]
+
+
+def aggregate_subjective(
+	question_rows: List[Dict[str, str]],
+	classify: Callable[[Dict[str, str]], Optional[Tuple[str, str]]],
+	keyword_limit: Optional[int] = None,
+	sketch: Optional[bool] = None,
+	candidate_limit: int = SUBJECTIVE_KEYWORDS_LIMIT,
+	candidate_group: Optional[Callable[[Tuple[str, str], Counter], Tuple[str, ...]]] = None,
+) -> SubjectiveAggregate:
+	"""주관식 행을 1회 순회하여 (카테고리×감정) 건수와 (카테고리×감정×키워드) 건수를 함께 집계한다.
+
+	- classify: 행 → (카테고리, 감정). None이면 집계에서 제외 (classify_* 참고)
+	- keyword_limit: 행당 사용할 앞쪽 키워드 수 (None이면 전체). SUBJECTIVE_EXCLUDE_KEYWORDS는 제외
+	- sketch: 키워드 근사 집계 사용 여부 (None이면 SUBJECTIVE_KEYWORD_SKETCH_ENABLED).
+	  사용 시 후보 그룹별 상위 candidate_limit개 후보만 정확 건수로 다시 세어
+	  keyword_counts에 담는다 (후보 외 키워드는 포함되지 않음)
+	- candidate_limit: 근사 집계 후보 수. 호출측이 노출할 최대 키워드 수 이상으로 지정
+	- candidate_group: (카테고리, 감정), 카테고리별 건수 → 후보 그룹. 같은 그룹의 키는 합친 추정 건수로
+	  후보를 고른다 (기타 묶기처럼 여러 카테고리 키워드를 합쳐 노출하는 경우). None이면 키별
+	"""
+	use_sketch = SUBJECTIVE_KEYWORD_SKETCH_ENABLED if sketch is None else sketch
+	hh = make_keyword_sketch() if use_sketch else None
+	kept_rows: List[Dict[str, str]] = []
+	keys: List[Tuple[str, str]] = []
+	cat_total: Counter = Counter()
+	cat_sent_counts: Dict[str, Counter] = defaultdict(Counter)
+	keyword_counts: Dict[Tuple[str, str], Counter] = {}
+	for r in question_rows:
+		key = classify(r)
+		if key is None:
+			continue
+		kept_rows.append(r)
+		keys.append(key)
+		cat_total[key[0]] += 1
+		cat_sent_counts[key[0]][key[1]] += 1
+		for kw in _subjective_row_keywords(r, keyword_limit):
+			if hh is not None:
+				hh.add(key, kw)
+				continue
+			ctr = keyword_counts.get(key)
+			if ctr is None:
+				ctr = keyword_counts[key] = Counter()
+			ctr[kw] += 1
+	if hh is not None:
+		# 최종 후보만 정확 재집계
+		members: Dict[Tuple[str, ...], List[Tuple[str, ...]]] = defaultdict(list)
+		for g in hh.groups():
+			members[candidate_group(g, cat_total) if candidate_group else g].append(g)  # type: ignore[arg-type]
+		candidates: Dict[Tuple[str, ...], Set[str]] = {}
+		for group, group_keys in members.items():
+			cand = set(hh.merged_candidates(group_keys, candidate_limit))
+			for g in group_keys:
+				candidates[g] = cand
+		for r, key in zip(kept_rows, keys):
+			cand = candidates.get(key)
+			if not cand:
+				continue
+			for kw in _subjective_row_keywords(r, keyword_limit):
+				if kw not in cand:
+					continue
+				ctr = keyword_counts.get(key)
+				if ctr is None:
+					ctr = keyword_counts[key] = Counter()
+				ctr[kw] += 1
+	return SubjectiveAggregate(
+		rows=kept_rows,
+		keys=keys,
+		cat_total=cat_total,
+		cat_sent_counts=cat_sent_counts,
+		keyword_counts=keyword_counts,
+	)
+
+
+def _keyword_anal_hits(kw_anal_text: str, body: str) -> int:
+	"""keyword_anal 문자열("kw(n), ...")의 키워드 중 본문에 포함된 개수."""
+	if not kw_anal_text or not body:
+		return 0
+	kws = [re.sub(r"\(.*\)", "", k).strip() for k in kw_anal_text.split(",")]
+	return sum(1 for k in kws if k and k in body)
+
+
+def _pick_subjective_summaries(candidates: List[Dict[str, object]], limit: int) -> List[str]:
+	"""요약 후보를 (키워드 히트 수, 길이) 내림차순으로 정렬해 공백 정규화 기준 중복 없이 limit개 선택."""
+	ordered = sorted(candidates, key=lambda e: (-int(e["hits"]), -int(e["len"])))
+	seen_norm: Set[str] = set()
+	result: List[str] = []
+	for e in ordered:
+		s = str(e["summary"])
+		sn = re.sub(r"\s+", " ", s.strip())
+		if sn in seen_norm:
+			continue
+		seen_norm.add(sn)
+		result.append(s)
+		if len(result) >= limit:
+			break
+	return result
+
+
+def _is_subjective_other(count: int, total: int) -> bool:
+	"""기타 묶기 대상 여부 (절대값 조건 OR 비율 조건)."""
+	percent = (count / total * 100) if total > 0 else 0
+	return count <= SUBJECTIVE_OTHER_THRESHOLD or percent <= SUBJECTIVE_OTHER_PERCENT_THRESHOLD
+
+
+def _subjective_other_group(key: Tuple[str, str], cat_total: Counter) -> Tuple[str, ...]:
+	"""키워드 후보 그룹: 기타로 묶일 카테고리는 감정별 하나의 그룹으로 합침."""
+	if _is_subjective_other(cat_total[key[0]], sum(cat_total.values())):
+		return ('기타 묶음', key[1])
+	return key
+
+
 def aggregate_subjective_by_category(question_rows: List[Dict[str, str]]):
 	"""카테고리별로 긍정/부정/제안/문의/무응답 수치와 키워드 빈도를 집계한다.
 	반환: [ { 'category': str, 'pos': int, 'neg': int, 'sug': int, 'inq': int, 'no_resp': int, 'pos_kw': Counter, 'neg_kw': Counter, 'sug_kw': Counter, 'inq_kw': Counter } ]
 	내림차순(총합) 정렬.
 	"""
-	from collections import Counter as _Counter
+	agg = aggregate_subjective(
+		question_rows,
+		classify_subjective_category_row,
+		candidate_limit=max(SUBJECTIVE_KEYWORDS_LIMIT, SUBJECTIVE_KEYWORDS_LIMIT_OTHER),
+		candidate_group=_subjective_other_group,
+	)
 	by_cat: Dict[str, Dict[str, object]] = {}
-	for r in question_rows:
-		# 응답 내용 길이 체크 (최소 길이 미만이면 제외)
-		answ_cntnt = (r.get('answ_cntnt') or '').strip()
-		if len(answ_cntnt) < MIN_RESPONSE_LENGTH:
-			continue
-		
-		cat = (r.get('llm_level1') or '(미분류)').strip() or '(미분류)'
-		# 카테고리 앞의 "NN. " 형태 숫자 제거
-		import re
-		cat = re.sub(r'^\d+\.\s*', '', cat)
-		sent = (r.get('sentiment') or '').strip()
-		
-		# 무응답 처리: 카테고리가 무응답이거나 sentiment가 무응답이면 무응답으로 분류
-		if cat == '무응답' or sent == '무응답':
-			cat = '무응답'
-			sent = '무응답'
-		# "기타 피드백"을 "기타"로 통합
-		elif cat == '기타 피드백':
-			cat = '기타'
-		# 제외 카테고리는 "기타"로 묶기 (단순응답 제거)
-		elif cat in SUBJECTIVE_EXCLUDE_CATEGORIES:
-			cat = '기타'
-		
-		keywords = [kw for kw in _split_keywords(r.get('keywords')) if kw not in SUBJECTIVE_EXCLUDE_KEYWORDS]
-		entry = by_cat.get(cat)
-		if entry is None:
-			entry = by_cat[cat] = { 
-				'category': cat, 
-				'pos': 0, 'neg': 0, 'sug': 0, 'inq': 0, 'no_resp': 0, 
-				'pos_kw': _Counter(), 'neg_kw': _Counter(), 'sug_kw': _Counter(), 'inq_kw': _Counter(), 'no_resp_kw': _Counter() 
-			}
-		
-		# 새로운 sentiment 분류 적용
-		if sent == '긍정':
-			entry['pos'] = int(entry['pos']) + 1  # type: ignore
-			entry['pos_kw'].update(keywords)  # type: ignore
-		elif sent == '부정':
-			entry['neg'] = int(entry['neg']) + 1  # type: ignore
-			entry['neg_kw'].update(keywords)  # type: ignore
-		elif sent == '제안':
-			entry['sug'] = int(entry['sug']) + 1  # type: ignore
-			entry['sug_kw'].update(keywords)  # type: ignore
-		elif sent == '문의':
-			entry['inq'] = int(entry['inq']) + 1  # type: ignore
-			entry['inq_kw'].update(keywords)  # type: ignore
-		elif sent == '무응답':
-			entry['no_resp'] = int(entry['no_resp']) + 1  # type: ignore
-			entry['no_resp_kw'].update(keywords)  # type: ignore
-		else:
-			# 분류되지 않는 케이스는 기타로 처리
-			if cat != '기타':
-				# 기타 카테고리로 이동
-				others_entry = by_cat.get('기타')
-				if others_entry is None:
-					others_entry = by_cat['기타'] = { 
-						'category': '기타', 
-						'pos': 0, 'neg': 0, 'sug': 0, 'inq': 0, 'no_resp': 0, 
-						'pos_kw': _Counter(), 'neg_kw': _Counter(), 'sug_kw': _Counter(), 'inq_kw': _Counter(), 'no_resp_kw': _Counter() 
-					}
-				others_entry['pos'] = int(others_entry['pos']) + 1  # type: ignore
-				others_entry['pos_kw'].update(keywords)  # type: ignore
-			else:
-				entry['pos'] = int(entry['pos']) + 1  # type: ignore
-				entry['pos_kw'].update(keywords)  # type: ignore
+	for cat in agg.cat_total:
+		entry: Dict[str, object] = {'category': cat}
+		for sent, field_name in _SUBJECTIVE_SENTIMENT_FIELDS:
+			entry[field_name] = int(agg.cat_sent_counts[cat][sent])
+		for sent, field_name in _SUBJECTIVE_SENTIMENT_FIELDS:
+			entry[field_name + '_kw'] = agg.keyword_counts.get((cat, sent)) or Counter()
+		by_cat[cat] = entry
 	# 정렬 및 0건 카테고리 제거 + 기타 묶기
 	items = list(by_cat.values())
 	# 합계 계산 헬퍼 (새로운 sentiment 분류 반영)
@@ -4580,9 +4880,7 @@ def aggregate_subjective_by_category(question_rows: List[Dict[str, str]]):
 	kept = []
 	for d in items:
 		# 절대값 조건 OR 비율 조건 (둘 중 하나라도 만족하면 기타로 분류)
-		count = _tot(d)
-		percent = (count / total_responses * 100) if total_responses > 0 else 0
-		if count <= SUBJECTIVE_OTHER_THRESHOLD or percent <= SUBJECTIVE_OTHER_PERCENT_THRESHOLD:
+		if _is_subjective_other(_tot(d), total_responses):
 			others['pos'] += int(d['pos'])  # type: ignore
 			others['neg'] += int(d['neg'])  # type: ignore
 			others['sug'] += int(d['sug'])  # type: ignore
@@ -4781,12 +5079,17 @@ def build_subjective_section(question_rows: List[Dict[str, str]]) -> str:
 	return head + ''.join(row_html) + '</tbody></table>'
 
 
-def generate_html(rows: List[Dict[str, str]]) -> str:
-	"""단일 설문 그룹(동일 `main_ttl`)에 대한 HTML 보고서 생성.
+def build_report_sections(rows: List[Dict[str, str]]) -> Dict[str, object]:
+	"""보고서 상단 요약 정보와 문항별 섹션 HTML을 생성한다. (generate_html / generate_html_parts 공용)
 
-	입력은 동일한 `main_ttl` 그룹의 원천 행이며, 문항 단위로 그룹핑하여
-	문항 타입에 맞는 컴포넌트를 동적으로 조립한다.
-	상단에는 요약(응답자수, 문항 수, 수집 기간, 문항 타입 구성)을 배치한다.
+	반환: {
+		'report_title': 이스케이프된 보고서 제목,
+		'period_text': 수집 기간 문구,
+		'total_respondents': 응답 건 수(고유 cust_id),
+		'total_questions': 문항 수,
+		'qtype_counts': 문항 타입별 개수,
+		'sections': 문항 순서대로 렌더링된 섹션 HTML 목록,
+	}
 	"""
 	report_title = html_escape(get_report_title(rows))
 	grouped = group_by_question(rows)
@@ -4806,11 +5109,15 @@ def generate_html(rows: List[Dict[str, str]]) -> str:
 	all_rows = rows
 	total_respondents = unique_count(all_rows, "cust_id")
 	total_questions = len(grouped)
+	# 문항 컨텍스트(타입/분포/라벨 순서/응답자수)를 문항당 1회 생성
+	contexts: List[QuestionContext] = [
+		build_question_context(qid, str(data.get("title", f"문항 {qid}")), data["rows"])  # type: ignore
+		for qid, data in ordered
+	]
 	# question type counts
 	qtype_counts = {"objective": 0, "subjective": 0, "evaluation": 0, "content": 0, "list": 0, "card": 0, "binary": 0, "ranking": 0}
-	for qid, data in ordered:
-		qt = get_question_type(data["rows"])  # type: ignore
-		qtype_counts[qt] += 1
+	for ctx in contexts:
+		qtype_counts[ctx.qtype] += 1
 	# date range from surv_date
 	from datetime import datetime as _dt
 	def _to_date(v: str):
@@ -4829,19 +5136,11 @@ def generate_html(rows: List[Dict[str, str]]) -> str:
 		period_text = f"수집 기간: {start} ~ {end}"
 
 	sections: List[str] = []
-	for q_index, (qid, data) in enumerate(ordered, start=1):
-		raw_title = str(data.get("title", f"문항 {qid}"))
-		q_rows: List[Dict[str, str]] = data["rows"]  # type: ignore
+	for q_index, ctx in enumerate(contexts, start=1):
+		raw_title = ctx.title
 		
-		# 1. qsit_type_ds_cd 값에 따라 기본 문항 타입 결정
-		base_qtype = get_question_type(q_rows)
-		
-		# 2. 응답 분포 계산
-		ordered_counts, label_order, _ = compute_overall_distribution(q_rows)
-		
-		# 3. 평가형 패턴 간주 제거: qsit_type_ds_cd로만 판단
-		effective_qtype = base_qtype
-		keywords_ctr = extract_keywords(q_rows)
+		# 평가형 패턴 간주 제거: qsit_type_ds_cd로만 판단 (ctx.qtype)
+		effective_qtype = ctx.qtype
 
 		section_parts: List[str] = []
 		# Header layout - effective_qtype에 따라 문항 타입 표시
@@ -4855,13 +5154,34 @@ def generate_html(rows: List[Dict[str, str]]) -> str:
 		)
 
 		# 동적 컴포넌트 시스템: effective_qtype에 따라 설정된 컴포넌트들을 생성
-		dynamic_components = build_question_components(q_rows, effective_qtype, label_order, raw_title, rows, qid)
+		dynamic_components = build_question_components(ctx, rows)
 		section_parts.extend(dynamic_components)
 
 		sections.append("".join(section_parts))
 
+	# 교차분석 완료 메시지
+	print(" 완료")
 
-	html = f"""
+	return {
+		"report_title": report_title,
+		"period_text": period_text,
+		"total_respondents": total_respondents,
+		"total_questions": total_questions,
+		"qtype_counts": qtype_counts,
+		"sections": sections,
+	}
+
+
+def render_report_shell(report: Dict[str, object], body_html: str, part_html: str = "") -> str:
+	"""보고서 공통 골격(제목/수집 기간/응답 건 수/문항 수 헤더)에 본문을 배치한 최종 HTML을 반환한다.
+	분할 보고서는 `part_html`로 헤더 하단에 파트 안내 문구를 추가한다.
+	"""
+	report_title = report["report_title"]
+	period_text = report["period_text"]
+	total_respondents = int(report["total_respondents"])  # type: ignore
+	total_questions = report["total_questions"]
+	qtype_counts: Dict[str, int] = report["qtype_counts"]  # type: ignore
+	return f"""
 	<!DOCTYPE html>
 	<html>
 	<head>
@@ -4916,11 +5236,11 @@ def generate_html(rows: List[Dict[str, str]]) -> str:
 										<div style="font-size:20px;font-weight:800;color:#111827;">{report_title} AI 보고서</div>
 										<div style="margin-top:4px;color:#6B7280;font-size:14px;">{period_text}</div>
 										<div style="margin-top:2px;color:#6B7280;font-size:14px;">응답 건 수: {total_respondents:,}건</div>
-										<div style="margin-top:2px;color:#6B7280;font-size:14px;">문항 수: 총 {total_questions}건 ({', '.join([f'{question_type_label(k)} {v}건' for k, v in qtype_counts.items() if v > 0])})</div>
+										<div style="margin-top:2px;color:#6B7280;font-size:14px;">문항 수: 총 {total_questions}건 ({', '.join([f'{question_type_label(k)} {v}건' for k, v in qtype_counts.items() if v > 0])})</div>{part_html}
 									</td>
 								</tr>
 								<tr>
-									<td style="padding:8px 12px 20px 12px;">{''.join(sections)}</td>
+									<td style="padding:8px 12px 20px 12px;">{body_html}</td>
 								</tr>
 		</table>
 		<!--[if mso]>
@@ -4929,11 +5249,86 @@ def generate_html(rows: List[Dict[str, str]]) -> str:
 	</body>
 	</html>
 	"""
-	
-	# 교차분석 완료 메시지
-	print(" 완료")
-	
-	return html
+
+
+def generate_html(rows: List[Dict[str, str]], optional_markers: bool = False) -> str:
+	"""단일 설문 그룹(동일 `main_ttl`)에 대한 HTML 보고서 생성.
+
+	입력은 동일한 `main_ttl` 그룹의 원천 행이며, 문항 단위로 그룹핑하여
+	문항 타입에 맞는 컴포넌트를 동적으로 조립한다.
+	상단에는 요약(응답자수, 문항 수, 수집 기간, 문항 타입 구성)을 배치한다.
+	`optional_markers`: 선택 섹션 경계 주석 유지 여부 (optimize_html의 용량 예산 축약용, 기본: 제거)
+	"""
+	report = build_report_sections(rows)
+	html = render_report_shell(report, "".join(report["sections"]))  # type: ignore
+	return html if optional_markers else strip_optional_markers(html)
+
+
+def _report_part_header_html(part_index: int, part_total: int, first_q: int, last_q: int) -> str:
+	"""분할 보고서 헤더에 붙는 파트 안내 문구."""
+	q_range = f"{first_q}번 문항" if first_q == last_q else f"{first_q}~{last_q}번 문항"
+	return f'<div style="margin-top:2px;color:#6B7280;font-size:14px;">보고서 분할: {part_index}/{part_total} ({q_range})</div>'
+
+
+def plan_report_parts(section_sizes: List[int], shell_size: int, part_budget_bytes: int) -> List[List[int]]:
+	"""문항 경계에서 보고서를 나눌 구간(섹션 인덱스 목록)을 계산한다.
+
+	- 렌더링 없이 섹션별 byte 크기만으로 계산하며, 각 파트 크기 = 공통 골격 + 연속 문항 섹션 합
+	- 문항 순서를 유지한 채 예산을 넘기 직전까지 채우고 다음 파트로 넘어간다
+	- 단일 문항이 예산을 넘으면 해당 문항만으로 한 파트를 구성한다
+	"""
+	if part_budget_bytes <= 0:
+		return [list(range(len(section_sizes)))] if section_sizes else []
+	parts: List[List[int]] = []
+	current: List[int] = []
+	current_size = shell_size
+	for idx, size in enumerate(section_sizes):
+		if current and current_size + size > part_budget_bytes:
+			parts.append(current)
+			current = []
+			current_size = shell_size
+		current.append(idx)
+		current_size += size
+	if current:
+		parts.append(current)
+	return parts
+
+
+def generate_html_parts(
+	rows: List[Dict[str, str]],
+	part_budget_bytes: int,
+	measure: Optional[Callable[[str], int]] = None,
+	optional_markers: bool = False,
+) -> List[str]:
+	"""대형 설문용 분할 보고서 생성. 문항 경계에서 나눈 파트별 HTML 목록을 반환한다.
+
+	- 모든 문항 섹션은 한 번만 렌더링하고, 분할은 렌더링된 섹션 크기로 계산한다
+	- 각 파트는 공통 헤더(수집 기간, 응답 건 수, 문항 수)를 공유하고 파트 안내 문구를 덧붙인다
+	- `measure`: 섹션/골격 크기 측정 함수 (기본: UTF-8 byte 길이). 후처리 최적화 후 크기로
+	  예산을 맞추려면 최적화 결과 크기를 반환하는 함수를 전달한다
+	- 한 파트에 모두 들어가면 generate_html과 동일한 단일 보고서를 반환한다
+	- `optional_markers`: generate_html과 동일 (선택 섹션 경계 주석 유지 여부)
+	"""
+	if measure is None:
+		measure = lambda html: len(html.encode("utf-8"))
+	report = build_report_sections(rows)
+	sections: List[str] = report["sections"]  # type: ignore
+	# 골격 크기는 파트 안내 문구가 가장 길어지는 경우로 보수적으로 추정
+	widest_part_html = _report_part_header_html(len(sections), len(sections), len(sections), len(sections))
+	shell_size = measure(render_report_shell(report, "", widest_part_html))
+	plan = plan_report_parts([measure(sec) for sec in sections], shell_size, part_budget_bytes)
+	finish = (lambda html: html) if optional_markers else strip_optional_markers
+	if len(plan) <= 1:
+		return [finish(render_report_shell(report, "".join(sections)))]
+	part_total = len(plan)
+	return [
+		finish(render_report_shell(
+			report,
+			"".join(sections[i] for i in indices),
+			_report_part_header_html(part_no, part_total, indices[0] + 1, indices[-1] + 1),
+		))
+		for part_no, indices in enumerate(plan, start=1)
+	]
 
 def main(argv: List[str]) -> int:
 	"""CLI 진입점.
@@ -5178,100 +5573,28 @@ def build_other_responses_summary(question_rows: List[Dict[str, str]]) -> str:
 	- 카테고리/감정/키워드를 요약하여 표 형태로 구성
 	- 상단에는 Base/Total(응답자수/답변수)를 표기
 	"""
-	# 1) 기타 응답 수집 (객관식 코드 10, text_yn 허용)
-	other_responses: List[Dict[str, str]] = []
-	_excluded_l2 = {'단순 칭찬/불만', '욕설·무관한 피드백', '개선 의사 없음 (“없습니다”)'}
-	for r in question_rows:
-		qtype_code = (r.get("qsit_type_ds_cd") or "").strip()
-		text_yn = (r.get("text_yn") or "").strip()
-		if qtype_code == "10" and text_yn in ("1", "Y", "y"):
-			l2 = (r.get("category_level2") or "").strip()
-			if l2 in _excluded_l2:
-				continue
-			other_responses.append(r)
-	if not other_responses:
-		return ""
-	# 2) 헬퍼 (주관식과 동일)
-	def _cat(row: Dict[str, str]) -> str:
-		c1 = (row.get("category_level1") or "").strip()
-		c2 = (row.get("category_level2") or "").strip()
-		if c1 or c2:
-			sep = " > " if (c1 and c2) else ""
-			return c1 + sep + c2
+	# 1) 기타 응답 수집 + 카테고리/감정/키워드 집계 (객관식 코드 10, text_yn 허용)
+	agg = aggregate_subjective(question_rows, classify_other_response_row, keyword_limit=3)
+	if not agg.rows:
 		return ""
-	def _sent_raw(row: Dict[str, str]) -> str:
-		s = (row.get("sentiment") or "").strip()
-		return s
-	def _split_kw(s: Optional[str]) -> List[str]:
-		if not s:
-			return []
-		return [p.strip() for p in str(s).split(",") if p and p.strip()][:3]
-	# 3) 카테고리별 감정 집계 및 키워드 집계
-	from collections import defaultdict, Counter
-	cat_sent_counts: Dict[str, Counter] = defaultdict(lambda: Counter())
-	cat_total: Counter = Counter()
-	for r in other_responses:
-		c = _cat(r)
-		s = _sent_raw(r)
-		cat_sent_counts[c][s] += 1
-		cat_total[c] += 1
-	# 상위 카테고리 (환경 변수 적용)
+	other_responses = agg.rows
+	cat_sent_counts = agg.cat_sent_counts
+	cat_total = agg.cat_total
+	# 2) 상위 카테고리 (환경 변수 적용)
 	top10_cats: List[str] = [c for c, _ in cat_total.most_common(OBJECTIVE_OTHER_MAX_CATEGORIES)]
-	# 키워드 집계 → (cat,sent)별 keyword_anal
-	kw_counts: Counter = Counter()
-	for r in other_responses:
-		c = _cat(r)
-		s = _sent_raw(r)
-		for kw in _split_kw(r.get("keywords")):
-			if kw in SUBJECTIVE_EXCLUDE_KEYWORDS:
-				continue
-			kw_counts[(c, s, kw)] += 1
-	keyword_anal_map: Dict[Tuple[str, str], str] = {}
-	for (c, s, kw), cnt in sorted(kw_counts.items(), key=lambda x: (-x[1], x[0][2])):
-		key = (c, s)
-		existing = keyword_anal_map.get(key, "")
-		if existing:
-			if existing.count("(") >= 5:
-				continue
-			keyword_anal_map[key] = existing + ", " + f"{kw}({cnt})"
-		else:
-			keyword_anal_map[key] = f"{kw}({cnt})"
+	# 3) (cat,sent)별 keyword_anal
+	keyword_anal_map = agg.keyword_anal_map(5)
 	# 4) 엔트리 구성 (요약 선택용)
-	entries: List[Dict[str, object]] = []
-	for r in other_responses:
-		c = _cat(r)
-		s = _sent_raw(r)
+	entries: Dict[Tuple[str, str], List[Dict[str, object]]] = defaultdict(list)
+	for r, (c, s) in zip(agg.rows, agg.keys):
 		if c not in top10_cats:
 			continue
 		kw_anal = keyword_anal_map.get((c, s), "")
 		text = (r.get("answ_cntnt") or "").strip()
 		summary = (r.get("summary") or "").strip() or text
-		def _kw_hits(kw_anal_text: str, body: str) -> int:
-			if not kw_anal_text or not body:
-				return 0
-			kws = [re.sub(r"\(.*\)", "", k).strip() for k in kw_anal_text.split(",")]
-			return sum(1 for k in kws if k and k in body)
-		hits = _kw_hits(kw_anal, text)
-		entries.append({"cat": c, "sent": s, "summary": summary, "hits": hits, "len": len(summary)})
-	def _normalize_summary_text(text: str) -> str:
-		s = (text or "").strip()
-		s = re.sub(r"\s+", " ", s)
-		return s
+		entries[(c, s)].append({"summary": summary, "hits": _keyword_anal_hits(kw_anal, text), "len": len(summary)})
 	def _pick_summaries(cat: str, sent: str, limit: int) -> List[str]:
-		cand = [e for e in entries if e["cat"] == cat and e["sent"] == sent]
-		cand.sort(key=lambda e: (-int(e["hits"]), -int(e["len"])) )
-		seen: Set[str] = set()
-		result: List[str] = []
-		for e in cand:
-			s = str(e["summary"])
-			sn = _normalize_summary_text(s)
-			if sn in seen:
-				continue
-			seen.add(sn)
-			result.append(s)
-			if len(result) >= limit:
-				break
-		return result
+		return _pick_subjective_summaries(entries.get((cat, sent), []), limit)
 	# 5) HTML 렌더 (주관식 요약 스타일 그대로)
 	base_n = len({(r.get('cust_id') or '').strip() for r in other_responses if (r.get('cust_id') or '').strip()})
 	total_n = len(other_responses)
@@ -5354,7 +5677,7 @@ def build_other_responses_summary(question_rows: List[Dict[str, str]]) -> str:
 	return ''.join(html_parts)
 
 
-def build_general_heatmap(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "객관식 문항", all_data: List[Dict[str, str]] = None, question_id: str = None) -> str:
+def build_general_heatmap(question_rows: List[Dict[str, str]], label_order: List[str], question_title: str = "객관식 문항", all_data: List[Dict[str, str]] = None, question_id: str = None, ctx: Optional["QuestionContext"] = None) -> str:
 	"""객관식(일반) 문항용 히트맵: 행=세그 버킷, 열=라벨.
 	- 만족도 전용 요약/순만족도 없이, 퍼센트 셀만 표시
 	- 스타일은 만족도 히트맵과 톤앤매너 일치
@@ -5376,6 +5699,7 @@ def build_general_heatmap(question_rows: List[Dict[str, str]], label_order: List
 		all_data=all_data,
 		question_id=question_id,
 		remark_base_items=[DEFAULT_HEATMAP_REMARK_BASE],
+		ctx=ctx,
 	)
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import os
 import pytz
 from datetime import datetime, date, timedelta
+from typing import Optional
 
 def html_escape(s: str) -> str:
 	return (
@@ -24,19 +25,30 @@ def detect_encoding(file_path: str) -> str:
 	# Fallback
 	return "utf-8"
 
-def save_report(surv_id: str, main_ttl: str, html: str, out_dir: str = os.path.join(os.path.dirname(__file__), "reports")) -> str:
+def save_report(
+    surv_id: str,
+    main_ttl: str,
+    html: str,
+    out_dir: str = os.path.join(os.path.dirname(__file__), "reports"),
+    part_index: Optional[int] = None,
+    part_total: Optional[int] = None,
+) -> str:
     """설문 보고서를 HTML 파일로 저장하고 경로를 반환.
 
     파일명 형식: `survey_report_{SURV_ID}_{TITLE}_{YYYYMMDD}.html`
     - SURV_ID: 설문 ID
     - TITLE: 메인 제목
     - 저장 위치: `out_dir` (기본값은 현재 파일 하위 `reports`)
+    - 분할 보고서(`part_total` > 1)는 `_part{i}of{N}` 접미사를 붙인다
+      예) `survey_report_{SURV_ID}_{TITLE}_{YYYYMMDD}_part1of3.html`
     """
     os.makedirs(out_dir, exist_ok=True)
     date_str = datetime.now().strftime("%Y%m%d")
     
     # 새로운 파일명 형식: survey_report_(SURV_ID)_(TITLE)_(YYYYMMDD).html
     filename = f"survey_report_{surv_id}_{main_ttl}_{date_str}.html"
+    if part_index is not None and part_total is not None and part_total > 1:
+        filename = f"survey_report_{surv_id}_{main_ttl}_{date_str}_part{part_index}of{part_total}.html"
     
     path = os.path.join(out_dir, filename)
     with open(path, "w", encoding="utf-8") as f: